@@ -0,0 +1,133 @@
+"""Compare raw-cache entry size and decode time with and without projection.
+
+Usage: python scripts/bench_cache_projection.py [--rounds 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app.repositories.codecs import default_codec  # noqa: E402
+from src.app.services.movie_service import MovieResolverService  # noqa: E402
+
+
+def tmdb_payload() -> dict:
+    return {
+        "id": 550,
+        "title": "Fight Club",
+        "original_title": "Fight Club",
+        "release_date": "1999-10-15",
+        "runtime": 139,
+        "overview": "A ticking-time-bomb insomniac and a slippery soap salesman " * 4,
+        "tagline": "Mischief. Mayhem. Soap.",
+        "genres": [{"id": 18, "name": "Drama"}, {"id": 53, "name": "Thriller"}],
+        "production_companies": [
+            {"id": i, "name": f"Studio {i}", "logo_path": f"/logo{i}.png", "origin_country": "US"}
+            for i in range(8)
+        ],
+        "production_countries": [{"iso_3166_1": "US", "name": "United States of America"}],
+        "spoken_languages": [{"iso_639_1": "en", "name": "English", "english_name": "English"}],
+        "origin_country": ["US"],
+        "poster_path": "/pB8BM7pdSp6B6Ih7QZ4DrQ3PmJK.jpg",
+        "backdrop_path": "/hZkgoQYus5vegHoetLkCJzb17zJ.jpg",
+        "vote_average": 8.4,
+        "vote_count": 30000,
+        "popularity": 61.4,
+        "external_ids": {"imdb_id": "tt0137523", "facebook_id": "x", "twitter_id": "y"},
+        "credits": {
+            "cast": [
+                {
+                    "id": i,
+                    "name": f"Actor {i}",
+                    "original_name": f"Actor {i}",
+                    "character": f"Character {i}",
+                    "profile_path": f"/profile{i}.jpg",
+                    "credit_id": f"52fe4250c3a36847f80149f{i}",
+                    "order": i,
+                    "popularity": 3.2,
+                }
+                for i in range(80)
+            ],
+            "crew": [
+                {
+                    "id": 1000 + i,
+                    "name": f"Crew {i}",
+                    "job": "Director" if i == 0 else "Grip",
+                    "department": "Directing" if i == 0 else "Crew",
+                    "credit_id": f"52fe4250c3a36847f8014a{i}",
+                    "profile_path": None,
+                }
+                for i in range(200)
+            ],
+        },
+    }
+
+
+def kp_payload() -> dict:
+    return {
+        "id": 361,
+        "name": "Бойцовский клуб",
+        "enName": "Fight Club",
+        "alternativeName": "Fight Club",
+        "year": 1999,
+        "movieLength": 139,
+        "description": "Сотрудник страховой компании страдает хронической бессонницей " * 4,
+        "shortDescription": "Страховой агент и торговец мылом",
+        "genres": [{"name": "триллер"}, {"name": "драма"}],
+        "countries": [{"name": "США"}, {"name": "Германия"}],
+        "poster": {"url": "https://image.openmoviedb.com/p.jpg", "previewUrl": "https://p"},
+        "backdrop": {"url": "https://image.openmoviedb.com/b.jpg", "previewUrl": "https://b"},
+        "externalId": {"imdb": "tt0137523", "tmdb": 550, "kpHD": "4a5b"},
+        "rating": {"kp": 8.7, "imdb": 8.8, "filmCritics": 7.4, "russianFilmCritics": 100},
+        "votes": {"kp": 1000000, "imdb": 2400000, "filmCritics": 300},
+        "facts": [{"value": "Интересный факт " * 10, "type": "FACT", "spoiler": False} for _ in range(30)],
+        "similarMovies": [{"id": i, "name": f"Фильм {i}", "poster": {"url": "x"}} for i in range(20)],
+        "persons": [
+            {
+                "id": i,
+                "name": f"Персона {i}",
+                "enName": f"Person {i}",
+                "photo": f"https://st.kp.yandex.net/images/actor_iphone/iphone360_{i}.jpg",
+                "description": f"Роль {i}",
+                "profession": "режиссеры" if i == 0 else "актеры",
+                "enProfession": "director" if i == 0 else "actor",
+            }
+            for i in range(120)
+        ],
+    }
+
+
+def measure(label: str, payload: dict, rounds: int) -> None:
+    for name, value in (("full", payload), ("projected", None)):
+        if value is None:
+            value = (
+                MovieResolverService._project_kp_movie(payload)
+                if label == "kp"
+                else MovieResolverService._project_tmdb_details(payload)
+            )
+        raw = default_codec.encode(value)
+        plain = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        started = time.perf_counter()
+        for _ in range(rounds):
+            default_codec.decode(raw)
+        decode_us = (time.perf_counter() - started) / rounds * 1_000_000
+        print(
+            f"{label:5s} {name:10s} json={len(plain):7d}B stored={len(raw):7d}B "
+            f"decode={decode_us:8.1f}us"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    measure("tmdb", tmdb_payload(), args.rounds)
+    measure("kp", kp_payload(), args.rounds)
+
+
+if __name__ == "__main__":
+    main()
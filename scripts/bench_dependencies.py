@@ -0,0 +1,71 @@
+"""Compare per-request service wiring with the shared application container.
+
+"per-request" builds the whole object graph (clients, repositories,
+resolver, random service) for every call, as the dependencies used to.
+"shared" resolves get_random_service() against one prebuilt container.
+No network or Redis round-trips are made: Redis clients connect lazily.
+
+Usage: python scripts/bench_dependencies.py [--rounds 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app import dependencies  # noqa: E402
+from src.app.container import AppContainer  # noqa: E402
+from src.app.dependencies import close_clients, get_random_service  # noqa: E402
+
+
+async def measure(label: str, call, rounds: int) -> None:
+    for _ in range(min(rounds, 100)):
+        await call()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await call()
+    per_call_us = (time.perf_counter() - started) / rounds * 1_000_000
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    await call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:12s} {per_call_us:8.2f}us/call  {peak - baseline:7d}B peak/call")
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        redis = await dependencies.get_redis()
+        redis_bytes = await dependencies.get_redis_bytes()
+        http = await dependencies.get_http_client()
+
+        container = AppContainer.build(redis=redis, redis_bytes=redis_bytes, http=http)
+
+        async def per_request():
+            return AppContainer.build(
+                redis=redis,
+                redis_bytes=redis_bytes,
+                http=http,
+                local_cache=container.local_cache,
+                hot_cards=container.hot_cards,
+            ).random_service
+
+        async def shared():
+            return await get_random_service(container)
+
+        await measure("per-request", per_request, args.rounds)
+        await measure("shared", shared, args.rounds)
+    finally:
+        await close_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20000)
+    asyncio.run(main(parser.parse_args()))
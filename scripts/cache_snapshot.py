@@ -0,0 +1,52 @@
+"""Export the long-lived cache namespaces to a file, or restore them.
+
+Production Redis runs without persistence, so take an export before
+replacing the container and restore it right after; keys keep their
+original expiry.
+
+Usage:
+    python scripts/cache_snapshot.py export /var/lib/filmspin/cache.fscs.gz
+    python scripts/cache_snapshot.py restore /var/lib/filmspin/cache.fscs.gz
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app.dependencies import close_clients, get_redis_bytes  # noqa: E402
+from src.app.repositories import (  # noqa: E402
+    DEFAULT_SNAPSHOT_PATTERNS,
+    CacheSnapshotRepository,
+)
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        repo = CacheSnapshotRepository(await get_redis_bytes(), batch=args.batch)
+        if args.command == "export":
+            stats = await repo.export(args.path, args.pattern or DEFAULT_SNAPSHOT_PATTERNS)
+            print(f"exported {stats.keys} keys ({stats.bytes} bytes) to {args.path}")
+        else:
+            stats = await repo.restore(args.path, replace=args.replace)
+            print(f"restored {stats.keys} keys, skipped {stats.skipped}")
+    finally:
+        await close_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("command", choices=("export", "restore"))
+    parser.add_argument("path")
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument(
+        "--pattern", action="append", help="key pattern to export (repeatable)"
+    )
+    parser.add_argument(
+        "--replace", action="store_true", help="overwrite keys that already exist"
+    )
+    asyncio.run(main(parser.parse_args()))
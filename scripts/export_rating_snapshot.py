@@ -0,0 +1,33 @@
+"""Export the Redis rating index to a file workers memory-map.
+
+Point RATING_INDEX_SNAPSHOT_PATH at the output; workers pick up a replaced
+file on their next request.
+
+Usage: python scripts/export_rating_snapshot.py /var/lib/filmspin/ratings.bin
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app.core.config import RATING_INDEX_MAX_AGE_SEC  # noqa: E402
+from src.app.dependencies import close_clients, get_redis  # noqa: E402
+from src.app.repositories import RatingIndexRepository  # noqa: E402
+
+
+async def main(path: str) -> None:
+    try:
+        repo = RatingIndexRepository(await get_redis(), max_age=RATING_INDEX_MAX_AGE_SEC)
+        count = await repo.export_snapshot(path)
+        print(f"exported {count} ratings to {path}")
+    finally:
+        await close_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path")
+    asyncio.run(main(parser.parse_args().path))
@@ -0,0 +1,70 @@
+"""Refill the cache after a deploy or a Redis restart.
+
+Replays the most spun filter combinations as previews, then resolves hot
+and popular movie cards, at a bounded rate.
+
+Usage: python scripts/warmup_cache.py --concurrency 4 --rate 5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app.core.config import (  # noqa: E402
+    WARMUP_CONCURRENCY,
+    WARMUP_HOT_CARDS,
+    WARMUP_POPULAR_PAGES,
+    WARMUP_RATE,
+    WARMUP_RU_CARDS,
+    WARMUP_TOP_FILTERS,
+)
+from src.app.dependencies import (  # noqa: E402
+    build_container,
+    close_clients,
+    get_warmup_runner,
+)
+from src.app.services.warmup import WarmupReport  # noqa: E402
+
+
+def print_progress(report: WarmupReport) -> None:
+    finished = report.done + report.failed
+    if finished == report.total or finished % 10 == 0:
+        print(f"\r{finished}/{report.total} jobs, {report.failed} failed", end="", flush=True)
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        runner = await get_warmup_runner(
+            await build_container(),
+            concurrency=args.concurrency,
+            rate=args.rate,
+            progress=print_progress,
+        )
+        report = await runner.run(
+            top_filters=args.top_filters,
+            hot_cards=args.hot_cards,
+            popular_pages=args.popular_pages,
+            ru_cards=args.ru_cards,
+        )
+        print(
+            f"\nwarmed {report.done} entries in {report.seconds}s "
+            f"({report.failed} failed): {report.by_stage}"
+        )
+    finally:
+        await close_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top-filters", type=int, default=WARMUP_TOP_FILTERS)
+    parser.add_argument("--hot-cards", type=int, default=WARMUP_HOT_CARDS)
+    parser.add_argument("--popular-pages", type=int, default=WARMUP_POPULAR_PAGES)
+    parser.add_argument(
+        "--ru-cards", type=int, default=WARMUP_RU_CARDS, help="RU cards missing KP details"
+    )
+    parser.add_argument("--concurrency", type=int, default=WARMUP_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=WARMUP_RATE, help="jobs per second")
+    asyncio.run(main(parser.parse_args()))
@@ -1,5 +1,29 @@
+from .breaker import CircuitBreaker, CircuitOpenError
+from .governor import (
+    Priority,
+    UpstreamGovernor,
+    build_governor,
+    upstream_priority,
+)
+from .hedging import LatencyTracker, build_latency_tracker
 from .omdb_client import OmdbClient
+from .omdb_keys import OmdbKeyPool
 from .poiskkino_client import PoiskkinoClient
+from .singleflight import SingleFlight
 from .tmdb_client import TmdbClient
 
-__all__ = ["TmdbClient", "PoiskkinoClient", "OmdbClient"]
+__all__ = [
+    "TmdbClient",
+    "PoiskkinoClient",
+    "OmdbClient",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "LatencyTracker",
+    "OmdbKeyPool",
+    "Priority",
+    "SingleFlight",
+    "UpstreamGovernor",
+    "build_governor",
+    "build_latency_tracker",
+    "upstream_priority",
+]
@@ -1,9 +1,15 @@
 import asyncio
 import logging
+import time
 from typing import Any
 
 import httpx
 
+from ..observability import metrics
+from .breaker import CircuitBreaker
+from .governor import UpstreamGovernor
+from .hedging import LatencyTracker
+
 logger = logging.getLogger("uvicorn.error")
 
 _RETRYABLE_STATUS = {429, 500, 502, 503, 504}
@@ -23,10 +29,16 @@ class RetryHttpClient:
         *,
         retries: int = 2,
         base_delay_sec: float = 0.25,
+        governor: UpstreamGovernor | None = None,
+        breaker: CircuitBreaker | None = None,
+        latency: LatencyTracker | None = None,
     ) -> None:
         self.client = client
         self.retries = max(0, retries)
         self.base_delay_sec = max(0.0, base_delay_sec)
+        self.governor = governor
+        self.breaker = breaker
+        self.latency = latency
 
     async def get_json(
         self,
@@ -38,7 +50,7 @@ class RetryHttpClient:
         attempt = 0
         while True:
             try:
-                response = await self.client.get(url, params=params, headers=headers)
+                response = await self._send(url, params=params, headers=headers)
                 response.raise_for_status()
                 return response.json()
             except httpx.HTTPStatusError as exc:
@@ -57,6 +69,114 @@ class RetryHttpClient:
                     continue
                 raise
 
+    async def _send(
+        self,
+        url: str,
+        *,
+        params: dict[str, Any] | None,
+        headers: dict[str, str] | None,
+    ) -> httpx.Response:
+        probe = self.breaker.before() if self.breaker is not None else False
+        try:
+            response = await self._hedged(url, params=params, headers=headers)
+        except httpx.TransportError:
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled, or failed in a way that says nothing about the upstream.
+            if probe:
+                self.breaker.abandon()
+            raise
+        if self.breaker is not None:
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+        return response
+
+    async def _hedged(
+        self,
+        url: str,
+        *,
+        params: dict[str, Any] | None,
+        headers: dict[str, str] | None,
+    ) -> httpx.Response:
+        """Send the GET; if it outlives the usual p95, race a second copy."""
+        delay = self.latency.hedge_delay() if self.latency is not None else None
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            delay = None
+        if delay is None:
+            return await self._attempt(url, params=params, headers=headers)
+
+        primary = asyncio.ensure_future(self._attempt(url, params=params, headers=headers))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self.latency.allow_hedge():
+                return await primary
+            hedge = asyncio.ensure_future(self._attempt(url, params=params, headers=headers))
+            tasks.add(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.latency.record_hedge_win()
+                        return task.result()
+            # Both copies failed; report the original error.
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _attempt(
+        self,
+        url: str,
+        *,
+        params: dict[str, Any] | None,
+        headers: dict[str, str] | None,
+    ) -> httpx.Response:
+        if self.governor is None:
+            return await self._timed_get(url, params=params, headers=headers)
+        async with self.governor.slot():
+            try:
+                response = await self._timed_get(url, params=params, headers=headers)
+            except _RETRYABLE_ERRORS:
+                self.governor.observe_failure()
+                raise
+            await self.governor.observe(response)
+            return response
+
+    async def _timed_get(
+        self,
+        url: str,
+        *,
+        params: dict[str, Any] | None,
+        headers: dict[str, str] | None,
+    ) -> httpx.Response:
+        started = time.perf_counter()
+        host = self.breaker.name if self.breaker is not None else httpx.URL(url).host
+        endpoint = httpx.URL(url).path
+        try:
+            response = await self.client.get(url, params=params, headers=headers)
+        except httpx.HTTPError:
+            metrics.observe_upstream(
+                host, endpoint, "error", (time.perf_counter() - started) * 1000
+            )
+            raise
+        elapsed = time.perf_counter() - started
+        metrics.observe_upstream(host, endpoint, response.status_code, elapsed * 1000)
+        if self.latency is not None and response.status_code < 500:
+            self.latency.record(elapsed)
+        return response
+
     async def _sleep_backoff(self, attempt: int, url: str, exc: Exception) -> None:
         delay = self.base_delay_sec * (2**attempt)
         logger.warning(
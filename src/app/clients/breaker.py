@@ -0,0 +1,96 @@
+import logging
+import time
+
+import httpx
+
+from ..core.config import UPSTREAM_BREAKER_FAILURES, UPSTREAM_BREAKER_RESET_SEC
+
+logger = logging.getLogger("uvicorn.error")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after consecutive failures.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    fail at once. Once ``reset_timeout`` has passed, a single probe is let
+    through (half-open). Its success closes the circuit and its failure
+    opens it again for another ``reset_timeout``. A probe that ends with no
+    outcome (cancelled, or an error unrelated to the upstream) must be
+    handed back with ``abandon()`` so the next call can probe instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = UPSTREAM_BREAKER_FAILURES,
+        reset_timeout: float = UPSTREAM_BREAKER_RESET_SEC,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = max(0.0, reset_timeout)
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._rejected = 0
+        self._opened = 0
+
+    def before(self) -> bool:
+        """Raise CircuitOpenError unless a call may go out now.
+
+        Returns True when this call is the half-open probe.
+        """
+        if self.state == CLOSED:
+            return False
+        waited = time.monotonic() - self._opened_at
+        if self.state == OPEN and waited >= self.reset_timeout:
+            self.state = HALF_OPEN
+            self._probing = False
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self._rejected += 1
+        raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def abandon(self) -> None:
+        """Release the half-open probe without recording an outcome."""
+        if self.state == HALF_OPEN:
+            self._probing = False
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info("[FilmSpin] upstream circuit closed: host=%s", self.name)
+        self.state = CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self._opened += 1
+                logger.warning(
+                    "[FilmSpin] upstream circuit opened: host=%s failures=%s",
+                    self.name,
+                    self._failures,
+                )
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "open": int(self.state != CLOSED),
+            "failures": self._failures,
+            "opened": self._opened,
+            "rejected": self._rejected,
+        }
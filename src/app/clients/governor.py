@@ -0,0 +1,287 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import AsyncIterator, Iterator, Optional
+
+import httpx
+from redis.asyncio import Redis
+
+from ..core.config import UPSTREAM_GOVERNOR_ENABLED, UPSTREAM_LIMITS
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    PREVIEW = 1
+    BACKGROUND = 2
+
+
+# Lower lanes only get part of the concurrency window, so a spin always
+# finds a free slot even while previews and background jobs are busy.
+LANE_SHARE = {
+    Priority.INTERACTIVE: 1.0,
+    Priority.PREVIEW: 0.75,
+    Priority.BACKGROUND: 0.5,
+}
+
+_lane: ContextVar[Priority] = ContextVar(
+    "filmspin_upstream_lane", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def upstream_priority(lane: Priority) -> Iterator[None]:
+    """Run upstream calls made inside the block (and tasks it spawns) in ``lane``."""
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+class UpstreamGovernor:
+    """Paces and bounds the calls made to one upstream host.
+
+    Three limits apply before a request goes out:
+    - an AIMD concurrency window: it grows by one per window of successes
+      and halves on throttling
+    - a request rate, counted in a shared per-second Redis window when
+      Redis is bound, and a local token bucket otherwise
+    - a cooldown set from ``Retry-After`` or ``X-RateLimit-*``, shared
+      through Redis so every worker backs off together
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        rate: float,
+        max_concurrency: int,
+        throttle_statuses: frozenset[int] = frozenset({429, 503}),
+        enabled: bool = True,
+    ) -> None:
+        self.name = name
+        self.rate = max(0.1, rate)
+        self.max_concurrency = max(1, max_concurrency)
+        self.throttle_statuses = throttle_statuses
+        self.enabled = enabled
+        self.redis: Redis | None = None
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._tokens = self.rate
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._throttled = 0
+        self._waited = 0
+
+    @property
+    def _window_key(self) -> str:
+        return f"ratelimit:{self.name}:{int(time.time())}"
+
+    @property
+    def _cooldown_key(self) -> str:
+        return f"ratelimit:{self.name}:until"
+
+    def bind(self, redis: Redis | None) -> None:
+        self.redis = redis
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Not on an asyncio loop (e.g. trio under anyio): nothing to govern.
+            yield
+            return
+        if not self.enabled:
+            yield
+            return
+        await self._acquire(_lane.get())
+        try:
+            await self._pace()
+            yield
+        finally:
+            self._release()
+
+    def _capacity(self, lane: Priority) -> int:
+        return max(1, int(self.limit * LANE_SHARE.get(lane, 1.0)))
+
+    async def _acquire(self, lane: Priority) -> None:
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        # Only callers of the same or a higher priority queue ahead of us.
+        queued_ahead = bool(self._waiters) and self._waiters[0][0] <= lane
+        if not queued_ahead and self.in_flight < self._capacity(lane):
+            self.in_flight += 1
+            return
+        self._waited += 1
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(lane), next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up: pass it on.
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters:
+            lane, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.in_flight >= self._capacity(Priority(lane)):
+                return
+            heapq.heappop(self._waiters)
+            self.in_flight += 1
+            future.set_result(None)
+
+    async def _pace(self) -> None:
+        while True:
+            delay = max(0.0, self._blocked_until - time.time())
+            if delay <= 0:
+                delay = await self._take_token()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def _take_token(self) -> float:
+        if self.redis is not None:
+            try:
+                return await self._take_shared_token()
+            except Exception as exc:
+                logger.info(
+                    "[FilmSpin] shared rate limit unavailable: host=%s error=%s",
+                    self.name,
+                    exc.__class__.__name__,
+                )
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def _take_shared_token(self) -> float:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.incr(self._window_key)
+        pipe.expire(self._window_key, 2)
+        pipe.get(self._cooldown_key)
+        count, _, until = await pipe.execute()
+        now = time.time()
+        try:
+            shared_until = float(until) if until else 0.0
+        except (TypeError, ValueError):
+            shared_until = 0.0
+        if shared_until > now:
+            self._blocked_until = max(self._blocked_until, shared_until)
+            return shared_until - now
+        if int(count) > self.rate:
+            return 1.0 - (now % 1.0)
+        return 0.0
+
+    async def observe(self, response: httpx.Response) -> None:
+        """Adapt the window and cooldown to what the upstream just said."""
+        if not self.enabled:
+            return
+        cooldown = self._cooldown_from_headers(response.headers)
+        if response.status_code in self.throttle_statuses:
+            self._throttled += 1
+            self.limit = max(1.0, self.limit / 2)
+            cooldown = max(cooldown or 0.0, 1.0)
+        elif response.status_code < 400:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+        if cooldown:
+            await self._block_for(cooldown)
+        self._wake()
+
+    def observe_failure(self) -> None:
+        """Timeouts and refused connections count as congestion too."""
+        if self.enabled:
+            self.limit = max(1.0, self.limit / 2)
+
+    async def _block_for(self, seconds: float) -> None:
+        until = time.time() + min(seconds, 300.0)
+        if until <= self._blocked_until:
+            return
+        self._blocked_until = until
+        logger.warning(
+            "[FilmSpin] upstream throttled: host=%s cooldown=%.1fs limit=%.1f",
+            self.name,
+            seconds,
+            self.limit,
+        )
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(
+                self._cooldown_key, f"{until:.3f}", px=max(1, int(seconds * 1000))
+            )
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] shared cooldown write failed: host=%s error=%s",
+                self.name,
+                exc.__class__.__name__,
+            )
+
+    @staticmethod
+    def _cooldown_from_headers(headers: httpx.Headers) -> Optional[float]:
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after).timestamp()
+                except (TypeError, ValueError):
+                    retry_at = None
+                if retry_at is not None:
+                    return max(0.0, retry_at - time.time())
+        if headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                reset = float(headers.get("X-RateLimit-Reset") or 1)
+            except ValueError:
+                return 1.0
+            # Either an absolute unix time or seconds until the reset.
+            return max(0.0, reset - time.time()) if reset > 1e9 else reset
+        return None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": sum(1 for _, _, f in self._waiters if not f.done()),
+            "waited": self._waited,
+            "throttled": self._throttled,
+        }
+
+
+def build_governor(name: str) -> UpstreamGovernor:
+    """A governor for one host with its configured rate and concurrency."""
+    rate, max_concurrency = UPSTREAM_LIMITS[name]
+    extra: dict[str, frozenset[int]] = {}
+    if name == "omdb":
+        # OMDb answers 401/403/429 for exhausted keys; those rotate keys instead.
+        extra["throttle_statuses"] = frozenset({503})
+    return UpstreamGovernor(
+        name,
+        rate=rate,
+        max_concurrency=max_concurrency,
+        enabled=UPSTREAM_GOVERNOR_ENABLED,
+        **extra,
+    )
@@ -0,0 +1,73 @@
+from collections import deque
+from typing import Optional
+
+from ..core.config import UPSTREAM_HEDGE_ENABLED, UPSTREAM_HEDGE_HOSTS, UPSTREAM_HEDGE_RATIO
+
+
+class LatencyTracker:
+    """Recent response times of one upstream, used to time hedged requests.
+
+    A GET that is still running after the observed p95 gets a second copy.
+    Hedges are capped at ``hedge_ratio`` of all requests, so a uniformly
+    slow upstream does not see its load doubled.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: int = 200,
+        min_samples: int = 20,
+        quantile: float = 0.95,
+        hedge_ratio: float = UPSTREAM_HEDGE_RATIO,
+        min_delay: float = 0.05,
+        max_delay: float = 3.0,
+        enabled: bool = UPSTREAM_HEDGE_ENABLED,
+    ) -> None:
+        self._samples: deque[float] = deque(maxlen=max(1, window))
+        self.min_samples = max(1, min_samples)
+        self.quantile = min(max(quantile, 0.5), 0.999)
+        self.hedge_ratio = max(0.0, hedge_ratio)
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.enabled = enabled
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """When to send a second copy of the request, or None for never."""
+        self._requests += 1
+        threshold = self._threshold() if self.enabled else None
+        if threshold is None:
+            return None
+        return min(self.max_delay, max(self.min_delay, threshold))
+
+    def _threshold(self) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.quantile))]
+
+    def allow_hedge(self) -> bool:
+        if self._hedges + 1 > self.hedge_ratio * self._requests + 1:
+            return False
+        self._hedges += 1
+        return True
+
+    def record_hedge_win(self) -> None:
+        self._hedge_wins += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hedged": self._hedges,
+            "hedge_wins": self._hedge_wins,
+            "p95_ms": int((self._threshold() or 0.0) * 1000),
+        }
+
+
+def build_latency_tracker(name: str) -> LatencyTracker:
+    # Hosts outside UPSTREAM_HEDGE_HOSTS only track latency: hedges would spend quota.
+    return LatencyTracker(enabled=UPSTREAM_HEDGE_ENABLED and name in UPSTREAM_HEDGE_HOSTS)
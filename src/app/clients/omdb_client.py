@@ -1,17 +1,35 @@
 from typing import Optional
 import logging
+import time
 
 import httpx
 
 from ..core.config import OMDB_API_KEYS, OMDB_BASE, OMDB_MOCK_ENABLED
+from ..observability import metrics
+from .breaker import CircuitBreaker, CircuitOpenError
+from .governor import UpstreamGovernor, build_governor
+from .omdb_keys import OmdbKeyPool
+from .singleflight import SingleFlight
 
 logger = logging.getLogger("uvicorn.error")
 
 
 class OmdbClient:
-    def __init__(self, client: httpx.AsyncClient) -> None:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        *,
+        flights: SingleFlight | None = None,
+        governor: UpstreamGovernor | None = None,
+        breaker: CircuitBreaker | None = None,
+        keys: OmdbKeyPool | None = None,
+    ) -> None:
         self._client = client
-        self._active_key_index = 0
+        # The app container passes the key pool, limits and breaker it owns.
+        self._keys = keys or OmdbKeyPool()
+        self._flights = flights or SingleFlight()
+        self._governor = governor or build_governor("omdb")
+        self._breaker = breaker or CircuitBreaker("omdb")
 
     @staticmethod
     def _should_rotate_by_payload_error(error: str) -> bool:
@@ -26,17 +44,6 @@ class OmdbClient:
     def _should_rotate_by_status(status_code: Optional[int]) -> bool:
         return status_code in (401, 403, 429)
 
-    def _ordered_keys(self) -> list[tuple[int, str]]:
-        keys = list(OMDB_API_KEYS)
-        if not keys:
-            return []
-        start = self._active_key_index % len(keys)
-        ordered: list[tuple[int, str]] = []
-        for offset in range(len(keys)):
-            index = (start + offset) % len(keys)
-            ordered.append((index, keys[index]))
-        return ordered
-
     @staticmethod
     def _mock_rating(imdb_id: str) -> dict[str, float | int]:
         digits = [int(ch) for ch in imdb_id if ch.isdigit()]
@@ -50,17 +57,49 @@ class OmdbClient:
             return None
         if OMDB_MOCK_ENABLED:
             return self._mock_rating(imdb_id)
+        return await self._flights.do(
+            f"omdb:{imdb_id}", lambda: self._fetch_rating(imdb_id)
+        )
 
-        key_candidates = self._ordered_keys()
+    async def _fetch_rating(self, imdb_id: str) -> Optional[dict[str, float | int]]:
+        key_candidates = await self._keys.order(OMDB_API_KEYS)
         if not key_candidates:
+            if OMDB_API_KEYS:
+                logger.info(
+                    "[FilmSpin] omdb skipped, every key exhausted today: imdb_id=%s",
+                    imdb_id,
+                )
             return None
         has_rotated = False
 
         for key_index, key in key_candidates:
             try:
-                response = await self._client.get(
-                    OMDB_BASE, params={"apikey": key, "i": imdb_id, "type": "movie"}
-                )
+                probe = self._breaker.before()
+                try:
+                    async with self._governor.slot():
+                        started = time.perf_counter()
+                        response = await self._client.get(
+                            OMDB_BASE,
+                            params={"apikey": key, "i": imdb_id, "type": "movie"},
+                        )
+                        metrics.observe_upstream(
+                            "omdb",
+                            "/",
+                            response.status_code,
+                            (time.perf_counter() - started) * 1000,
+                        )
+                        await self._governor.observe(response)
+                except httpx.RequestError:
+                    raise
+                except BaseException:
+                    if probe:
+                        self._breaker.abandon()
+                    raise
+                await self._keys.record_use(key)
+                if response.status_code >= 500:
+                    self._breaker.record_failure()
+                else:
+                    self._breaker.record_success()
                 if self._should_rotate_by_status(response.status_code):
                     has_rotated = True
                     logger.info(
@@ -69,7 +108,7 @@ class OmdbClient:
                         key_index + 1,
                         response.status_code,
                     )
-                    self._active_key_index = (key_index + 1) % len(key_candidates)
+                    await self._keys.mark_exhausted(key)
                     continue
 
                 response.raise_for_status()
@@ -84,7 +123,7 @@ class OmdbClient:
                             key_index + 1,
                             reason,
                         )
-                        self._active_key_index = (key_index + 1) % len(key_candidates)
+                        await self._keys.mark_exhausted(key)
                         continue
 
                     logger.info(
@@ -92,7 +131,6 @@ class OmdbClient:
                         imdb_id,
                         reason,
                     )
-                    self._active_key_index = key_index
                     return None
 
                 rating_raw = payload.get("imdbRating")
@@ -104,9 +142,7 @@ class OmdbClient:
                     else None
                 )
                 if rating is None and votes is None:
-                    self._active_key_index = key_index
                     return None
-                self._active_key_index = key_index
                 return {"imdb_rating": rating, "imdb_votes": votes}
             except httpx.HTTPStatusError as exc:
                 status_code = exc.response.status_code if exc.response else None
@@ -118,7 +154,7 @@ class OmdbClient:
                         key_index + 1,
                         status_code,
                     )
-                    self._active_key_index = (key_index + 1) % len(key_candidates)
+                    await self._keys.mark_exhausted(key)
                     continue
                 logger.warning(
                     "[FilmSpin] omdb http status error: imdb_id=%s status=%s",
@@ -126,7 +162,10 @@ class OmdbClient:
                     status_code,
                 )
                 return None
+            except CircuitOpenError:
+                return None
             except httpx.RequestError as exc:
+                self._breaker.record_failure()
                 logger.warning(
                     "[FilmSpin] omdb request error: imdb_id=%s error=%s",
                     imdb_id,
@@ -0,0 +1,147 @@
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Sequence
+
+from redis.asyncio import Redis
+
+from ..core.config import OMDB_DAILY_LIMIT
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class OmdbKeyPool:
+    """Orders OMDb API keys by how much of today's quota they have left.
+
+    Request counts and exhaustion marks are kept in one Redis hash per UTC
+    day, so every worker skips a key that any of them has run dry, and the
+    marks go away on their own at the daily reset. Without Redis the same
+    bookkeeping is kept per process.
+    """
+
+    PREFIX = "quota:omdb"
+
+    def __init__(
+        self, *, daily_limit: int = OMDB_DAILY_LIMIT, sync_interval: float = 5.0
+    ) -> None:
+        self.daily_limit = max(1, daily_limit)
+        self.sync_interval = sync_interval
+        self.redis: Redis | None = None
+        self._day = self._today()
+        self._used: dict[str, int] = {}
+        self._exhausted: dict[str, float] = {}
+        self._labels: dict[str, str] = {}
+        self._synced_at = 0.0
+
+    def bind(self, redis: Redis | None) -> None:
+        self.redis = redis
+        self._synced_at = 0.0
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y%m%d")
+
+    @staticmethod
+    def fingerprint(key: str) -> str:
+        # Keys never reach Redis or /api/metrics in clear text.
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def _usage_key(self) -> str:
+        return f"{self.PREFIX}:{self._day}"
+
+    def _roll_over(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._used.clear()
+            self._exhausted.clear()
+            self._synced_at = 0.0
+
+    async def order(self, keys: Sequence[str]) -> list[tuple[int, str]]:
+        """Keys still usable today as (index, key), most quota left first."""
+        self._roll_over()
+        for index, key in enumerate(keys):
+            self._labels.setdefault(self.fingerprint(key), f"key{index + 1}")
+        await self._sync()
+        usable: list[tuple[int, str]] = []
+        for index, key in enumerate(keys):
+            fp = self.fingerprint(key)
+            if fp in self._exhausted or self._used.get(fp, 0) >= self.daily_limit:
+                continue
+            usable.append((index, key))
+        # Stable sort: keys with equal usage keep the configured order.
+        usable.sort(key=lambda item: self._used.get(self.fingerprint(item[1]), 0))
+        return usable
+
+    async def record_use(self, key: str) -> None:
+        self._roll_over()
+        fp = self.fingerprint(key)
+        self._used[fp] = self._used.get(fp, 0) + 1
+        await self._write(fp, "used", 1)
+
+    async def mark_exhausted(self, key: str) -> None:
+        """Skip ``key`` on every worker until the daily reset."""
+        self._roll_over()
+        fp = self.fingerprint(key)
+        self._exhausted[fp] = time.time()
+        await self._write(fp, "exhausted", self._exhausted[fp])
+
+    async def _sync(self) -> None:
+        if self.redis is None or time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = time.monotonic()
+        try:
+            raw = await self.redis.hgetall(self._usage_key)
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] omdb key usage unavailable: error=%s",
+                exc.__class__.__name__,
+            )
+            return
+        used: dict[str, int] = {}
+        exhausted: dict[str, float] = {}
+        for field, value in (raw or {}).items():
+            fp, _, kind = str(field).partition(":")
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                continue
+            if kind == "used":
+                used[fp] = int(number)
+            elif kind == "exhausted":
+                exhausted[fp] = number
+        # Redis already holds our own writes, so its view replaces ours.
+        self._used = used
+        self._exhausted = exhausted
+
+    async def _write(self, fp: str, kind: str, value: float) -> None:
+        if self.redis is None:
+            return
+        field = f"{fp}:{kind}"
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            if kind == "used":
+                pipe.hincrby(self._usage_key, field, int(value))
+            else:
+                pipe.hset(self._usage_key, field, f"{value:.0f}")
+            # Outlive the UTC day a little so late workers still see the marks.
+            pipe.expire(self._usage_key, 60 * 60 * 48)
+            await pipe.execute()
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] omdb key usage write failed: error=%s",
+                exc.__class__.__name__,
+            )
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        out: dict[str, dict[str, int]] = {}
+        for fp, label in self._labels.items():
+            used = self._used.get(fp, 0)
+            out[label] = {
+                "used": used,
+                "remaining": max(0, self.daily_limit - used),
+                "exhausted": int(fp in self._exhausted),
+            }
+        return out
@@ -4,14 +4,37 @@ import httpx
 
 from ..core.config import KINOPOISK_API_KEY, KINO_BASE
 from .base import RetryHttpClient
+from .breaker import CircuitBreaker
+from .governor import UpstreamGovernor, build_governor
+from .hedging import LatencyTracker, build_latency_tracker
+from .singleflight import SingleFlight
 
 
 class PoiskkinoClient:
-    def __init__(self, client: httpx.AsyncClient) -> None:
-        self._http = RetryHttpClient(client)
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        *,
+        flights: SingleFlight | None = None,
+        governor: UpstreamGovernor | None = None,
+        breaker: CircuitBreaker | None = None,
+        latency: LatencyTracker | None = None,
+    ) -> None:
+        # The app container passes the instances every client of a host shares.
+        self._http = RetryHttpClient(
+            client,
+            governor=governor or build_governor("kp"),
+            breaker=breaker or CircuitBreaker("kp"),
+            latency=latency or build_latency_tracker("kp"),
+        )
         self._headers = {"X-API-KEY": KINOPOISK_API_KEY}
+        self._flights = flights or SingleFlight()
 
     async def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        key = SingleFlight.make_key("kp", path, params)
+        return await self._flights.do(key, lambda: self._fetch(path, params))
+
+    async def _fetch(self, path: str, params: dict[str, Any] | None) -> dict[str, Any]:
         data = await self._http.get_json(
             f"{KINO_BASE}{path}", params=params, headers=self._headers
         )
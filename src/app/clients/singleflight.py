@@ -0,0 +1,79 @@
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+from urllib.parse import urlencode
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future[Any]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent identical upstream calls into one in-flight task.
+
+    Callers that arrive while a call with the same key is running await the
+    same result instead of issuing their own request. The shared task is
+    cancelled only when every waiter has gone away.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, _Flight] = {}
+        self._calls = 0
+        self._flights_started = 0
+        self._joins = 0
+
+    @staticmethod
+    def make_key(
+        namespace: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+    ) -> str:
+        items: list[tuple[str, str]] = []
+        for name, value in (params or {}).items():
+            if value is None:
+                continue
+            values = value if isinstance(value, (list, tuple)) else [value]
+            items.extend((name, str(v)) for v in values)
+        return f"{namespace}:{path}?{urlencode(sorted(items))}"
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Not on an asyncio loop (e.g. trio under anyio): nothing to share.
+            return await fn()
+        self._calls += 1
+        flight = self._flights.get(key)
+        if flight is None or flight.task.cancelled():
+            self._flights_started += 1
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self._joins += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "calls": self._calls,
+            "flights": self._flights_started,
+            "joins": self._joins,
+            "in_flight": len(self._flights),
+        }
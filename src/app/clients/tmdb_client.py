@@ -4,13 +4,36 @@ import httpx
 
 from ..core.config import TMDB_API_KEY, TMDB_BASE
 from .base import RetryHttpClient
+from .breaker import CircuitBreaker
+from .governor import UpstreamGovernor, build_governor
+from .hedging import LatencyTracker, build_latency_tracker
+from .singleflight import SingleFlight
 
 
 class TmdbClient:
-    def __init__(self, client: httpx.AsyncClient) -> None:
-        self._http = RetryHttpClient(client)
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        *,
+        flights: SingleFlight | None = None,
+        governor: UpstreamGovernor | None = None,
+        breaker: CircuitBreaker | None = None,
+        latency: LatencyTracker | None = None,
+    ) -> None:
+        # The app container passes the instances every client of a host shares.
+        self._http = RetryHttpClient(
+            client,
+            governor=governor or build_governor("tmdb"),
+            breaker=breaker or CircuitBreaker("tmdb"),
+            latency=latency or build_latency_tracker("tmdb"),
+        )
+        self._flights = flights or SingleFlight()
 
     async def get(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        key = SingleFlight.make_key("tmdb", path, params)
+        return await self._flights.do(key, lambda: self._fetch(path, params))
+
+    async def _fetch(self, path: str, params: dict[str, Any] | None) -> dict[str, Any]:
         payload = {"api_key": TMDB_API_KEY, **(params or {})}
         data = await self._http.get_json(f"{TMDB_BASE}{path}", params=payload)
         return data if isinstance(data, dict) else {}
@@ -0,0 +1,283 @@
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+from redis.asyncio import Redis
+
+from .clients import (
+    CircuitBreaker,
+    LatencyTracker,
+    OmdbClient,
+    OmdbKeyPool,
+    PoiskkinoClient,
+    SingleFlight,
+    TmdbClient,
+    UpstreamGovernor,
+    build_governor,
+    build_latency_tracker,
+)
+from .core.config import (
+    CACHE_L1_ENABLED,
+    CACHE_L1_MAX_BYTES,
+    CACHE_L1_MAX_ENTRIES,
+    CACHE_L1_RULES,
+    CACHE_STALE_TTL,
+    CANDIDATE_INDEX_ENABLED,
+    CANDIDATE_INDEX_STALE_SEC,
+    FILTER_STATS_ENABLED,
+    FILTER_STATS_TTL,
+    PREVIEW_ESTIMATOR_ENABLED,
+    PREVIEW_ESTIMATOR_TTL,
+    RATING_INDEX_ENABLED,
+    RATING_INDEX_MAX_AGE_SEC,
+    REFRESH_BUDGET,
+    REFRESH_ENABLED,
+    REFRESH_INTERVAL_SEC,
+    REFRESH_LEAD_SEC,
+    REFRESH_TOP_N,
+    SEEN_FILTER_BITS,
+    SEEN_FILTER_CAPACITY,
+    SEEN_FILTER_ENABLED,
+    SEEN_FILTER_HASHES,
+    SEEN_FILTER_TTL,
+)
+from .repositories import (
+    CacheRepository,
+    CandidateIndexRepository,
+    FilterStatsRepository,
+    LocalCache,
+    MappingRepository,
+    PassRateRepository,
+    RatingIndexRepository,
+    RecentRepository,
+    SeenFilterRepository,
+)
+from .services.genres_service import GenresService
+from .services.movie_service import MovieResolverService
+from .services.random_service import RandomService
+from .services.refresh import HotCardTracker, RefreshScheduler
+from .services.speculative import PassRateTracker
+
+UPSTREAM_HOSTS = ("tmdb", "kp", "omdb")
+
+
+@dataclass
+class AppContainer:
+    """Clients, repositories and services shared by every request of a worker.
+
+    Built once in the app lifespan and kept on ``app.state.container``. The
+    container also owns the state those clients and services share
+    (breakers, rate limiters, coalescing map, key rotation, hot-card
+    counts) and passes it in through their constructors, so two apps in
+    one process never see each other's state.
+    """
+
+    upstream_breakers: dict[str, CircuitBreaker]
+    upstream_governors: dict[str, UpstreamGovernor]
+    upstream_latency: dict[str, LatencyTracker]
+    upstream_flights: SingleFlight
+    omdb_key_pool: OmdbKeyPool
+    imdb_pass_rates: PassRateTracker
+    hot_cards: HotCardTracker
+    local_cache: LocalCache | None
+    refresh_scheduler: RefreshScheduler | None
+    cache: CacheRepository
+    mappings: MappingRepository
+    recent: RecentRepository
+    tmdb: TmdbClient
+    poiskkino: PoiskkinoClient
+    omdb: OmdbClient
+    candidates: CandidateIndexRepository | None
+    ratings: RatingIndexRepository | None
+    pass_rates: PassRateRepository | None
+    filter_stats: FilterStatsRepository | None
+    seen: SeenFilterRepository | None
+    movie_service: MovieResolverService
+    genres_service: GenresService
+    random_service: RandomService
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        redis: Redis,
+        redis_bytes: Redis,
+        http: httpx.AsyncClient,
+        **overrides: Any,
+    ) -> "AppContainer":
+        """Wire every component; ``overrides`` replace any of them by field name."""
+        unknown = set(overrides) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise TypeError(f"unknown container components: {sorted(unknown)}")
+
+        def part(name: str, factory: Any) -> Any:
+            return overrides[name] if name in overrides else factory()
+
+        breakers = part(
+            "upstream_breakers", lambda: {name: CircuitBreaker(name) for name in UPSTREAM_HOSTS}
+        )
+        governors = part(
+            "upstream_governors", lambda: {name: build_governor(name) for name in UPSTREAM_HOSTS}
+        )
+        latency = part(
+            "upstream_latency",
+            lambda: {name: build_latency_tracker(name) for name in ("tmdb", "kp")},
+        )
+        flights = part("upstream_flights", SingleFlight)
+        omdb_key_pool = part("omdb_key_pool", OmdbKeyPool)
+        imdb_pass_rates = part("imdb_pass_rates", PassRateTracker)
+        hot_cards = part("hot_cards", HotCardTracker)
+        local_cache = part(
+            "local_cache",
+            lambda: LocalCache(
+                rules=CACHE_L1_RULES,
+                max_entries=CACHE_L1_MAX_ENTRIES,
+                max_bytes=CACHE_L1_MAX_BYTES,
+            )
+            if CACHE_L1_ENABLED
+            else None,
+        )
+        refresh_scheduler = part(
+            "refresh_scheduler",
+            lambda: RefreshScheduler(
+                hot_cards,
+                interval_sec=REFRESH_INTERVAL_SEC,
+                top_n=REFRESH_TOP_N,
+                lead_sec=REFRESH_LEAD_SEC,
+                budget=REFRESH_BUDGET,
+                stale_sec=CACHE_STALE_TTL,
+            )
+            if REFRESH_ENABLED
+            else None,
+        )
+        # Rate windows, cooldowns and key quotas are shared by every worker.
+        for governor in governors.values():
+            governor.bind(redis)
+        omdb_key_pool.bind(redis)
+
+        cache = part("cache", lambda: CacheRepository(redis_bytes, local=local_cache))
+        mappings = part("mappings", lambda: MappingRepository(redis))
+        recent = part("recent", lambda: RecentRepository(redis))
+        tmdb = part(
+            "tmdb",
+            lambda: TmdbClient(
+                http,
+                flights=flights,
+                governor=governors["tmdb"],
+                breaker=breakers["tmdb"],
+                latency=latency["tmdb"],
+            ),
+        )
+        poiskkino = part(
+            "poiskkino",
+            lambda: PoiskkinoClient(
+                http,
+                flights=flights,
+                governor=governors["kp"],
+                breaker=breakers["kp"],
+                latency=latency["kp"],
+            ),
+        )
+        omdb = part(
+            "omdb",
+            lambda: OmdbClient(
+                http,
+                flights=flights,
+                governor=governors["omdb"],
+                breaker=breakers["omdb"],
+                keys=omdb_key_pool,
+            ),
+        )
+        candidates = part(
+            "candidates",
+            lambda: CandidateIndexRepository(redis, ttl=CANDIDATE_INDEX_STALE_SEC)
+            if CANDIDATE_INDEX_ENABLED
+            else None,
+        )
+        ratings = part(
+            "ratings",
+            lambda: RatingIndexRepository(redis, max_age=RATING_INDEX_MAX_AGE_SEC)
+            if RATING_INDEX_ENABLED
+            else None,
+        )
+        pass_rates = part(
+            "pass_rates",
+            lambda: PassRateRepository(redis, ttl=PREVIEW_ESTIMATOR_TTL)
+            if PREVIEW_ESTIMATOR_ENABLED
+            else None,
+        )
+        filter_stats = part(
+            "filter_stats",
+            lambda: FilterStatsRepository(redis, ttl=FILTER_STATS_TTL)
+            if FILTER_STATS_ENABLED
+            else None,
+        )
+        seen = part(
+            "seen",
+            lambda: SeenFilterRepository(
+                redis,
+                bits=SEEN_FILTER_BITS,
+                hashes=SEEN_FILTER_HASHES,
+                ttl=SEEN_FILTER_TTL,
+                capacity=SEEN_FILTER_CAPACITY,
+            )
+            if SEEN_FILTER_ENABLED
+            else None,
+        )
+        movie_service = part(
+            "movie_service",
+            lambda: MovieResolverService(
+                cache=cache,
+                mappings=mappings,
+                tmdb=tmdb,
+                poiskkino=poiskkino,
+                omdb=omdb,
+                ratings=ratings,
+                hot_cards=hot_cards,
+            ),
+        )
+        genres_service = part(
+            "genres_service",
+            lambda: GenresService(cache=cache, tmdb=tmdb, poiskkino=poiskkino),
+        )
+        random_service = part(
+            "random_service",
+            lambda: RandomService(
+                cache=cache,
+                recent=recent,
+                tmdb=tmdb,
+                poiskkino=poiskkino,
+                movie_resolver=movie_service,
+                pass_rates=imdb_pass_rates,
+                candidates=candidates,
+                ratings=ratings,
+                rating_stats=pass_rates,
+                filter_stats=filter_stats,
+                seen=seen,
+            ),
+        )
+        return cls(
+            upstream_breakers=breakers,
+            upstream_governors=governors,
+            upstream_latency=latency,
+            upstream_flights=flights,
+            omdb_key_pool=omdb_key_pool,
+            imdb_pass_rates=imdb_pass_rates,
+            hot_cards=hot_cards,
+            local_cache=local_cache,
+            refresh_scheduler=refresh_scheduler,
+            cache=cache,
+            mappings=mappings,
+            recent=recent,
+            tmdb=tmdb,
+            poiskkino=poiskkino,
+            omdb=omdb,
+            candidates=candidates,
+            ratings=ratings,
+            pass_rates=pass_rates,
+            filter_stats=filter_stats,
+            seen=seen,
+            movie_service=movie_service,
+            genres_service=genres_service,
+            random_service=random_service,
+        )
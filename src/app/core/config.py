@@ -6,6 +6,7 @@ TMDB_API_KEY = _settings.tmdb_api_key
 OMDB_API_KEY = _settings.omdb_api_key
 OMDB_API_KEYS = tuple(_settings.omdb_api_keys_list)
 OMDB_MOCK_ENABLED = _settings.omdb_mock_enabled
+OMDB_DAILY_LIMIT = max(1, _settings.omdb_daily_limit)
 KINOPOISK_API_KEY = _settings.kinopoisk_api_key
 
 TMDB_BASE = _settings.tmdb_base
@@ -28,6 +29,61 @@ TTL_GENRES = _settings.ttl_genres
 TTL_MOVIE_DETAIL = _settings.ttl_movie_detail
 TTL_OMDB_NEGATIVE = _settings.ttl_omdb_negative
 TTL_RECENT = _settings.ttl_recent
+TTL_KP_POOL = _settings.ttl_kp_pool
 RECENT_LIMIT = _settings.recent_limit
+SEEN_FILTER_ENABLED = _settings.seen_filter_enabled
+SEEN_FILTER_BITS = max(64, _settings.seen_filter_bits)
+SEEN_FILTER_HASHES = max(1, _settings.seen_filter_hashes)
+SEEN_FILTER_TTL = max(60, _settings.seen_filter_ttl)
+SEEN_FILTER_CAPACITY = max(1, _settings.seen_filter_capacity)
+
+CACHE_LOCK_LEASE_MS = max(100, _settings.cache_lock_lease_ms)
+CACHE_LOCK_WAIT_MS = max(0, _settings.cache_lock_wait_ms)
+CACHE_LOCK_POLL_MS = max(5, _settings.cache_lock_poll_ms)
+CACHE_XFETCH_BETA = max(0.0, _settings.cache_xfetch_beta)
+CACHE_CODEC = _settings.cache_codec.strip().lower()
+CACHE_COMPRESSION = _settings.cache_compression.strip().lower()
+CACHE_COMPRESS_MIN_BYTES = max(0, _settings.cache_compress_min_bytes)
+CACHE_STALE_TTL = max(0, _settings.cache_stale_ttl)
+CACHE_L1_ENABLED = _settings.cache_l1_enabled
+CACHE_L1_RULES = _settings.cache_l1_rules_map
+CACHE_L1_MAX_ENTRIES = max(1, _settings.cache_l1_max_entries)
+CACHE_L1_MAX_BYTES = max(1, _settings.cache_l1_max_bytes)
 
 RU_ENABLED = _settings.ru_enabled
+DISCOVER_PAGE_CONCURRENCY = max(1, _settings.discover_page_concurrency)
+SPECULATIVE_WINDOW_MAX = max(1, _settings.speculative_window_max)
+CANDIDATE_INDEX_ENABLED = _settings.candidate_index_enabled
+CANDIDATE_INDEX_STALE_SEC = max(60, _settings.candidate_index_stale_sec)
+CANDIDATE_INDEX_POOL_FACTOR = max(1.0, _settings.candidate_index_pool_factor)
+RATING_INDEX_ENABLED = _settings.rating_index_enabled
+RATING_INDEX_MAX_AGE_SEC = max(60, _settings.rating_index_max_age_sec)
+RATING_INDEX_SNAPSHOT_PATH = _settings.rating_index_snapshot_path.strip()
+KP_POOL_PAGE_SIZE = min(250, max(1, _settings.kp_pool_page_size))
+PREVIEW_ESTIMATOR_ENABLED = _settings.preview_estimator_enabled
+PREVIEW_ESTIMATOR_MIN_SAMPLES = max(1, _settings.preview_estimator_min_samples)
+PREVIEW_ESTIMATOR_MAX_HALF_WIDTH = max(0.0, _settings.preview_estimator_max_half_width)
+PREVIEW_ESTIMATOR_BATCH = max(1, _settings.preview_estimator_batch)
+PREVIEW_ESTIMATOR_TTL = max(60, _settings.preview_estimator_ttl)
+REFRESH_ENABLED = _settings.refresh_enabled
+REFRESH_INTERVAL_SEC = max(5, _settings.refresh_interval_sec)
+REFRESH_TOP_N = max(1, _settings.refresh_top_n)
+REFRESH_LEAD_SEC = max(0, _settings.refresh_lead_sec)
+REFRESH_BUDGET = max(0, _settings.refresh_budget)
+FILTER_STATS_ENABLED = _settings.filter_stats_enabled
+FILTER_STATS_TTL = max(60, _settings.filter_stats_ttl)
+WARMUP_ON_START = _settings.warmup_on_start
+WARMUP_TOP_FILTERS = max(0, _settings.warmup_top_filters)
+WARMUP_HOT_CARDS = max(0, _settings.warmup_hot_cards)
+WARMUP_POPULAR_PAGES = max(0, _settings.warmup_popular_pages)
+WARMUP_RU_CARDS = max(0, _settings.warmup_ru_cards)
+WARMUP_CONCURRENCY = max(1, _settings.warmup_concurrency)
+WARMUP_RATE = max(0.0, _settings.warmup_rate)
+UPSTREAM_GOVERNOR_ENABLED = _settings.upstream_governor_enabled
+UPSTREAM_LIMITS = _settings.upstream_limits_map
+UPSTREAM_BREAKER_FAILURES = max(1, _settings.upstream_breaker_failures)
+UPSTREAM_BREAKER_RESET_SEC = max(1.0, _settings.upstream_breaker_reset_sec)
+UPSTREAM_HEDGE_ENABLED = _settings.upstream_hedge_enabled
+UPSTREAM_HEDGE_HOSTS = frozenset(_settings.upstream_hedge_hosts_list)
+UPSTREAM_HEDGE_RATIO = min(1.0, max(0.0, _settings.upstream_hedge_ratio))
+METRICS_PUBLISH_INTERVAL_SEC = max(1, _settings.metrics_publish_interval_sec)
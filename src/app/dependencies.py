@@ -1,8 +1,20 @@
 import asyncio
+import logging
+import os
+import re
+import uuid
+from typing import Any, Callable, Optional
+
 import httpx
-from fastapi import HTTPException
+from fastapi import Depends, HTTPException, Request, Response
 from redis.asyncio import from_url, Redis
-from .clients import OmdbClient, PoiskkinoClient, TmdbClient
+from .clients import (
+    OmdbClient,
+    PoiskkinoClient,
+    Priority,
+    TmdbClient,
+    upstream_priority,
+)
 from .core.config import (
     REDIS_URL,
     HTTP_CONNECT_TIMEOUT,
@@ -14,16 +26,48 @@ from .core.config import (
     HTTP_ENABLE_HTTP2,
     HTTP_TRUST_ENV,
     RU_ENABLED,
+    SEEN_FILTER_ENABLED,
+    SEEN_FILTER_TTL,
+    METRICS_PUBLISH_INTERVAL_SEC,
+    RATING_INDEX_SNAPSHOT_PATH,
+    WARMUP_CONCURRENCY,
+    WARMUP_HOT_CARDS,
+    WARMUP_ON_START,
+    WARMUP_POPULAR_PAGES,
+    WARMUP_RATE,
+    WARMUP_RU_CARDS,
+    WARMUP_TOP_FILTERS,
+)
+from .container import AppContainer
+from .observability import metrics
+from .repositories import (
+    CacheRepository,
+    CandidateIndexRepository,
+    FilterStatsRepository,
+    MappingRepository,
+    PassRateRepository,
+    RatingIndexRepository,
+    RatingSnapshot,
+    RecentRepository,
 )
-from .repositories import CacheRepository, MappingRepository, RecentRepository
 from .services.genres_service import GenresService
 from .services.movie_service import MovieResolverService
 from .services.random_service import RandomService
+from .services.warmup import WarmupReport, WarmupRunner
 
 _redis: Redis | None = None
 _redis_lock = asyncio.Lock()
+# Cache payloads are binary (codec header + optional compression).
+_redis_bytes: Redis | None = None
+_redis_bytes_lock = asyncio.Lock()
 _http: httpx.AsyncClient | None = None
 _http_lock = asyncio.Lock()
+_container_lock = asyncio.Lock()
+_warmup_task: asyncio.Task[None] | None = None
+_metrics_task: asyncio.Task[None] | None = None
+_rating_snapshot: RatingSnapshot | None = None
+_rating_snapshot_mtime: float | None = None
+logger = logging.getLogger("uvicorn.error")
 
 
 async def get_redis() -> Redis:
@@ -35,6 +79,15 @@ async def get_redis() -> Redis:
     return _redis
 
 
+async def get_redis_bytes() -> Redis:
+    global _redis_bytes
+    if _redis_bytes is None:
+        async with _redis_bytes_lock:
+            if _redis_bytes is None:
+                _redis_bytes = from_url(REDIS_URL, decode_responses=False)
+    return _redis_bytes
+
+
 async def get_http_client() -> httpx.AsyncClient:
     global _http
     if _http is None:
@@ -62,13 +115,45 @@ async def get_http() -> httpx.AsyncClient:
 
 
 async def close_clients() -> None:
-    global _http, _redis
+    global _http, _redis, _redis_bytes
+    # Containers hold these clients: drop them (app.state.container) first.
     if _http is not None:
         await _http.aclose()
         _http = None
     if _redis is not None:
         await _redis.aclose()
         _redis = None
+    if _redis_bytes is not None:
+        await _redis_bytes.aclose()
+        _redis_bytes = None
+
+
+SESSION_COOKIE = "fs_sid"
+SESSION_HEADER = "X-FilmSpin-Session"
+_SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def get_session_id(request: Request, response: Response) -> Optional[str]:
+    """Anonymous visitor id for the per-session seen filter.
+
+    Only an id the client brings back (header or cookie) is returned. A
+    visitor without one is offered a fresh id in an HttpOnly cookie but
+    uses the shared per-filter history for this request, so clients that
+    drop cookies never get a seen filter of their own.
+    """
+    if not SEEN_FILTER_ENABLED:
+        return None
+    for session in (request.headers.get(SESSION_HEADER), request.cookies.get(SESSION_COOKIE)):
+        if session and _SESSION_ID.match(session):
+            return session
+    response.set_cookie(
+        SESSION_COOKIE,
+        uuid.uuid4().hex,
+        max_age=SEEN_FILTER_TTL,
+        httponly=True,
+        samesite="lax",
+    )
+    return None
 
 
 def require_ru_enabled() -> None:
@@ -76,72 +161,220 @@ def require_ru_enabled() -> None:
         raise HTTPException(status_code=404, detail="Not found")
 
 
-async def get_cache_repo() -> CacheRepository:
-    redis = await get_redis()
-    return CacheRepository(redis)
+async def build_container(**overrides: Any) -> AppContainer:
+    """A new container over this process's Redis and HTTP clients."""
+    return AppContainer.build(
+        redis=await get_redis(),
+        redis_bytes=await get_redis_bytes(),
+        http=await get_http_client(),
+        **overrides,
+    )
 
 
-async def get_mapping_repo() -> MappingRepository:
-    redis = await get_redis()
-    return MappingRepository(redis)
+async def get_container(request: Request) -> AppContainer:
+    """The app's container; built on first use when lifespan did not run."""
+    state = request.app.state
+    container: AppContainer | None = getattr(state, "container", None)
+    if container is None:
+        async with _container_lock:
+            container = getattr(state, "container", None)
+            if container is None:
+                container = state.container = await build_container()
+    if container.ratings is not None and RATING_INDEX_SNAPSHOT_PATH:
+        # The snapshot file may be re-exported while the worker runs.
+        container.ratings.snapshot = _current_rating_snapshot()
+    return container
 
 
-async def get_recent_repo() -> RecentRepository:
-    redis = await get_redis()
-    return RecentRepository(redis)
+def close_rating_snapshot() -> None:
+    global _rating_snapshot, _rating_snapshot_mtime
+    if _rating_snapshot is not None:
+        _rating_snapshot.close()
+        _rating_snapshot = None
+        _rating_snapshot_mtime = None
 
 
-async def get_tmdb_client() -> TmdbClient:
-    client = await get_http_client()
-    return TmdbClient(client)
+async def get_cache_repo(
+    container: AppContainer = Depends(get_container),
+) -> CacheRepository:
+    return container.cache
 
 
-async def get_poiskkino_client() -> PoiskkinoClient:
-    client = await get_http_client()
-    return PoiskkinoClient(client)
+async def get_mapping_repo(
+    container: AppContainer = Depends(get_container),
+) -> MappingRepository:
+    return container.mappings
 
 
-async def get_omdb_client() -> OmdbClient:
-    client = await get_http_client()
-    return OmdbClient(client)
+async def get_recent_repo(
+    container: AppContainer = Depends(get_container),
+) -> RecentRepository:
+    return container.recent
 
 
-async def get_movie_service() -> MovieResolverService:
-    redis = await get_redis()
-    client = await get_http_client()
-    return MovieResolverService(
-        cache=CacheRepository(redis),
-        mappings=MappingRepository(redis),
-        tmdb=TmdbClient(client),
-        poiskkino=PoiskkinoClient(client),
-        omdb=OmdbClient(client),
-    )
+async def get_candidate_repo(
+    container: AppContainer = Depends(get_container),
+) -> CandidateIndexRepository | None:
+    return container.candidates
 
 
-async def get_genres_service() -> GenresService:
-    redis = await get_redis()
-    client = await get_http_client()
-    return GenresService(
-        cache=CacheRepository(redis),
-        tmdb=TmdbClient(client),
-        poiskkino=PoiskkinoClient(client),
+def _current_rating_snapshot() -> RatingSnapshot | None:
+    """Map the exported rating snapshot, re-mapping it when the file changes."""
+    global _rating_snapshot, _rating_snapshot_mtime
+    if not RATING_INDEX_SNAPSHOT_PATH:
+        return None
+    try:
+        mtime = os.stat(RATING_INDEX_SNAPSHOT_PATH).st_mtime
+    except OSError:
+        return _rating_snapshot
+    if mtime != _rating_snapshot_mtime:
+        _rating_snapshot_mtime = mtime
+        try:
+            snapshot = RatingSnapshot(RATING_INDEX_SNAPSHOT_PATH)
+        except (OSError, ValueError) as exc:
+            logger.warning(
+                "[FilmSpin] rating snapshot unreadable: path=%s error=%s",
+                RATING_INDEX_SNAPSHOT_PATH,
+                exc.__class__.__name__,
+            )
+        else:
+            if _rating_snapshot is not None:
+                _rating_snapshot.close()
+            _rating_snapshot = snapshot
+    return _rating_snapshot
+
+
+async def get_rating_repo(
+    container: AppContainer = Depends(get_container),
+) -> RatingIndexRepository | None:
+    return container.ratings
+
+
+async def get_pass_rate_repo(
+    container: AppContainer = Depends(get_container),
+) -> PassRateRepository | None:
+    return container.pass_rates
+
+
+async def get_filter_stats_repo(
+    container: AppContainer = Depends(get_container),
+) -> FilterStatsRepository | None:
+    return container.filter_stats
+
+
+async def get_tmdb_client(
+    container: AppContainer = Depends(get_container),
+) -> TmdbClient:
+    return container.tmdb
+
+
+async def get_poiskkino_client(
+    container: AppContainer = Depends(get_container),
+) -> PoiskkinoClient:
+    return container.poiskkino
+
+
+async def get_omdb_client(
+    container: AppContainer = Depends(get_container),
+) -> OmdbClient:
+    return container.omdb
+
+
+async def get_movie_service(
+    container: AppContainer = Depends(get_container),
+) -> MovieResolverService:
+    return container.movie_service
+
+
+def start_background_jobs(container: AppContainer) -> None:
+    global _warmup_task, _metrics_task
+    if container.refresh_scheduler is not None:
+        container.refresh_scheduler.start(
+            get_redis, MovieResolverService._norm_key, container.movie_service.refresh_card
+        )
+    if WARMUP_ON_START and _warmup_task is None:
+        with upstream_priority(Priority.BACKGROUND):
+            _warmup_task = asyncio.create_task(_warm_up_once(container))
+    if _metrics_task is None:
+        _metrics_task = asyncio.create_task(_publish_metrics())
+
+
+async def stop_background_jobs(container: AppContainer) -> None:
+    global _warmup_task, _metrics_task
+    if container.refresh_scheduler is not None:
+        await container.refresh_scheduler.stop()
+    if _warmup_task is not None:
+        _warmup_task.cancel()
+        await asyncio.gather(_warmup_task, return_exceptions=True)
+        _warmup_task = None
+    if _metrics_task is not None:
+        _metrics_task.cancel()
+        await asyncio.gather(_metrics_task, return_exceptions=True)
+        _metrics_task = None
+
+
+async def get_genres_service(
+    container: AppContainer = Depends(get_container),
+) -> GenresService:
+    return container.genres_service
+
+
+async def get_random_service(
+    container: AppContainer = Depends(get_container),
+) -> RandomService:
+    return container.random_service
+
+
+async def get_warmup_runner(
+    container: AppContainer,
+    *,
+    concurrency: int = WARMUP_CONCURRENCY,
+    rate: float = WARMUP_RATE,
+    progress: Callable[[WarmupReport], None] | None = None,
+) -> WarmupRunner:
+    return WarmupRunner(
+        redis=await get_redis(),
+        genres=container.genres_service,
+        random_service=container.random_service,
+        movie_resolver=container.movie_service,
+        tmdb=container.tmdb,
+        mappings=container.mappings,
+        filter_stats=container.filter_stats,
+        concurrency=concurrency,
+        rate=rate,
+        ru_enabled=RU_ENABLED,
+        progress=progress,
     )
 
 
-async def get_random_service() -> RandomService:
+async def _warm_up_once(container: AppContainer) -> None:
     redis = await get_redis()
-    client = await get_http_client()
-    cache = CacheRepository(redis)
-    return RandomService(
-        cache=cache,
-        recent=RecentRepository(redis),
-        tmdb=TmdbClient(client),
-        poiskkino=PoiskkinoClient(client),
-        movie_resolver=MovieResolverService(
-            cache=cache,
-            mappings=MappingRepository(redis),
-            tmdb=TmdbClient(client),
-            poiskkino=PoiskkinoClient(client),
-            omdb=OmdbClient(client),
-        ),
-    )
+    # Every worker starts this task; only the refresh leader runs it, at most
+    # once an hour, so the fleet spends one warm-up's worth of upstream quota.
+    scheduler = container.refresh_scheduler
+    if scheduler is not None and not await scheduler.hold_lease(redis):
+        return
+    if not await redis.set("lock:warmup", "1", nx=True, ex=60 * 60):
+        return
+    try:
+        runner = await get_warmup_runner(container)
+        await runner.run(
+            top_filters=WARMUP_TOP_FILTERS,
+            hot_cards=WARMUP_HOT_CARDS,
+            popular_pages=WARMUP_POPULAR_PAGES,
+            ru_cards=WARMUP_RU_CARDS,
+        )
+    except Exception as exc:
+        logger.warning("[FilmSpin] warm-up failed: error=%s", exc.__class__.__name__)
+
+
+async def _publish_metrics() -> None:
+    # Prometheus scrapes one worker; it reads the totals every worker adds to.
+    while True:
+        try:
+            await metrics.publish(await get_redis())
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] metrics publish failed: error=%s", exc.__class__.__name__
+            )
+        await asyncio.sleep(METRICS_PUBLISH_INTERVAL_SEC)
@@ -11,16 +11,28 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from .core.config import CORS_ALLOW_ORIGINS
-from .dependencies import close_clients
+from .dependencies import (
+    build_container,
+    close_clients,
+    close_rating_snapshot,
+    start_background_jobs,
+    stop_background_jobs,
+)
 from .observability import metrics
 from .routers import genres, random, movie, config
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI):
+async def lifespan(app: FastAPI):
+    container = app.state.container = await build_container()
+    start_background_jobs(container)
     try:
         yield
     finally:
+        # Reverse order: jobs use the container, the container uses the clients.
+        await stop_background_jobs(container)
+        app.state.container = None
+        close_rating_snapshot()
         await close_clients()
 
 
@@ -42,10 +54,15 @@ def create_app() -> FastAPI:
             response = await call_next(request)
         except Exception:
             duration_ms = (time.perf_counter() - started) * 1000
-            metrics.observe(request.url.path, 500, duration_ms)
+            metrics.observe(_route_label(request, 500), 500, duration_ms, request.method)
             raise
         duration_ms = (time.perf_counter() - started) * 1000
-        metrics.observe(request.url.path, response.status_code, duration_ms)
+        metrics.observe(
+            _route_label(request, response.status_code),
+            response.status_code,
+            duration_ms,
+            request.method,
+        )
         response.headers["X-Request-ID"] = request_id
         return response
 
@@ -93,6 +110,15 @@ def create_app() -> FastAPI:
     return app
 
 
+def _route_label(request: Request, status_code: int) -> str:
+    # Route templates, not raw paths: static files and ids would explode cardinality.
+    route = request.scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    return "static" if status_code < 400 else "unmatched"
+
+
 def _sanitize_url(url: httpx.URL) -> str:
     parts = urlsplit(str(url))
     # Never log query params to avoid leaking API keys/tokens in server logs.
@@ -1,38 +1,347 @@
+import json
+import logging
+import re
 from collections import defaultdict
 from threading import Lock
+from typing import Any, Iterable, Optional
+
+from redis.asyncio import Redis
 
 from .schemas import MetricsOut
 
+logger = logging.getLogger("uvicorn.error")
+
+# Seconds. Every worker uses the same bounds, so their buckets can be summed.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help, label names)
+FAMILIES: dict[str, tuple[str, str, tuple[str, ...]]] = {
+    "filmspin_http_requests_total": (
+        "counter",
+        "HTTP requests by route template, method and status.",
+        ("route", "method", "status"),
+    ),
+    "filmspin_http_request_duration_seconds": (
+        "histogram",
+        "HTTP request latency by route template.",
+        ("route", "method"),
+    ),
+    "filmspin_stage_duration_seconds": (
+        "histogram",
+        "Movie card resolve stage latency.",
+        ("stage",),
+    ),
+    "filmspin_upstream_requests_total": (
+        "counter",
+        "Upstream HTTP calls by host, endpoint and status.",
+        ("host", "endpoint", "status"),
+    ),
+    "filmspin_upstream_request_duration_seconds": (
+        "histogram",
+        "Upstream HTTP call latency by host and endpoint.",
+        ("host", "endpoint"),
+    ),
+    "filmspin_cache_requests_total": (
+        "counter",
+        "Cache lookups by key prefix and result (hit, miss, stale).",
+        ("prefix", "result"),
+    ),
+    "filmspin_cache_stale_served_total": (
+        "counter",
+        "Soft-expired cache entries served, by key prefix.",
+        ("prefix",),
+    ),
+}
+
+_ID_SEGMENT = re.compile(r"^(?:\d+|tt\d+)$")
+
+
+def endpoint_label(path: str) -> str:
+    """"/3/movie/550/credits" -> "/3/movie/{id}/credits"; raw ids explode cardinality."""
+    parts = path.split("/")
+    # The first segment is the API version (TMDB's "/3"), never an id.
+    return "/".join(
+        part if index <= 1 or not _ID_SEGMENT.match(part) else "{id}"
+        for index, part in enumerate(parts)
+    ) or "/"
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self) -> None:
+        # Per-bucket (not cumulative) counts; the +Inf bucket is ``count``.
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += seconds
+        self.count += 1
+
 
 class InMemoryMetrics:
+    """Per-worker counters and latency histograms.
+
+    ``snapshot()`` feeds the JSON /api/metrics of the worker that answers.
+    For Prometheus every worker adds what it counted since its last publish
+    to one Redis hash, so the totals only ever grow: a worker that exits
+    keeps its share and a scrape never sees a counter go backwards.
+    """
+
+    TOTALS_KEY = "metrics:v1:totals"
+
     def __init__(self) -> None:
         self._lock = Lock()
-        self._requests_total = 0
-        self._by_path: dict[str, int] = defaultdict(int)
-        self._by_status: dict[str, int] = defaultdict(int)
-        self._sum_ms_by_path: dict[str, float] = defaultdict(float)
-        self._count_by_path: dict[str, int] = defaultdict(int)
+        self._counters: dict[str, dict[tuple[str, ...], float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self._histograms: dict[str, dict[tuple[str, ...], _Histogram]] = defaultdict(
+            lambda: defaultdict(_Histogram)
+        )
+        # Hash field -> value already added to the shared totals.
+        self._published: dict[str, float] = {}
+
+    def observe(
+        self, route: str, status_code: int, duration_ms: float, method: str = "GET"
+    ) -> None:
+        with self._lock:
+            self._counters["filmspin_http_requests_total"][
+                (route, method, str(status_code))
+            ] += 1
+            self._histograms["filmspin_http_request_duration_seconds"][
+                (route, method)
+            ].observe(duration_ms / 1000)
+
+    def observe_stage(self, stage: str, duration_ms: float) -> None:
+        with self._lock:
+            self._histograms["filmspin_stage_duration_seconds"][(stage,)].observe(
+                duration_ms / 1000
+            )
+
+    def observe_upstream(
+        self, host: str, endpoint: str, status: int | str, duration_ms: float
+    ) -> None:
+        endpoint = endpoint_label(endpoint)
+        with self._lock:
+            self._counters["filmspin_upstream_requests_total"][
+                (host, endpoint, str(status))
+            ] += 1
+            self._histograms["filmspin_upstream_request_duration_seconds"][
+                (host, endpoint)
+            ].observe(duration_ms / 1000)
 
-    def observe(self, path: str, status_code: int, duration_ms: float) -> None:
+    def observe_cache(self, prefix: str, result: str) -> None:
         with self._lock:
-            self._requests_total += 1
-            self._by_path[path] += 1
-            self._by_status[str(status_code)] += 1
-            self._sum_ms_by_path[path] += duration_ms
-            self._count_by_path[path] += 1
+            self._counters["filmspin_cache_requests_total"][(prefix, result)] += 1
+
+    def observe_stale(self, namespace: str) -> None:
+        with self._lock:
+            self._counters["filmspin_cache_stale_served_total"][(namespace,)] += 1
 
     def snapshot(self) -> MetricsOut:
         with self._lock:
+            requests = self._counters["filmspin_http_requests_total"]
+            by_path: dict[str, int] = defaultdict(int)
+            by_status: dict[str, int] = defaultdict(int)
+            for (route, _, status), value in requests.items():
+                by_path[route] += int(value)
+                by_status[status] += int(value)
+            sum_by_path: dict[str, float] = defaultdict(float)
+            count_by_path: dict[str, int] = defaultdict(int)
+            for (route, _), hist in self._histograms[
+                "filmspin_http_request_duration_seconds"
+            ].items():
+                sum_by_path[route] += hist.sum
+                count_by_path[route] += hist.count
             avg_ms_by_path = {
-                p: round(self._sum_ms_by_path[p] / max(1, self._count_by_path[p]), 2)
-                for p in self._count_by_path
+                p: round(sum_by_path[p] * 1000 / max(1, count_by_path[p]), 2)
+                for p in count_by_path
+            }
+            avg_ms_by_stage = {
+                stage: round(hist.sum * 1000 / max(1, hist.count), 2)
+                for (stage,), hist in self._histograms["filmspin_stage_duration_seconds"].items()
             }
+            cache: dict[str, dict[str, int]] = defaultdict(dict)
+            for (prefix, result), value in self._counters[
+                "filmspin_cache_requests_total"
+            ].items():
+                cache[prefix][result] = int(value)
             return MetricsOut(
-                requests_total=self._requests_total,
-                by_path=dict(self._by_path),
-                by_status=dict(self._by_status),
+                requests_total=sum(by_path.values()),
+                by_path=dict(by_path),
+                by_status=dict(by_status),
                 avg_ms_by_path=avg_ms_by_path,
+                avg_ms_by_stage=avg_ms_by_stage,
+                stale_served={
+                    prefix: int(value)
+                    for (prefix,), value in self._counters[
+                        "filmspin_cache_stale_served_total"
+                    ].items()
+                },
+                cache_by_prefix=dict(cache),
             )
 
+    def export(self) -> dict[str, Any]:
+        """This worker's state as plain JSON-able data."""
+        with self._lock:
+            return {
+                "counters": {
+                    name: [[list(labels), value] for labels, value in series.items()]
+                    for name, series in self._counters.items()
+                },
+                "histograms": {
+                    name: [
+                        [list(labels), list(hist.counts), hist.sum, hist.count]
+                        for labels, hist in series.items()
+                    ]
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    @staticmethod
+    def _fields(state: dict[str, Any]) -> dict[str, float]:
+        """One hash field per counter series, histogram bucket, sum and count."""
+        fields: dict[str, float] = {}
+        for name, series in (state.get("counters") or {}).items():
+            for labels, value in series:
+                fields[_field(name, labels, "")] = value
+        for name, series in (state.get("histograms") or {}).items():
+            for labels, counts, total, count in series:
+                for index, bucket in enumerate(counts):
+                    fields[_field(name, labels, index)] = bucket
+                fields[_field(name, labels, "sum")] = total
+                fields[_field(name, labels, "count")] = count
+        return fields
+
+    @staticmethod
+    def _from_fields(fields: dict[str, Any]) -> dict[str, Any]:
+        counters: dict[str, dict[tuple[str, ...], float]] = defaultdict(dict)
+        histograms: dict[str, dict[tuple[str, ...], list[Any]]] = defaultdict(dict)
+        for raw, value in fields.items():
+            try:
+                name, labels, part = json.loads(raw)
+                amount = float(value)
+            except (TypeError, ValueError):
+                continue
+            if name not in FAMILIES:
+                continue
+            key = tuple(labels)
+            if part == "":
+                counters[name][key] = amount
+                continue
+            hist = histograms[name].setdefault(key, [[0.0] * len(LATENCY_BUCKETS), 0.0, 0.0])
+            if part == "sum":
+                hist[1] = amount
+            elif part == "count":
+                hist[2] = amount
+            elif isinstance(part, int) and 0 <= part < len(LATENCY_BUCKETS):
+                hist[0][part] = amount
+        return {
+            "counters": {
+                name: [[list(labels), value] for labels, value in series.items()]
+                for name, series in counters.items()
+            },
+            "histograms": {
+                name: [[list(labels), *hist] for labels, hist in series.items()]
+                for name, series in histograms.items()
+            },
+        }
+
+    async def publish(self, redis: Redis) -> None:
+        """Add everything counted since the last publish to the shared totals."""
+        current = self._fields(self.export())
+        with self._lock:
+            delta = {
+                field: value - self._published.get(field, 0)
+                for field, value in current.items()
+                if value != self._published.get(field, 0)
+            }
+            # Claimed before the await so a concurrent publish cannot add it twice.
+            self._published.update(current)
+        if not delta:
+            return
+        try:
+            pipe = redis.pipeline(transaction=True)
+            for field, amount in delta.items():
+                pipe.hincrbyfloat(self.TOTALS_KEY, field, amount)
+            await pipe.execute()
+        except BaseException:
+            with self._lock:
+                for field, amount in delta.items():
+                    self._published[field] -= amount
+            raise
+
+    async def collect(self, redis: Redis) -> Optional[dict[str, Any]]:
+        """Totals of every worker that ever published; None without Redis.
+
+        Falling back to this worker's own numbers would look like a counter
+        reset to Prometheus, so a failed read fails the scrape instead.
+        """
+        try:
+            await self.publish(redis)
+            fields = await redis.hgetall(self.TOTALS_KEY)
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] metrics aggregation unavailable: error=%s",
+                exc.__class__.__name__,
+            )
+            return None
+        return self._from_fields(fields)
+
+    @staticmethod
+    def render(state: dict[str, Any]) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines: list[str] = []
+        counters = state.get("counters") or {}
+        histograms = state.get("histograms") or {}
+        for name, (kind, help_text, label_names) in FAMILIES.items():
+            series = counters.get(name) if kind == "counter" else histograms.get(name)
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for item in sorted(series, key=lambda entry: entry[0]):
+                labels = dict(zip(label_names, item[0], strict=False))
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(labels)} {_number(item[1])}")
+                    continue
+                _, counts, total, count = item
+                cumulative = 0
+                for bound, bucket in zip(LATENCY_BUCKETS, counts, strict=False):
+                    cumulative += bucket
+                    le = _labels({**labels, "le": f"{bound:g}"})
+                    lines.append(f"{name}_bucket{le} {_number(cumulative)}")
+                inf = _labels({**labels, "le": "+Inf"})
+                lines.append(f"{name}_bucket{inf} {_number(count)}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {_number(count)}")
+        return "\n".join(lines) + "\n"
+
+
+def _field(name: str, labels: Iterable[str], part: int | str) -> str:
+    return json.dumps([name, list(labels), part], separators=(",", ":"), ensure_ascii=False)
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for key, value in labels.items()
+    )
+    return "{" + body + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
 
 metrics = InMemoryMetrics()
@@ -1,5 +1,33 @@
-from .cache_repo import CacheRepository
+from .cache_repo import CacheRepository, force_refresh
+from .candidate_repo import CandidateIndexRepository, CandidatePool
+from .filter_stats_repo import FilterStatsRepository
+from .local_cache import LocalCache
 from .mapping_repo import MappingRepository
+from .passrate_repo import PassRateRepository
+from .rating_repo import RatingEntry, RatingIndexRepository, RatingSnapshot
 from .recent_repo import RecentRepository
+from .seen_repo import SeenFilterRepository
+from .snapshot_repo import (
+    DEFAULT_SNAPSHOT_PATTERNS,
+    CacheSnapshotRepository,
+    SnapshotStats,
+)
 
-__all__ = ["CacheRepository", "RecentRepository", "MappingRepository"]
+__all__ = [
+    "DEFAULT_SNAPSHOT_PATTERNS",
+    "CacheRepository",
+    "CacheSnapshotRepository",
+    "CandidateIndexRepository",
+    "CandidatePool",
+    "FilterStatsRepository",
+    "LocalCache",
+    "RecentRepository",
+    "MappingRepository",
+    "PassRateRepository",
+    "RatingEntry",
+    "RatingIndexRepository",
+    "RatingSnapshot",
+    "SeenFilterRepository",
+    "SnapshotStats",
+    "force_refresh",
+]
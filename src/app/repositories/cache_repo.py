@@ -1,13 +1,52 @@
+import asyncio
 import hashlib
-import json
-from typing import Any, Optional, Tuple
+import logging
+import math
+import random
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional, Tuple
 
 from redis.asyncio import Redis
 
+from ..core.config import (
+    CACHE_LOCK_LEASE_MS,
+    CACHE_LOCK_POLL_MS,
+    CACHE_LOCK_WAIT_MS,
+    CACHE_STALE_TTL,
+    CACHE_XFETCH_BETA,
+)
+from ..observability import metrics
+from .codecs import CacheCodec, default_codec
+from .local_cache import LocalCache
+
+logger = logging.getLogger("uvicorn.error")
+
+_ENVELOPE = "__fs"
+# Set by background refreshes: get_or_compute rebuilds even when the key is warm.
+force_refresh: ContextVar[bool] = ContextVar("filmspin_force_refresh", default=False)
+# Background revalidations of stale keys: strong refs, one per key.
+_revalidations: dict[str, asyncio.Task[None]] = {}
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
 
 class CacheRepository:
-    def __init__(self, redis: Redis) -> None:
+    def __init__(
+        self,
+        redis: Redis,
+        *,
+        local: LocalCache | None = None,
+        codec: CacheCodec | None = None,
+    ) -> None:
         self.redis = redis
+        self.local = local
+        self.codec = codec or default_codec
 
     @staticmethod
     def filters_key(*parts: Any) -> str:
@@ -15,14 +54,298 @@ class CacheRepository:
         return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
     async def get_json(self, key: str) -> Optional[Any]:
-        raw = await self.redis.get(key)
-        return json.loads(raw) if raw else None
+        hit, value = await self.get_json_hit(key)
+        return value if hit else None
 
     async def get_json_hit(self, key: str) -> Tuple[bool, Optional[Any]]:
-        raw = await self.redis.get(key)
+        raw = await self._get_raw(key)
+        hit, value = self._load(key, raw) if raw is not None else (False, None)
+        metrics.observe_cache(self._namespace(key), "hit" if hit else "miss")
+        return hit, value
+
+    async def get_stale(self, key: str) -> Optional[Any]:
+        """The stored value even past its soft expiry, for stale-if-error."""
+        raw = await self._get_raw(key)
         if raw is None:
-            return False, None
-        return True, json.loads(raw)
+            return None
+        hit, value = self._load(key, raw, allow_stale=True)
+        if hit:
+            metrics.observe_stale(self._namespace(key))
+        return value if hit else None
+
+    async def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Fetch several keys in one round-trip; the result only holds hits."""
+        found: dict[str, Any] = {}
+        remote: list[str] = []
+        for key in dict.fromkeys(keys):
+            if self.local is not None and self.local.enabled_for(key):
+                hit, raw = self.local.get(key)
+                if hit and raw is not None:
+                    loaded, value = self._load(key, raw)
+                    if loaded:
+                        found[key] = value
+                        metrics.observe_cache(self._namespace(key), "hit")
+                        continue
+                    # Soft-expired here, but another worker may have refreshed it.
+                    self.local.invalidate(key)
+            remote.append(key)
+        if remote:
+            values = await self.redis.mget(remote)
+            for key, raw in zip(remote, values, strict=False):
+                loaded, value = self._load(key, raw) if raw is not None else (False, None)
+                if loaded:
+                    found[key] = value
+                metrics.observe_cache(self._namespace(key), "hit" if loaded else "miss")
+        return found
 
     async def set_json(self, key: str, value: Any, ttl: int) -> None:
-        await self.redis.set(key, json.dumps(value, ensure_ascii=False), ex=ttl)
+        await self._set_raw(key, self.codec.encode(self._wrap(value, ttl)), ttl)
+
+    async def add_many(self, values: dict[str, Any], ttl: int) -> None:
+        """Write several keys in one round-trip, keeping any that already exist."""
+        if not values:
+            return
+        pipe = self.redis.pipeline()
+        for key, value in values.items():
+            raw = self.codec.encode(self._wrap(value, ttl))
+            pipe.set(key, raw, ex=ttl + CACHE_STALE_TTL, nx=True)
+        await pipe.execute()
+
+    def _load(
+        self, key: str, raw: str | bytes, *, allow_stale: bool = False
+    ) -> Tuple[bool, Optional[Any]]:
+        entry = self._load_entry(key, raw)
+        if entry is None or (not allow_stale and self._is_stale(entry[2])):
+            return False, None
+        return True, entry[0]
+
+    def _load_entry(
+        self, key: str, raw: str | bytes
+    ) -> Optional[tuple[Any, Optional[float], Optional[float]]]:
+        try:
+            return self._unwrap(self.codec.decode(raw))
+        except Exception as exc:
+            # An unreadable entry is just a miss; the next write replaces it.
+            logger.info(
+                "[FilmSpin] cache decode failed: key=%s error=%s",
+                key,
+                exc.__class__.__name__,
+            )
+            return None
+
+    async def _get_raw(self, key: str) -> Optional[str | bytes]:
+        if self.local is None or not self.local.enabled_for(key):
+            return await self.redis.get(key)
+        hit, raw = self.local.get(key)
+        if hit:
+            return raw
+        pipe = self.redis.pipeline()
+        pipe.get(key)
+        pipe.pttl(key)
+        raw, pttl = await pipe.execute()
+        if raw is not None and isinstance(pttl, int) and pttl > 0:
+            self.local.put(key, raw, pttl / 1000)
+        return raw
+
+    async def _set_raw(self, key: str, raw: str | bytes, ttl: int) -> None:
+        # Kept past its soft expiry so it can still be served stale.
+        hard_ttl = ttl + CACHE_STALE_TTL
+        await self.redis.set(key, raw, ex=hard_ttl)
+        if self.local is not None and self.local.enabled_for(key):
+            self.local.put(key, raw, hard_ttl)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        ttl: int | Callable[[Any], int],
+        producer: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the cached value for ``key`` or build it with ``producer``.
+
+        Only one worker recomputes a missing key at a time (short Redis lease);
+        the others poll for its result. Hits may be refreshed slightly before
+        they expire (XFetch), so hot keys rarely go cold at all. Past its
+        soft expiry a value is still returned at once while one background
+        task refreshes it; if that refresh fails the stale value stays.
+        """
+        if force_refresh.get():
+            token = await self._acquire_lock(key)
+            try:
+                return await self._compute_and_store(key, ttl, producer)
+            finally:
+                if token is not None:
+                    await self._release_lock(key, token)
+
+        raw = await self._get_raw(key)
+        entry = self._load_entry(key, raw) if raw is not None else None
+        if entry is None:
+            metrics.observe_cache(self._namespace(key), "miss")
+        else:
+            value, delta, expires_at = entry
+            stale = self._is_stale(expires_at)
+            metrics.observe_cache(self._namespace(key), "stale" if stale else "hit")
+            if stale:
+                metrics.observe_stale(self._namespace(key))
+                self._revalidate_later(key, ttl, producer)
+                return value
+            if not self._should_refresh_early(delta, expires_at):
+                return value
+            token = await self._acquire_lock(key)
+            if token is None:
+                return value
+            try:
+                return await self._compute_and_store(key, ttl, producer)
+            except Exception as exc:
+                logger.info(
+                    "[FilmSpin] early cache refresh failed: key=%s error=%s",
+                    key,
+                    exc.__class__.__name__,
+                )
+                return value
+            finally:
+                await self._release_lock(key, token)
+
+        token = await self._acquire_lock(key)
+        if token is None:
+            hit, value = await self._wait_for_value(key)
+            if hit:
+                return value
+            # The lease holder failed or is too slow; compute without the lock.
+            return await self._compute_and_store(key, ttl, producer)
+        try:
+            return await self._compute_and_store(key, ttl, producer)
+        finally:
+            await self._release_lock(key, token)
+
+    async def _compute_and_store(
+        self,
+        key: str,
+        ttl: int | Callable[[Any], int],
+        producer: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        started = time.perf_counter()
+        value = await producer()
+        delta = time.perf_counter() - started
+        ttl_sec = ttl(value) if callable(ttl) else ttl
+        envelope = self._wrap(value, ttl_sec, delta=delta)
+        await self._set_raw(key, self.codec.encode(envelope), ttl_sec)
+        return value
+
+    def _revalidate_later(
+        self,
+        key: str,
+        ttl: int | Callable[[Any], int],
+        producer: Callable[[], Awaitable[Any]],
+    ) -> None:
+        running = _revalidations.get(key)
+        if running is not None and not running.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._revalidate(key, ttl, producer))
+        _revalidations[key] = task
+        task.add_done_callback(lambda done: self._forget_revalidation(key, done))
+
+    @staticmethod
+    def _forget_revalidation(key: str, task: asyncio.Task[None]) -> None:
+        if _revalidations.get(key) is task:
+            del _revalidations[key]
+
+    async def _revalidate(
+        self,
+        key: str,
+        ttl: int | Callable[[Any], int],
+        producer: Callable[[], Awaitable[Any]],
+    ) -> None:
+        token = await self._acquire_lock(key)
+        if token is None:
+            return
+        try:
+            await self._compute_and_store(key, ttl, producer)
+        except Exception as exc:
+            # Stale-if-error: the old value keeps being served until its hard TTL.
+            logger.info(
+                "[FilmSpin] stale cache refresh failed: key=%s error=%s",
+                key,
+                exc.__class__.__name__,
+            )
+        finally:
+            await self._release_lock(key, token)
+
+    @staticmethod
+    def _wrap(value: Any, ttl: int, *, delta: Optional[float] = None) -> dict[str, Any]:
+        envelope: dict[str, Any] = {
+            _ENVELOPE: 1,
+            "v": value,
+            "x": round(time.time() + ttl, 3),
+        }
+        if delta is not None:
+            envelope["d"] = round(delta, 4)
+        return envelope
+
+    @staticmethod
+    def _is_stale(expires_at: Optional[float]) -> bool:
+        return expires_at is not None and time.time() >= expires_at
+
+    @staticmethod
+    def _namespace(key: str) -> str:
+        # "raw:tmdb:v4:550:en-US" -> "raw:tmdb", "omdb:tt0137523" -> "omdb"
+        parts = key.split(":", 2)
+        if len(parts) > 1 and parts[1].isalpha():
+            return f"{parts[0]}:{parts[1]}"
+        return parts[0]
+
+    @staticmethod
+    def _unwrap(payload: Any) -> tuple[Any, Optional[float], Optional[float]]:
+        if isinstance(payload, dict) and payload.get(_ENVELOPE) == 1:
+            return payload.get("v"), payload.get("d"), payload.get("x")
+        return payload, None, None
+
+    @staticmethod
+    def _should_refresh_early(
+        delta: Optional[float], expires_at: Optional[float]
+    ) -> bool:
+        if delta is None or expires_at is None or delta <= 0 or CACHE_XFETCH_BETA <= 0:
+            return False
+        # XFetch: the closer to expiry and the slower the recompute, the more
+        # likely a reader volunteers to refresh now.
+        gap = -delta * CACHE_XFETCH_BETA * math.log(1.0 - random.random())
+        return time.time() + gap >= expires_at
+
+    @staticmethod
+    def _lock_key(key: str) -> str:
+        return f"lock:{key}"
+
+    async def _acquire_lock(self, key: str) -> Optional[str]:
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(
+            self._lock_key(key), token, nx=True, px=CACHE_LOCK_LEASE_MS
+        )
+        return token if acquired else None
+
+    async def _release_lock(self, key: str, token: str) -> None:
+        try:
+            await self.redis.eval(_RELEASE_LOCK, 1, self._lock_key(key), token)
+        except Exception as exc:
+            # The lease expires on its own; never fail a request over it.
+            logger.info(
+                "[FilmSpin] cache lock release failed: key=%s error=%s",
+                key,
+                exc.__class__.__name__,
+            )
+
+    async def _wait_for_value(self, key: str) -> Tuple[bool, Optional[Any]]:
+        deadline = time.monotonic() + CACHE_LOCK_WAIT_MS / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(CACHE_LOCK_POLL_MS / 1000)
+            pipe = self.redis.pipeline()
+            pipe.get(key)
+            pipe.exists(self._lock_key(key))
+            raw, locked = await pipe.execute()
+            if raw is not None:
+                return self._load(key, raw)
+            if not locked:
+                break
+        return False, None
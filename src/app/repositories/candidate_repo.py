@@ -0,0 +1,144 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+from redis.asyncio import Redis
+
+
+@dataclass
+class CandidatePool:
+    items: dict[int, dict[str, Any]]
+    pages: set[int] = field(default_factory=set)
+    total_pages: int = 0
+    total_results: int = 0
+    refreshed_at: float = 0.0
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.refreshed_at
+
+
+class CandidateIndexRepository:
+    """Discover results already seen for one set of discover params.
+
+    Each movie is stored as the compact tuple the candidate weighting needs
+    (vote_average, popularity, vote_count, release_year), so a spin can sample
+    from every page fetched so far instead of re-querying TMDb.
+    """
+
+    PREFIX = "cand:tmdb:v1"
+
+    def __init__(self, redis: Redis, *, ttl: int) -> None:
+        self.redis = redis
+        self.ttl = ttl
+
+    @classmethod
+    def _items_key(cls, fkey: str) -> str:
+        return f"{cls.PREFIX}:{fkey}"
+
+    @classmethod
+    def _pages_key(cls, fkey: str) -> str:
+        return f"{cls.PREFIX}:{fkey}:pages"
+
+    @classmethod
+    def _meta_key(cls, fkey: str) -> str:
+        return f"{cls.PREFIX}:{fkey}:meta"
+
+    @staticmethod
+    def _as_int(v: Any) -> Optional[int]:
+        try:
+            return int(v) if v is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _as_float(v: Any) -> float:
+        try:
+            return float(v or 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    @classmethod
+    def compact(cls, item: dict[str, Any]) -> str:
+        release_year = cls._as_int(str(item.get("release_date") or "")[:4])
+        return "|".join(
+            (
+                f"{cls._as_float(item.get('vote_average')):g}",
+                f"{cls._as_float(item.get('popularity')):.3f}",
+                str(cls._as_int(item.get("vote_count")) or 0),
+                "" if release_year is None else str(release_year),
+            )
+        )
+
+    @classmethod
+    def expand(cls, movie_id: int, raw: str) -> dict[str, Any]:
+        parts = (raw.split("|") + ["", "", "", ""])[:4]
+        return {
+            "id": movie_id,
+            "vote_average": cls._as_float(parts[0]),
+            "popularity": cls._as_float(parts[1]),
+            "vote_count": cls._as_int(parts[2]) or 0,
+            "release_year": cls._as_int(parts[3]) if parts[3] else None,
+        }
+
+    async def load(self, fkey: str) -> Optional[CandidatePool]:
+        pipe = self.redis.pipeline()
+        pipe.hgetall(self._items_key(fkey))
+        pipe.smembers(self._pages_key(fkey))
+        pipe.hgetall(self._meta_key(fkey))
+        raw_items, raw_pages, meta = await pipe.execute()
+        if not raw_items or not meta:
+            return None
+        items: dict[int, dict[str, Any]] = {}
+        for raw_id, raw in raw_items.items():
+            movie_id = self._as_int(raw_id)
+            if movie_id is not None:
+                items[movie_id] = self.expand(movie_id, raw)
+        pages = {p for p in (self._as_int(x) for x in raw_pages or ()) if p is not None}
+        return CandidatePool(
+            items=items,
+            pages=pages,
+            total_pages=self._as_int(meta.get("total_pages")) or 0,
+            total_results=self._as_int(meta.get("total_results")) or 0,
+            refreshed_at=self._as_float(meta.get("refreshed_at")),
+        )
+
+    async def record(
+        self,
+        fkey: str,
+        *,
+        items: Iterable[dict[str, Any]],
+        pages: Iterable[int],
+        total_pages: int,
+        total_results: int,
+        reset: bool,
+    ) -> None:
+        """Add fetched discover results; ``reset`` drops what was stored before."""
+        mapping: dict[str, str] = {}
+        for item in items:
+            movie_id = self._as_int(item.get("id"))
+            if movie_id is not None:
+                mapping[str(movie_id)] = self.compact(item)
+        if not mapping:
+            return
+        page_values = [str(p) for p in pages]
+        items_key, pages_key, meta_key = (
+            self._items_key(fkey),
+            self._pages_key(fkey),
+            self._meta_key(fkey),
+        )
+        meta: dict[str, str] = {
+            "total_pages": str(total_pages),
+            "total_results": str(total_results),
+        }
+        pipe = self.redis.pipeline()
+        if reset:
+            pipe.delete(items_key, pages_key, meta_key)
+            # Staleness is measured from the oldest data, so only a reset moves it.
+            meta["refreshed_at"] = f"{time.time():.3f}"
+        pipe.hset(items_key, mapping=mapping)
+        if page_values:
+            pipe.sadd(pages_key, *page_values)
+        pipe.hset(meta_key, mapping=meta)
+        for key in (items_key, pages_key, meta_key):
+            pipe.expire(key, self.ttl)
+        await pipe.execute()
@@ -0,0 +1,118 @@
+import json
+import logging
+import zlib
+from typing import Any
+
+import lz4.frame as lz4_frame
+import msgpack
+import orjson
+import zstandard
+
+from ..core.config import CACHE_CODEC, CACHE_COMPRESSION, CACHE_COMPRESS_MIN_BYTES
+
+logger = logging.getLogger("uvicorn.error")
+
+# Binary entries start with MAGIC + format version + codec id + compression id.
+# Anything else is a legacy plain-JSON entry written before the codec layer.
+MAGIC = b"FS"
+FORMAT_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 3
+
+CODEC_JSON = 1
+CODEC_MSGPACK = 2
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_LZ4 = 3
+
+_CODEC_IDS = {"json": CODEC_JSON, "msgpack": CODEC_MSGPACK}
+_COMPRESSION_IDS = {
+    "none": COMPRESSION_NONE,
+    "zlib": COMPRESSION_ZLIB,
+    "zstd": COMPRESSION_ZSTD,
+    "lz4": COMPRESSION_LZ4,
+}
+
+
+class CacheCodec:
+    def __init__(
+        self,
+        *,
+        codec: str = "json",
+        compression: str = "auto",
+        compress_min_bytes: int = 1024,
+    ) -> None:
+        if codec not in _CODEC_IDS:
+            logger.warning("[FilmSpin] unknown cache codec %s, caching as JSON", codec)
+        self.codec_id = _CODEC_IDS.get(codec, CODEC_JSON)
+        self.compression_id = self._pick_compression(compression)
+        self.compress_min_bytes = max(0, compress_min_bytes)
+        self._zstd_compressor = zstandard.ZstdCompressor(level=3)
+        self._zstd_decompressor = zstandard.ZstdDecompressor()
+
+    @staticmethod
+    def _pick_compression(name: str) -> int:
+        if name == "auto":
+            return COMPRESSION_ZSTD
+        if name not in _COMPRESSION_IDS:
+            logger.warning("[FilmSpin] unknown cache compression %s, using zlib", name)
+            return COMPRESSION_ZLIB
+        return _COMPRESSION_IDS[name]
+
+    def encode(self, value: Any) -> bytes:
+        body = self._serialize(value)
+        compression_id = COMPRESSION_NONE
+        if self.compression_id != COMPRESSION_NONE and len(body) >= self.compress_min_bytes:
+            compression_id = self.compression_id
+            body = self._compress(body, compression_id)
+        return MAGIC + bytes((FORMAT_VERSION, self.codec_id, compression_id)) + body
+
+    def decode(self, raw: bytes | str) -> Any:
+        """Decode a stored entry; raises ValueError when it cannot be read."""
+        if isinstance(raw, str):
+            return json.loads(raw)
+        if not raw.startswith(MAGIC):
+            return json.loads(raw)
+        if len(raw) < HEADER_SIZE or raw[2] != FORMAT_VERSION:
+            raise ValueError("unsupported cache entry format")
+        codec_id, compression_id = raw[3], raw[4]
+        body = self._decompress(raw[HEADER_SIZE:], compression_id)
+        return self._deserialize(body, codec_id)
+
+    def _serialize(self, value: Any) -> bytes:
+        if self.codec_id == CODEC_MSGPACK:
+            return msgpack.packb(value, use_bin_type=True)
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    @staticmethod
+    def _deserialize(body: bytes, codec_id: int) -> Any:
+        if codec_id == CODEC_JSON:
+            return orjson.loads(body)
+        if codec_id == CODEC_MSGPACK:
+            return msgpack.unpackb(body, raw=False)
+        raise ValueError(f"unknown cache codec {codec_id}")
+
+    def _compress(self, body: bytes, compression_id: int) -> bytes:
+        if compression_id == COMPRESSION_ZSTD:
+            return self._zstd_compressor.compress(body)
+        if compression_id == COMPRESSION_LZ4:
+            return lz4_frame.compress(body)
+        return zlib.compress(body, 1)
+
+    def _decompress(self, body: bytes, compression_id: int) -> bytes:
+        if compression_id == COMPRESSION_NONE:
+            return body
+        if compression_id == COMPRESSION_ZLIB:
+            return zlib.decompress(body)
+        if compression_id == COMPRESSION_ZSTD:
+            return self._zstd_decompressor.decompress(body)
+        if compression_id == COMPRESSION_LZ4:
+            return lz4_frame.decompress(body)
+        raise ValueError(f"unsupported cache compression {compression_id}")
+
+
+default_codec = CacheCodec(
+    codec=CACHE_CODEC,
+    compression=CACHE_COMPRESSION,
+    compress_min_bytes=CACHE_COMPRESS_MIN_BYTES,
+)
@@ -0,0 +1,56 @@
+import json
+import random
+from typing import Any
+
+from redis.asyncio import Redis
+
+
+class FilterStatsRepository:
+    """How often each filter combination is spun, one sorted set per kind.
+
+    Only combinations are kept (no exclude lists, which are per user), so the
+    warm-up job can replay the most popular ones after a cold start.
+    """
+
+    PREFIX = "filters:hot:v1"
+    # Roughly one spin in TRIM_EVERY trims the set back to ``max_tracked``.
+    TRIM_EVERY = 50
+
+    def __init__(self, redis: Redis, *, ttl: int, max_tracked: int = 1_000) -> None:
+        self.redis = redis
+        self.ttl = ttl
+        self.max_tracked = max_tracked
+
+    @classmethod
+    def _key(cls, kind: str) -> str:
+        return f"{cls.PREFIX}:{kind}"
+
+    @staticmethod
+    def encode(filters: dict[str, Any]) -> str:
+        return json.dumps(
+            {k: v for k, v in sorted(filters.items()) if v is not None},
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+
+    async def record(self, kind: str, filters: dict[str, Any]) -> None:
+        key = self._key(kind)
+        pipe = self.redis.pipeline()
+        pipe.zincrby(key, 1, self.encode(filters))
+        pipe.expire(key, self.ttl)
+        if random.randrange(self.TRIM_EVERY) == 0:
+            pipe.zremrangebyrank(key, 0, -(self.max_tracked + 1))
+        await pipe.execute()
+
+    async def top(self, kind: str, limit: int) -> list[dict[str, Any]]:
+        if limit <= 0:
+            return []
+        combos: list[dict[str, Any]] = []
+        for raw in await self.redis.zrevrange(self._key(kind), 0, limit - 1):
+            try:
+                value = json.loads(raw)
+            except (TypeError, ValueError):
+                continue
+            if isinstance(value, dict):
+                combos.append(value)
+        return combos
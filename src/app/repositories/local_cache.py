@@ -0,0 +1,90 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class LocalCache:
+    """Bounded in-process LRU that sits in front of Redis for selected prefixes.
+
+    Entries hold the raw payload exactly as stored in Redis and never outlive
+    the Redis TTL they were read or written with. ``rules`` maps a key prefix to
+    the longest time (seconds) an entry may live locally, which bounds how stale
+    one worker can be after another worker rewrites the key.
+    """
+
+    def __init__(
+        self,
+        *,
+        rules: dict[str, float],
+        max_entries: int,
+        max_bytes: int,
+    ) -> None:
+        # Longest prefix wins so specific rules can override broad ones.
+        self._rules = sorted(rules.items(), key=lambda row: len(row[0]), reverse=True)
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self._entries: OrderedDict[str, tuple[float, str | bytes, int]] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def _max_ttl(self, key: str) -> Optional[float]:
+        for prefix, max_ttl in self._rules:
+            if key.startswith(prefix):
+                return max_ttl
+        return None
+
+    def enabled_for(self, key: str) -> bool:
+        max_ttl = self._max_ttl(key)
+        return max_ttl is not None and max_ttl > 0
+
+    def get(self, key: str) -> Tuple[bool, Optional[str | bytes]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return False, None
+        expires_at, raw, _ = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            self._expirations += 1
+            self._misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return True, raw
+
+    def put(self, key: str, raw: str | bytes, ttl_sec: Optional[float]) -> None:
+        max_ttl = self._max_ttl(key)
+        if not max_ttl or max_ttl <= 0 or ttl_sec is None or ttl_sec <= 0:
+            return
+        size = len(raw.encode("utf-8")) if isinstance(raw, str) else len(raw)
+        if size > self.max_bytes:
+            self._drop(key)
+            return
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + min(ttl_sec, max_ttl), raw, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        self._drop(key)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
@@ -0,0 +1,45 @@
+from redis.asyncio import Redis
+
+
+class PassRateRepository:
+    """Per-bucket histograms of IMDb ratings seen while sampling previews.
+
+    Buckets are only written while they are still being sampled, so a
+    settled bucket expires after ``ttl`` and gets re-learned from fresh data.
+    """
+
+    PREFIX = "passrate:v1"
+
+    def __init__(self, redis: Redis, *, ttl: int) -> None:
+        self.redis = redis
+        self.ttl = ttl
+
+    @classmethod
+    def _key(cls, bucket: str) -> str:
+        return f"{cls.PREFIX}:{bucket}"
+
+    async def load(self, bucket: str) -> dict[str, int]:
+        raw = await self.redis.hgetall(self._key(bucket))
+        counts: dict[str, int] = {}
+        for name, value in (raw or {}).items():
+            try:
+                counts[str(name)] = int(value)
+            except (TypeError, ValueError):
+                continue
+        return counts
+
+    async def claim(self, bucket: str, *, seconds: int) -> bool:
+        """Let one worker at a time sample a bucket."""
+        return bool(
+            await self.redis.set(f"lock:{self._key(bucket)}", "1", nx=True, ex=seconds)
+        )
+
+    async def add(self, bucket: str, counts: dict[str, int]) -> None:
+        if not counts:
+            return
+        key = self._key(bucket)
+        pipe = self.redis.pipeline()
+        for name, count in counts.items():
+            pipe.hincrby(key, name, count)
+        pipe.expire(key, self.ttl)
+        await pipe.execute()
@@ -0,0 +1,259 @@
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Any, Iterable, NamedTuple, Optional
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger("uvicorn.error")
+
+# Write one entry, stamp it in the age index, then drop a bounded batch of
+# entries older than the cutoff so the hash never outgrows max_age.
+_RECORD_AND_PRUNE = """
+redis.call("hset", KEYS[1], ARGV[1], ARGV[2])
+redis.call("zadd", KEYS[2], ARGV[3], ARGV[1])
+local old = redis.call("zrangebyscore", KEYS[2], "-inf", ARGV[4], "LIMIT", 0, ARGV[5])
+if #old > 0 then
+    redis.call("hdel", KEYS[1], unpack(old))
+    redis.call("zrem", KEYS[2], unpack(old))
+end
+return #old
+"""
+
+
+class RatingEntry(NamedTuple):
+    imdb_id: Optional[str]
+    rating: Optional[float]
+    votes: Optional[int]
+
+
+class RatingSnapshot:
+    """Read-only, memory-mapped copy of the rating index for one worker.
+
+    The file is a small header followed by fixed-size records sorted by
+    tmdb_id, so a lookup is a binary search over the mapping with no
+    per-entry Python objects kept in memory. Each record keeps the time it
+    was written, so a fresher Redis entry can win over it.
+    """
+
+    MAGIC = b"FSRI"
+    VERSION = 2
+    # magic, version, record count, created_at (unix seconds)
+    HEADER = struct.Struct("<4sBId")
+    # tmdb_id, numeric part of the imdb id, rating * 10, votes, written_at
+    RECORD = struct.Struct("<IIHII")
+    NO_RATING = 0xFFFF
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, created_at = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self._map.close()
+            raise ValueError("unsupported rating snapshot")
+        expected = self.HEADER.size + count * self.RECORD.size
+        if len(self._map) < expected:
+            self._map.close()
+            raise ValueError("truncated rating snapshot")
+        self.count = count
+        self.created_at = created_at
+
+    def close(self) -> None:
+        self._map.close()
+
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    def get(self, tmdb_id: int) -> Optional[RatingEntry]:
+        found = self.get_stamped(tmdb_id)
+        return found[0] if found is not None else None
+
+    def get_stamped(self, tmdb_id: int) -> Optional[tuple[RatingEntry, int]]:
+        """The entry and the unix time it was written to the index."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = self.RECORD.unpack_from(self._map, self.HEADER.size + mid * self.RECORD.size)
+            if row[0] < tmdb_id:
+                lo = mid + 1
+            elif row[0] > tmdb_id:
+                hi = mid
+            else:
+                _, imdb_num, rating, votes, written_at = row
+                entry = RatingEntry(
+                    imdb_id=f"tt{imdb_num:07d}" if imdb_num else None,
+                    rating=None if rating == self.NO_RATING else rating / 10,
+                    votes=votes or None,
+                )
+                return entry, written_at
+        return None
+
+    @classmethod
+    def write(cls, path: str, entries: dict[int, tuple[RatingEntry, int]]) -> int:
+        """Atomically replace ``path`` with a snapshot of ``entries``."""
+        rows: list[bytes] = []
+        for tmdb_id in sorted(entries):
+            entry, written_at = entries[tmdb_id]
+            if not 0 < tmdb_id < 2**32:
+                continue
+            imdb_num = RatingIndexRepository._imdb_number(entry.imdb_id)
+            rating = (
+                cls.NO_RATING
+                if entry.rating is None
+                else max(0, min(100, int(round(entry.rating * 10))))
+            )
+            votes = max(0, min(2**32 - 1, entry.votes or 0))
+            rows.append(
+                cls.RECORD.pack(
+                    tmdb_id, imdb_num, rating, votes, max(0, min(2**32 - 1, written_at))
+                )
+            )
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".ratings-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(rows), time.time()))
+                fh.write(b"".join(rows))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return len(rows)
+
+
+class RatingIndexRepository:
+    """tmdb_id -> (imdb_id, imdb rating, imdb votes) learned from resolved cards.
+
+    Lets candidate lists drop movies already known to miss a rating filter
+    before paying for a full resolve. Entries older than ``max_age`` seconds
+    are treated as unknown and pruned from Redis as new ones are written.
+    """
+
+    KEY = "ratings:tmdb:v1"
+    # tmdb_id scored by written_at, so expired entries are found without a scan.
+    WRITTEN_KEY = "ratings:tmdb:v1:written"
+    PRUNE_BATCH = 100
+
+    def __init__(
+        self,
+        redis: Redis,
+        *,
+        max_age: int,
+        snapshot: RatingSnapshot | None = None,
+    ) -> None:
+        self.redis = redis
+        self.max_age = max_age
+        self.snapshot = snapshot
+
+    @staticmethod
+    def _imdb_number(imdb_id: Optional[str]) -> int:
+        raw = str(imdb_id or "")
+        if not raw.startswith("tt") or not raw[2:].isdigit():
+            return 0
+        value = int(raw[2:])
+        return value if value < 2**32 else 0
+
+    @staticmethod
+    def _encode(entry: RatingEntry, written_at: int) -> str:
+        return "|".join(
+            (
+                entry.imdb_id or "",
+                "" if entry.rating is None else f"{entry.rating:g}",
+                "" if entry.votes is None else str(entry.votes),
+                str(written_at),
+            )
+        )
+
+    def _decode(self, raw: Any) -> Optional[tuple[RatingEntry, int]]:
+        if not raw:
+            return None
+        parts = (str(raw).split("|") + ["", "", "", ""])[:4]
+        try:
+            written_at = int(parts[3] or 0)
+            rating = float(parts[1]) if parts[1] else None
+            votes = int(parts[2]) if parts[2] else None
+        except ValueError:
+            return None
+        if time.time() - written_at > self.max_age:
+            return None
+        return RatingEntry(imdb_id=parts[0] or None, rating=rating, votes=votes), written_at
+
+    async def record(
+        self,
+        tmdb_id: int,
+        *,
+        imdb_id: Optional[str],
+        rating: Optional[float],
+        votes: Optional[int],
+    ) -> None:
+        entry = RatingEntry(imdb_id=imdb_id, rating=rating, votes=votes)
+        now = int(time.time())
+        await self.redis.eval(
+            _RECORD_AND_PRUNE,
+            2,
+            self.KEY,
+            self.WRITTEN_KEY,
+            str(tmdb_id),
+            self._encode(entry, now),
+            now,
+            now - self.max_age,
+            self.PRUNE_BATCH,
+        )
+
+    async def lookup(self, tmdb_ids: Iterable[int]) -> dict[int, RatingEntry]:
+        """Known entries for ``tmdb_ids``; unknown ids are simply absent.
+
+        Redis and the snapshot are both consulted and the newer entry wins;
+        if Redis is unreachable the snapshot alone still answers.
+        """
+        ids = list(dict.fromkeys(tmdb_ids))
+        stamped: dict[int, tuple[RatingEntry, int]] = {}
+        if self.snapshot is not None:
+            cutoff = time.time() - self.max_age
+            for tmdb_id in ids:
+                found = self.snapshot.get_stamped(tmdb_id)
+                if found is not None and found[1] >= cutoff:
+                    stamped[tmdb_id] = found
+        try:
+            values = await self.redis.hmget(self.KEY, [str(x) for x in ids]) if ids else []
+        except Exception:
+            if not stamped:
+                raise
+            values = []
+        for tmdb_id, raw in zip(ids, values, strict=False):
+            found = self._decode(raw)
+            if found is not None and (
+                tmdb_id not in stamped or found[1] >= stamped[tmdb_id][1]
+            ):
+                stamped[tmdb_id] = found
+        return {tmdb_id: entry for tmdb_id, (entry, _) in stamped.items()}
+
+    async def export_snapshot(self, path: str) -> int:
+        """Write every fresh entry to a snapshot file workers can mmap.
+
+        Expired entries met on the way are deleted, which also clears ones
+        written before the age index existed.
+        """
+        entries: dict[int, tuple[RatingEntry, int]] = {}
+        expired: list[str] = []
+        async for field, raw in self.redis.hscan_iter(self.KEY, count=1000):
+            found = self._decode(raw)
+            if found is None:
+                expired.append(field)
+                continue
+            try:
+                entries[int(field)] = found
+            except (TypeError, ValueError):
+                continue
+        for start in range(0, len(expired), 1000):
+            batch = expired[start : start + 1000]
+            await self.redis.hdel(self.KEY, *batch)
+            await self.redis.zrem(self.WRITTEN_KEY, *batch)
+        count = RatingSnapshot.write(path, entries)
+        logger.info("[FilmSpin] rating snapshot exported: path=%s entries=%s", path, count)
+        return count
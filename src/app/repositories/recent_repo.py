@@ -1,24 +1,50 @@
 import random
+import time
 from typing import Iterable, Optional
 
 from redis.asyncio import Redis
 
+# Add (or re-stamp) one id, then drop the oldest beyond the limit, in one call.
+_ADD_AND_TRIM = """
+redis.call("zadd", KEYS[1], ARGV[1], ARGV[2])
+redis.call("zremrangebyrank", KEYS[1], 0, -tonumber(ARGV[3]) - 1)
+redis.call("expire", KEYS[1], ARGV[4])
+return 1
+"""
+
 
 class RecentRepository:
+    """Recently shown ids per filter combination, oldest evicted first.
+
+    Each key is a sorted set scored by the time an id was shown. Callers
+    only ask about the candidates they hold (ZMSCORE), so a check costs
+    O(k) however long the history is.
+    """
+
     def __init__(self, redis: Redis) -> None:
         self.redis = redis
 
     async def add(self, key: str, movie_id: str, *, ttl: int, limit: int) -> None:
-        pipe = self.redis.pipeline()
-        pipe.sadd(key, movie_id)
-        pipe.expire(key, ttl)
-        pipe.scard(key)
-        _, _, size = await pipe.execute()
-        if isinstance(size, int) and size > limit:
-            await self.redis.spop(key, size - limit)
+        await self.redis.eval(
+            _ADD_AND_TRIM,
+            1,
+            key,
+            int(time.time() * 1000),
+            movie_id,
+            max(1, limit),
+            ttl,
+        )
+
+    async def seen(self, key: str, candidates: Iterable[str]) -> set[str]:
+        """The subset of ``candidates`` shown recently."""
+        ids = list(dict.fromkeys(candidates))
+        if not ids:
+            return set()
+        scores = await self.redis.zmscore(key, ids)
+        return {movie_id for movie_id, score in zip(ids, scores, strict=False) if score is not None}
 
-    async def members(self, key: str) -> set[str]:
-        return await self.redis.smembers(key)
+    async def clear(self, key: str) -> None:
+        await self.redis.delete(key)
 
     async def choose_not_recent(
         self, key: str, candidates: Iterable[int]
@@ -26,7 +52,7 @@ class RecentRepository:
         pool = list(candidates)
         if not pool:
             return None, []
-        recent = await self.redis.smembers(key)
+        recent = await self.seen(key, (str(c) for c in pool))
         if not recent:
             return random.choice(pool), pool
         fresh = [c for c in pool if str(c) not in recent]
@@ -0,0 +1,185 @@
+import gzip
+import logging
+import os
+import struct
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger("uvicorn.error")
+
+# Namespaces worth keeping across a Redis restart; locks, the short-lived
+# per-filter recent history and per-session seen filters are deliberately
+# left out.
+DEFAULT_SNAPSHOT_PATTERNS = (
+    "hmap:*",
+    "norm:*",
+    "raw:*",
+    "omdb:*",
+    "genres:*",
+    "ratings:*",
+    "passrate:*",
+    "filters:hot:*",
+    "hot:cards",
+    "cand:*",
+    "quota:omdb:*",
+)
+
+
+@dataclass
+class SnapshotStats:
+    keys: int = 0
+    skipped: int = 0
+    bytes: int = 0
+
+
+class CacheSnapshotRepository:
+    """Streams keys to and from a gzip file of Redis DUMP payloads.
+
+    Each record keeps the absolute expiry, so a restore hours later keeps
+    the original deadline and drops whatever has expired in between.
+    Needs a client without ``decode_responses``: DUMP payloads are binary.
+    """
+
+    MAGIC = b"FSCS"
+    VERSION = 1
+    HEADER = struct.Struct("<4sBd")
+    # key length, payload length, expires_at in unix ms (0: no expiry)
+    RECORD = struct.Struct("<HIq")
+
+    def __init__(self, redis: Redis, *, batch: int = 500) -> None:
+        self.redis = redis
+        self.batch = max(1, batch)
+
+    async def export(
+        self, path: str, patterns: Iterable[str] = DEFAULT_SNAPSHOT_PATTERNS
+    ) -> SnapshotStats:
+        stats = SnapshotStats()
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as fh:
+                fh.write(self.HEADER.pack(self.MAGIC, self.VERSION, time.time()))
+                for pattern in patterns:
+                    keys: list[bytes | str] = []
+                    async for key in self.redis.scan_iter(match=pattern, count=self.batch):
+                        keys.append(key)
+                        if len(keys) >= self.batch:
+                            await self._export_batch(fh, keys, stats)
+                            keys = []
+                    if keys:
+                        await self._export_batch(fh, keys, stats)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        logger.info(
+            "[FilmSpin] cache snapshot exported: path=%s keys=%s bytes=%s",
+            path,
+            stats.keys,
+            stats.bytes,
+        )
+        return stats
+
+    async def _export_batch(
+        self, fh: BinaryIO, keys: list[bytes | str], stats: SnapshotStats
+    ) -> None:
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.dump(key)
+            pipe.pttl(key)
+        results = await pipe.execute()
+        now_ms = int(time.time() * 1000)
+        for index, key in enumerate(keys):
+            payload, pttl = results[2 * index], results[2 * index + 1]
+            # Gone between SCAN and DUMP, or about to expire anyway.
+            gone = not isinstance(pttl, int) or pttl == -2 or 0 <= pttl < 1000
+            if payload is None or gone:
+                stats.skipped += 1
+                continue
+            name = key if isinstance(key, bytes) else key.encode("utf-8")
+            expires_at = now_ms + pttl if pttl > 0 else 0
+            fh.write(self.RECORD.pack(len(name), len(payload), expires_at))
+            fh.write(name)
+            fh.write(payload)
+            stats.keys += 1
+            stats.bytes += len(name) + len(payload)
+
+    async def restore(self, path: str, *, replace: bool = False) -> SnapshotStats:
+        """Load a snapshot; existing keys win unless ``replace`` is set."""
+        stats = SnapshotStats()
+        with gzip.open(path, "rb") as fh:
+            magic, version, _ = self.HEADER.unpack(self._read(fh, self.HEADER.size))
+            if magic != self.MAGIC or version != self.VERSION:
+                raise ValueError("unsupported cache snapshot")
+            batch: list[tuple[bytes, bytes, int]] = []
+            while (record := self._read_record(fh)) is not None:
+                batch.append(record)
+                if len(batch) >= self.batch:
+                    await self._restore_batch(batch, stats, replace=replace)
+                    batch = []
+            if batch:
+                await self._restore_batch(batch, stats, replace=replace)
+        logger.info(
+            "[FilmSpin] cache snapshot restored: path=%s keys=%s skipped=%s",
+            path,
+            stats.keys,
+            stats.skipped,
+        )
+        return stats
+
+    def _read_record(self, fh: BinaryIO) -> Optional[tuple[bytes, bytes, int]]:
+        head = fh.read(self.RECORD.size)
+        if not head:
+            return None
+        if len(head) < self.RECORD.size:
+            raise ValueError("truncated cache snapshot")
+        key_len, payload_len, expires_at = self.RECORD.unpack(head)
+        return self._read(fh, key_len), self._read(fh, payload_len), expires_at
+
+    @staticmethod
+    def _read(fh: BinaryIO, size: int) -> bytes:
+        data = fh.read(size)
+        if len(data) < size:
+            raise ValueError("truncated cache snapshot")
+        return data
+
+    async def _restore_batch(
+        self,
+        batch: list[tuple[bytes, bytes, int]],
+        stats: SnapshotStats,
+        *,
+        replace: bool,
+    ) -> None:
+        now_ms = int(time.time() * 1000)
+        pipe = self.redis.pipeline(transaction=False)
+        queued: list[bytes] = []
+        for key, payload, expires_at in batch:
+            if expires_at and expires_at <= now_ms:
+                stats.skipped += 1
+                continue
+            # ABSTTL keeps the deadline the key had when it was exported.
+            pipe.restore(
+                key, expires_at, payload, replace=replace, absttl=bool(expires_at)
+            )
+            queued.append(key)
+        if not queued:
+            return
+        results = await pipe.execute(raise_on_error=False)
+        for key, result in zip(queued, results, strict=False):
+            if isinstance(result, ResponseError):
+                # BUSYKEY: a live value already exists and is newer than ours.
+                stats.skipped += 1
+                if "BUSYKEY" not in str(result):
+                    logger.info(
+                        "[FilmSpin] cache snapshot restore failed: key=%s error=%s",
+                        key.decode("utf-8", "replace"),
+                        result,
+                    )
+            else:
+                stats.keys += 1
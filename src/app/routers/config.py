@@ -1,6 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from redis.asyncio import Redis
 
+from ..container import AppContainer
 from ..core.config import RU_ENABLED
+from ..dependencies import get_container, get_redis
 from ..observability import metrics
 from ..schemas import MetricsOut, PublicConfigOut
 
@@ -13,5 +17,30 @@ async def public_config():
 
 
 @router.get("/metrics", response_model=MetricsOut)
-async def public_metrics():
-    return metrics.snapshot()
+async def public_metrics(container: AppContainer = Depends(get_container)):
+    snapshot = metrics.snapshot()
+    latency = container.upstream_latency
+    snapshot.upstream_coalescing = container.upstream_flights.stats()
+    snapshot.upstream_limits = {
+        name: governor.stats() for name, governor in container.upstream_governors.items()
+    }
+    snapshot.upstream_health = {
+        name: {**breaker.stats(), **(latency[name].stats() if name in latency else {})}
+        for name, breaker in container.upstream_breakers.items()
+    }
+    snapshot.omdb_keys = container.omdb_key_pool.stats()
+    if container.local_cache is not None:
+        snapshot.cache_l1 = container.local_cache.stats()
+    if container.refresh_scheduler is not None:
+        snapshot.refresh = container.refresh_scheduler.stats()
+    return snapshot
+
+
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+async def prometheus_metrics(redis: Redis = Depends(get_redis)):
+    state = await metrics.collect(redis)
+    if state is None:
+        raise HTTPException(status_code=503, detail="Metrics unavailable")
+    return PlainTextResponse(
+        metrics.render(state), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -2,7 +2,7 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, Query
 
-from ..dependencies import get_random_service, require_ru_enabled
+from ..dependencies import get_random_service, get_session_id, require_ru_enabled
 from ..schemas import ApiError, FiltersPreviewOut, MovieCard
 from ..services.random_service import RandomService
 
@@ -23,6 +23,7 @@ async def random_movie(
     exclude_tmdb: Optional[str] = Query(None, description="TMDb ids to exclude, comma or | separated"),
     exclude_kp: Optional[str] = Query(None, description="KP ids to exclude, comma or | separated"),
     lang: str = Query("en-US", description="TMDb language code, e.g. en-US or ru-RU"),
+    session: Optional[str] = Depends(get_session_id),
     service: RandomService = Depends(get_random_service),
 ):
     return await service.random_en(
@@ -36,6 +37,7 @@ async def random_movie(
         exclude_tmdb=exclude_tmdb,
         exclude_kp=exclude_kp,
         lang=lang,
+        session=session,
     )
 
 
@@ -55,6 +57,7 @@ async def random_movie_ru(
     exclude_tmdb: Optional[str] = Query(None, description="TMDb ids to exclude, comma or | separated"),
     exclude_kp: Optional[str] = Query(None, description="KP ids to exclude, comma or | separated"),
     _: None = Depends(require_ru_enabled),
+    session: Optional[str] = Depends(get_session_id),
     service: RandomService = Depends(get_random_service),
 ):
     return await service.random_ru(
@@ -67,6 +70,7 @@ async def random_movie_ru(
         country=country,
         exclude_tmdb=exclude_tmdb,
         exclude_kp=exclude_kp,
+        session=session,
     )
 
 
@@ -24,6 +24,15 @@ class MetricsOut(BaseModel):
     by_path: dict[str, int] = Field(default_factory=dict)
     by_status: dict[str, int] = Field(default_factory=dict)
     avg_ms_by_path: dict[str, float] = Field(default_factory=dict)
+    avg_ms_by_stage: dict[str, float] = Field(default_factory=dict)
+    upstream_coalescing: dict[str, int] = Field(default_factory=dict)
+    cache_l1: dict[str, int] = Field(default_factory=dict)
+    stale_served: dict[str, int] = Field(default_factory=dict)
+    cache_by_prefix: dict[str, dict[str, int]] = Field(default_factory=dict)
+    refresh: dict[str, int] = Field(default_factory=dict)
+    upstream_limits: dict[str, dict[str, int]] = Field(default_factory=dict)
+    upstream_health: dict[str, dict[str, int]] = Field(default_factory=dict)
+    omdb_keys: dict[str, dict[str, int]] = Field(default_factory=dict)
 
 
 class FiltersPreviewOut(BaseModel):
@@ -13,31 +13,32 @@ class GenresService:
         self.poiskkino = poiskkino
 
     async def get_genres(self, lang: str) -> list[GenreItem]:
-        key = f"genres:{lang}"
-        hit, cached = await self.cache.get_json_hit(key)
-        if hit and isinstance(cached, list):
-            return [GenreItem.model_validate(x) for x in cached]
-        data = await self.tmdb.get("/genre/movie/list", {"language": lang})
-        payload = data.get("genres", [])
-        items = [GenreItem.model_validate(x) for x in payload if isinstance(x, dict)]
-        await self.cache.set_json(key, [x.model_dump() for x in items], TTL_GENRES)
-        return items
+        async def fetch() -> list[dict]:
+            data = await self.tmdb.get("/genre/movie/list", {"language": lang})
+            payload = data.get("genres", [])
+            items = [GenreItem.model_validate(x) for x in payload if isinstance(x, dict)]
+            return [x.model_dump() for x in items]
+
+        cached = await self.cache.get_or_compute(f"genres:{lang}", TTL_GENRES, fetch)
+        if not isinstance(cached, list):
+            return []
+        return [GenreItem.model_validate(x) for x in cached]
 
     async def get_genres_ru(self) -> list[GenreItem]:
-        key = "genres:ru"
-        hit, cached = await self.cache.get_json_hit(key)
-        if hit and isinstance(cached, list):
-            return [GenreItem.model_validate(x) for x in cached]
-        values = await self.poiskkino.get_list(
-            "/v1/movie/possible-values-by-field", {"field": "genres.name"}
-        )
-        items = [
-            GenreItem(id=v["name"].lower(), name=self._ucfirst(v["name"]))
-            for v in values
-            if v.get("name")
-        ]
-        await self.cache.set_json(key, [x.model_dump() for x in items], TTL_GENRES)
-        return items
+        async def fetch() -> list[dict]:
+            values = await self.poiskkino.get_list(
+                "/v1/movie/possible-values-by-field", {"field": "genres.name"}
+            )
+            return [
+                GenreItem(id=v["name"].lower(), name=self._ucfirst(v["name"])).model_dump()
+                for v in values
+                if v.get("name")
+            ]
+
+        cached = await self.cache.get_or_compute("genres:ru", TTL_GENRES, fetch)
+        if not isinstance(cached, list):
+            return []
+        return [GenreItem.model_validate(x) for x in cached]
 
     @staticmethod
     def _ucfirst(value: str) -> str:
@@ -1,14 +1,58 @@
-from typing import Any, Optional
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+import httpx
 
 from ..clients import OmdbClient, PoiskkinoClient, TmdbClient
 from ..core.config import TTL_MOVIE_DETAIL, TTL_OMDB_NEGATIVE
-from ..repositories import CacheRepository, MappingRepository
+from ..observability import metrics
+from ..repositories import (
+    CacheRepository,
+    MappingRepository,
+    RatingIndexRepository,
+    force_refresh,
+)
 from ..schemas import MovieCard
+from .refresh import HotCardTracker
+
+logger = logging.getLogger("uvicorn.error")
 
-CACHE_SCHEMA_VERSION = "v3"
+T = TypeVar("T")
+
+# Bump whenever cached cards or raw projections change shape.
+CACHE_SCHEMA_VERSION = "v4"
 MAX_DIRECTOR_NAMES = 3
 MAX_CAST_NAMES = 5
 
+# Top-level fields _normalize_tmdb/_normalize_kp read from raw upstream payloads;
+# credits/persons are reduced separately to the names the card shows.
+TMDB_DETAIL_FIELDS = (
+    "id",
+    "title",
+    "release_date",
+    "runtime",
+    "overview",
+    "origin_country",
+    "poster_path",
+    "backdrop_path",
+    "vote_average",
+)
+# A KP list/random document needs these before it can stand in for /movie/{id}.
+KP_SEED_REQUIRED_FIELDS = ("id", "year", "genres", "countries", "externalId", "rating")
+WATCH_OFFER_TYPES = ("flatrate", "ads", "rent", "buy")
+KP_MOVIE_FIELDS = (
+    "id",
+    "name",
+    "alternativeName",
+    "enName",
+    "year",
+    "movieLength",
+    "description",
+    "shortDescription",
+)
+
 
 class MovieResolverService:
     def __init__(
@@ -19,12 +63,16 @@ class MovieResolverService:
         tmdb: TmdbClient,
         poiskkino: PoiskkinoClient,
         omdb: OmdbClient,
+        ratings: RatingIndexRepository | None = None,
+        hot_cards: HotCardTracker | None = None,
     ) -> None:
         self.cache = cache
         self.mappings = mappings
         self.tmdb = tmdb
         self.poiskkino = poiskkino
         self.omdb = omdb
+        self.ratings = ratings
+        self.hot_cards = hot_cards
 
     async def resolve(
         self,
@@ -34,6 +82,7 @@ class MovieResolverService:
         kp_id: Optional[int] = None,
         imdb_id: Optional[str] = None,
         watch_region: Optional[str] = None,
+        prefetched: Optional[dict[str, Any]] = None,
     ) -> MovieCard:
         region = self._normalize_watch_region(watch_region, lang=lang)
         if not tmdb_id and kp_id:
@@ -46,26 +95,132 @@ class MovieResolverService:
                 imdb_id = imdb_id or (kp_raw.get("externalId") or {}).get("imdb")
                 await self.mappings.set_map(tmdb_id, kp_id, imdb_id)
 
-        if tmdb_id:
-            norm_key = f"norm:movie:{CACHE_SCHEMA_VERSION}:{tmdb_id}:{lang}:{region}"
-            hit, cached = await self.cache.get_json_hit(norm_key)
+        if tmdb_id and not force_refresh.get():
+            norm_key = self._norm_key(tmdb_id, lang, region)
+            if prefetched is not None and norm_key in prefetched:
+                cached = prefetched[norm_key]
+                hit = cached is not None
+            else:
+                hit, cached = await self.cache.get_json_hit(norm_key)
             if hit and isinstance(cached, dict):
+                self._touch(tmdb_id, lang, region)
                 return MovieCard.model_validate(cached)
 
-        if lang.startswith("ru"):
-            return await self._resolve_ru(
-                tmdb_id=tmdb_id,
-                kp_id=kp_id,
-                imdb_id=imdb_id,
-                watch_region=region,
+        try:
+            if lang.startswith("ru"):
+                card = await self._resolve_ru(
+                    tmdb_id=tmdb_id,
+                    kp_id=kp_id,
+                    imdb_id=imdb_id,
+                    watch_region=region,
+                )
+            else:
+                card = await self._resolve_default(
+                    lang=lang,
+                    tmdb_id=tmdb_id,
+                    kp_id=kp_id,
+                    imdb_id=imdb_id,
+                    watch_region=region,
+                    prefetched=prefetched,
+                )
+        except httpx.HTTPError:
+            # Stale-if-error: an expired card beats a 502.
+            stale = (
+                await self.cache.get_stale(self._norm_key(tmdb_id, lang, region))
+                if tmdb_id
+                else None
             )
-        return await self._resolve_default(
-            lang=lang,
-            tmdb_id=tmdb_id,
-            kp_id=kp_id,
-            imdb_id=imdb_id,
-            watch_region=region,
-        )
+            if not isinstance(stale, dict):
+                raise
+            logger.info(
+                "[FilmSpin] serving stale card: tmdb_id=%s lang=%s", tmdb_id, lang
+            )
+            return MovieCard.model_validate(stale)
+        self._touch(self._safe_int(card.tmdb_id), lang, region)
+        return card
+
+    async def refresh_card(self, tmdb_id: int, lang: str, region: str) -> MovieCard:
+        """Rebuild a card and the raw entries under it, ignoring warm cache."""
+        token = force_refresh.set(True)
+        try:
+            return await self.resolve(lang=lang, tmdb_id=tmdb_id, watch_region=region)
+        finally:
+            force_refresh.reset(token)
+
+    def _touch(self, tmdb_id: Optional[int], lang: str, region: str) -> None:
+        if self.hot_cards is None or not tmdb_id or force_refresh.get():
+            return
+        # RU cards are always stored under ru-RU, whatever the request said.
+        self.hot_cards.touch(tmdb_id, "ru-RU" if lang.startswith("ru") else lang, region)
+
+    async def prefetch(
+        self,
+        *,
+        lang: str,
+        tmdb_ids: list[int],
+        watch_region: Optional[str] = None,
+    ) -> dict[str, Any]:
+        """Load every cache entry a batch of resolves will read, in two MGETs.
+
+        The result maps each looked-up cache key to its value (``None`` for a
+        miss) and can be passed to ``resolve(prefetched=...)`` for any of
+        ``tmdb_ids``.
+        """
+        if not tmdb_ids or lang.startswith("ru"):
+            return {}
+        region = self._normalize_watch_region(watch_region, lang=lang)
+        keys: list[str] = []
+        for tmdb_id in tmdb_ids:
+            keys.append(self._norm_key(tmdb_id, lang, region))
+            keys.append(self._tmdb_details_key(tmdb_id, lang))
+            keys.append(self._watch_key(tmdb_id))
+        found = await self.cache.get_many(keys)
+
+        omdb_keys: list[str] = []
+        for tmdb_id in tmdb_ids:
+            if self._norm_key(tmdb_id, lang, region) in found:
+                continue
+            details = found.get(self._tmdb_details_key(tmdb_id, lang))
+            if not isinstance(details, dict):
+                continue
+            imdb_id = (details.get("external_ids") or {}).get("imdb_id")
+            if imdb_id:
+                omdb_keys.append(self._omdb_key(imdb_id))
+        if omdb_keys:
+            keys.extend(omdb_keys)
+            found.update(await self.cache.get_many(omdb_keys))
+        return {key: found.get(key) for key in keys}
+
+    async def _cached(
+        self,
+        key: str,
+        ttl: int | Callable[[Any], int],
+        producer: Callable[[], Awaitable[Any]],
+        prefetched: Optional[dict[str, Any]],
+    ) -> Any:
+        if prefetched is not None and prefetched.get(key) is not None:
+            return prefetched[key]
+        return await self.cache.get_or_compute(key, ttl, producer)
+
+    @staticmethod
+    def _norm_key(tmdb_id: int, lang: str, region: str) -> str:
+        return f"norm:movie:{CACHE_SCHEMA_VERSION}:{tmdb_id}:{lang}:{region}"
+
+    @staticmethod
+    def _tmdb_details_key(tmdb_id: int, lang: str) -> str:
+        return f"raw:tmdb:{CACHE_SCHEMA_VERSION}:{tmdb_id}:{lang}"
+
+    @staticmethod
+    def _kp_details_key(kp_id: int) -> str:
+        return f"raw:kp:{CACHE_SCHEMA_VERSION}:{kp_id}"
+
+    @staticmethod
+    def _watch_key(tmdb_id: int) -> str:
+        return f"raw:tmdb:watch:{CACHE_SCHEMA_VERSION}:{tmdb_id}"
+
+    @staticmethod
+    def _omdb_key(imdb_id: str) -> str:
+        return f"omdb:{imdb_id}"
 
     async def _resolve_ru(
         self,
@@ -75,56 +230,85 @@ class MovieResolverService:
         imdb_id: Optional[str],
         watch_region: str,
     ) -> MovieCard:
-        if not kp_id:
-            if tmdb_id:
-                mapping = await self.mappings.get_by_tmdb(tmdb_id)
-                kp_id = mapping.get("kp_id")
-                imdb_id = imdb_id or mapping.get("imdb_id")
+        # Watch providers only need tmdb_id, so they load alongside everything else.
+        watch_task = (
+            self._spawn("tmdb_watch", self._get_tmdb_watch_providers(tmdb_id))
+            if tmdb_id
+            else None
+        )
+        tasks: list[asyncio.Task[Any]] = [watch_task] if watch_task else []
+        try:
             if not kp_id:
-                kp_id = await self._kp_lookup_by_external(tmdb_id=tmdb_id, imdb_id=imdb_id)
+                if tmdb_id:
+                    mapping = await self.mappings.get_by_tmdb(tmdb_id)
+                    kp_id = mapping.get("kp_id")
+                    imdb_id = imdb_id or mapping.get("imdb_id")
+                if not kp_id:
+                    kp_id = await self._timed(
+                        "kp_lookup",
+                        self._kp_lookup_by_external(tmdb_id=tmdb_id, imdb_id=imdb_id),
+                    )
 
-        if kp_id:
-            kp_raw = await self._get_kp_details(kp_id)
-            tmdb_id = tmdb_id or (kp_raw.get("externalId") or {}).get("tmdb")
-            imdb_id = imdb_id or (kp_raw.get("externalId") or {}).get("imdb")
-            await self.mappings.set_map(tmdb_id, kp_id, imdb_id)
-            card = self._normalize_kp(kp_raw)
-        else:
-            if not tmdb_id:
-                raise ValueError("Cannot resolve movie: missing both tmdb_id and kp_id for ru")
-            tmdb_raw = await self._get_tmdb_details(tmdb_id, "ru-RU")
-            imdb_id = imdb_id or (tmdb_raw.get("external_ids") or {}).get("imdb_id")
-            await self.mappings.set_map(tmdb_id, None, imdb_id)
-            imdb_extra = await self._get_omdb_rating(imdb_id)
-            watch_payload = await self._get_tmdb_watch_providers(tmdb_id)
-            watch_providers, watch_url, watch_offers = self._extract_watch_data(
-                watch_payload,
-                watch_region,
-            )
-            card = self._normalize_tmdb(
-                tmdb_raw,
-                imdb_extra,
-                watch_providers=watch_providers,
-                watch_offers=watch_offers,
-                watch_url=watch_url,
-            )
+            if kp_id:
+                kp_raw = await self._timed("kp_details", self._get_kp_details(kp_id))
+                tmdb_id = tmdb_id or (kp_raw.get("externalId") or {}).get("tmdb")
+                imdb_id = imdb_id or (kp_raw.get("externalId") or {}).get("imdb")
+                await self.mappings.set_map(tmdb_id, kp_id, imdb_id)
+                card = self._normalize_kp(kp_raw)
+            else:
+                if not tmdb_id:
+                    raise ValueError("Cannot resolve movie: missing both tmdb_id and kp_id for ru")
+                details_task = self._spawn(
+                    "tmdb_details", self._get_tmdb_details(tmdb_id, "ru-RU")
+                )
+                tasks.append(details_task)
+                omdb_task = (
+                    self._spawn("omdb_rating", self._get_omdb_rating(imdb_id))
+                    if imdb_id
+                    else None
+                )
+                if omdb_task:
+                    tasks.append(omdb_task)
+                tmdb_raw = await details_task
+                imdb_id = imdb_id or (tmdb_raw.get("external_ids") or {}).get("imdb_id")
+                await self.mappings.set_map(tmdb_id, None, imdb_id)
+                imdb_extra = (
+                    await omdb_task
+                    if omdb_task
+                    else await self._timed("omdb_rating", self._get_omdb_rating(imdb_id))
+                )
+                card = self._normalize_tmdb(
+                    tmdb_raw,
+                    imdb_extra,
+                    watch_providers=[],
+                    watch_offers=[],
+                    watch_url=None,
+                )
 
-        if tmdb_id:
-            watch_payload = await self._get_tmdb_watch_providers(tmdb_id)
-            watch_providers, watch_url, watch_offers = self._extract_watch_data(
-                watch_payload,
-                watch_region,
-            )
-            card.watch_providers = watch_providers
-            card.watch_offers = watch_offers
-            card.watch_url = watch_url
+            if tmdb_id:
+                if watch_task is None:
+                    watch_task = self._spawn(
+                        "tmdb_watch", self._get_tmdb_watch_providers(tmdb_id)
+                    )
+                    tasks.append(watch_task)
+                watch_payload = await watch_task
+                watch_providers, watch_url, watch_offers = self._extract_watch_data(
+                    watch_payload,
+                    watch_region,
+                )
+                card.watch_providers = watch_providers
+                card.watch_offers = watch_offers
+                card.watch_url = watch_url
+        finally:
+            await self._cancel_pending(tasks)
 
         if tmdb_id:
             await self.cache.set_json(
-                f"norm:movie:{CACHE_SCHEMA_VERSION}:{tmdb_id}:ru-RU:{watch_region}",
+                self._norm_key(tmdb_id, "ru-RU", watch_region),
                 card.model_dump(),
                 TTL_MOVIE_DETAIL,
             )
+        await self._record_rating(card)
         return card
 
     async def _resolve_default(
@@ -135,6 +319,7 @@ class MovieResolverService:
         kp_id: Optional[int],
         imdb_id: Optional[str],
         watch_region: str,
+        prefetched: Optional[dict[str, Any]] = None,
     ) -> MovieCard:
         if not tmdb_id and kp_id:
             mapping = await self.mappings.get_by_kp(kp_id)
@@ -154,11 +339,45 @@ class MovieResolverService:
             imdb_id = imdb_id or (kp_raw.get("externalId") or {}).get("imdb")
             await self.mappings.set_map(tmdb_id, kp_id, imdb_id)
 
-        tmdb_raw = await self._get_tmdb_details(tmdb_id, lang)
-        imdb_id = imdb_id or (tmdb_raw.get("external_ids") or {}).get("imdb_id")
-        await self.mappings.set_map(tmdb_id, kp_id, imdb_id)
-        imdb_extra = await self._get_omdb_rating(imdb_id)
-        watch_payload = await self._get_tmdb_watch_providers(tmdb_id)
+        # Details and watch providers only need tmdb_id; OMDb starts as soon as
+        # an imdb_id is known, either from the mapping or from the details.
+        details_task = self._spawn(
+            "tmdb_details", self._get_tmdb_details(tmdb_id, lang, prefetched=prefetched)
+        )
+        watch_task = self._spawn(
+            "tmdb_watch", self._get_tmdb_watch_providers(tmdb_id, prefetched=prefetched)
+        )
+        tasks: list[asyncio.Task[Any]] = [details_task, watch_task]
+        try:
+            if not imdb_id and prefetched:
+                details = prefetched.get(self._tmdb_details_key(tmdb_id, lang))
+                if isinstance(details, dict):
+                    imdb_id = (details.get("external_ids") or {}).get("imdb_id")
+            if not imdb_id:
+                imdb_id = (await self.mappings.get_by_tmdb(tmdb_id)).get("imdb_id")
+            omdb_task = (
+                self._spawn(
+                    "omdb_rating", self._get_omdb_rating(imdb_id, prefetched=prefetched)
+                )
+                if imdb_id
+                else None
+            )
+            if omdb_task:
+                tasks.append(omdb_task)
+            tmdb_raw = await details_task
+            imdb_id = imdb_id or (tmdb_raw.get("external_ids") or {}).get("imdb_id")
+            await self.mappings.set_map(tmdb_id, kp_id, imdb_id)
+            imdb_extra = (
+                await omdb_task
+                if omdb_task
+                else await self._timed(
+                    "omdb_rating", self._get_omdb_rating(imdb_id, prefetched=prefetched)
+                )
+            )
+            watch_payload = await watch_task
+        finally:
+            await self._cancel_pending(tasks)
+
         watch_providers, watch_url, watch_offers = self._extract_watch_data(
             watch_payload,
             watch_region,
@@ -171,42 +390,131 @@ class MovieResolverService:
             watch_url=watch_url,
         )
         await self.cache.set_json(
-            f"norm:movie:{CACHE_SCHEMA_VERSION}:{tmdb_id}:{lang}:{watch_region}",
+            self._norm_key(tmdb_id, lang, watch_region),
             card.model_dump(),
             TTL_MOVIE_DETAIL,
         )
+        await self._record_rating(card)
         return card
 
-    async def _get_tmdb_details(self, tmdb_id: int, lang: str) -> dict[str, Any]:
-        key = f"raw:tmdb:{CACHE_SCHEMA_VERSION}:{tmdb_id}:{lang}"
-        hit, cached = await self.cache.get_json_hit(key)
-        if hit and isinstance(cached, dict):
-            return cached
-        details = await self.tmdb.get(
-            f"/movie/{tmdb_id}",
-            {"append_to_response": "external_ids,credits", "language": lang},
+    async def _record_rating(self, card: MovieCard) -> None:
+        # Only ratings we actually saw; a missing one may just be a flaky upstream.
+        tmdb_id = self._safe_int(card.tmdb_id)
+        if self.ratings is None or tmdb_id is None or card.imdb_rating is None:
+            return
+        try:
+            await self.ratings.record(
+                tmdb_id,
+                imdb_id=card.imdb_id,
+                rating=card.imdb_rating,
+                votes=card.imdb_votes,
+            )
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] rating index write failed: tmdb_id=%s error=%s",
+                tmdb_id,
+                exc.__class__.__name__,
+            )
+
+    @staticmethod
+    async def _timed(stage: str, awaitable: Awaitable[T]) -> T:
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            metrics.observe_stage(stage, (time.perf_counter() - started) * 1000)
+
+    @classmethod
+    def _spawn(cls, stage: str, awaitable: Awaitable[T]) -> asyncio.Task[T]:
+        return asyncio.ensure_future(cls._timed(stage, awaitable))
+
+    @staticmethod
+    async def _cancel_pending(tasks: list[asyncio.Task[Any]]) -> None:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _get_tmdb_details(
+        self,
+        tmdb_id: int,
+        lang: str,
+        *,
+        prefetched: Optional[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        async def fetch() -> dict[str, Any]:
+            details = await self.tmdb.get(
+                f"/movie/{tmdb_id}",
+                {"append_to_response": "external_ids,credits", "language": lang},
+            )
+            return self._project_tmdb_details(details)
+
+        details = await self._cached(
+            self._tmdb_details_key(tmdb_id, lang), TTL_MOVIE_DETAIL, fetch, prefetched
         )
-        await self.cache.set_json(key, details, TTL_MOVIE_DETAIL)
-        return details
+        return details if isinstance(details, dict) else {}
+
+    async def seed_kp_documents(self, docs: list[dict[str, Any]]) -> int:
+        """Cache KP list/random documents as raw KP details for later resolves.
+
+        Documents without persons (list pages skip them) are stored too; the
+        first resolve then fetches only the persons. Existing entries win.
+        """
+        values: dict[str, Any] = {}
+        for doc in docs:
+            kp_id = self._safe_int(doc.get("id")) if isinstance(doc, dict) else None
+            if kp_id is None or not self._kp_doc_is_seedable(doc):
+                continue
+            values[self._kp_details_key(kp_id)] = self._project_kp_movie(doc)
+        await self.cache.add_many(values, TTL_MOVIE_DETAIL)
+        return len(values)
+
+    @staticmethod
+    def _kp_doc_is_seedable(doc: dict[str, Any]) -> bool:
+        has_title = any(doc.get(k) for k in ("name", "alternativeName", "enName"))
+        return has_title and all(k in doc for k in KP_SEED_REQUIRED_FIELDS)
 
     async def _get_kp_details(self, kp_id: int) -> dict[str, Any]:
-        key = f"raw:kp:{kp_id}"
-        hit, cached = await self.cache.get_json_hit(key)
-        if hit and isinstance(cached, dict):
-            return cached
-        payload = await self.poiskkino.get(f"/v1.4/movie/{kp_id}")
-        await self.cache.set_json(key, payload, TTL_MOVIE_DETAIL)
-        return payload
+        async def fetch() -> dict[str, Any]:
+            movie = await self.poiskkino.get(f"/v1.4/movie/{kp_id}")
+            # A full document without people has none; only seeded entries lack the key.
+            return self._project_kp_movie({**movie, "persons": movie.get("persons") or []})
 
-    async def _get_tmdb_watch_providers(self, tmdb_id: int) -> dict[str, Any]:
-        key = f"raw:tmdb:watch:{tmdb_id}"
-        hit, cached = await self.cache.get_json_hit(key)
-        if hit and isinstance(cached, dict):
-            return cached
-        payload = await self.tmdb.get(f"/movie/{tmdb_id}/watch/providers")
-        await self.cache.set_json(key, payload, TTL_MOVIE_DETAIL)
+        key = self._kp_details_key(kp_id)
+        payload = await self.cache.get_or_compute(key, TTL_MOVIE_DETAIL, fetch)
+        if not isinstance(payload, dict):
+            return {}
+        if "persons" not in payload:
+            # Seeded from a list page: only the people are still missing.
+            persons = await self._get_kp_persons(kp_id)
+            payload = self._project_kp_movie({**payload, "persons": persons})
+            await self.cache.set_json(key, payload, TTL_MOVIE_DETAIL)
         return payload
 
+    async def _get_kp_persons(self, kp_id: int) -> list[dict[str, Any]]:
+        payload = await self.poiskkino.get(
+            "/v1.4/movie",
+            params={"id": kp_id, "limit": 1, "selectFields": ["id", "persons"]},
+        )
+        for doc in payload.get("docs") or []:
+            if isinstance(doc, dict) and self._safe_int(doc.get("id")) == kp_id:
+                persons = doc.get("persons")
+                return persons if isinstance(persons, list) else []
+        return []
+
+    async def _get_tmdb_watch_providers(
+        self, tmdb_id: int, *, prefetched: Optional[dict[str, Any]] = None
+    ) -> dict[str, Any]:
+        async def fetch() -> dict[str, Any]:
+            payload = await self.tmdb.get(f"/movie/{tmdb_id}/watch/providers")
+            return self._project_tmdb_watch(payload)
+
+        payload = await self._cached(
+            self._watch_key(tmdb_id), TTL_MOVIE_DETAIL, fetch, prefetched
+        )
+        return payload if isinstance(payload, dict) else {}
+
     async def _kp_lookup_by_external(
         self, *, tmdb_id: Optional[int], imdb_id: Optional[str]
     ) -> Optional[int]:
@@ -227,25 +535,121 @@ class MovieResolverService:
         except (TypeError, ValueError):
             return None
 
-    async def _get_omdb_rating(self, imdb_id: Optional[str]) -> Optional[dict[str, Any]]:
+    async def _get_omdb_rating(
+        self, imdb_id: Optional[str], *, prefetched: Optional[dict[str, Any]] = None
+    ) -> Optional[dict[str, Any]]:
         if not imdb_id:
             return None
-        key = f"omdb:{imdb_id}"
-        hit, cached = await self.cache.get_json_hit(key)
-        if hit:
-            if isinstance(cached, dict):
-                if cached.get("_missing"):
-                    return None
-                return cached
+
+        async def fetch() -> dict[str, Any]:
+            data = await self.omdb.rating(imdb_id)
+            return data if isinstance(data, dict) else {"_missing": True}
+
+        # Cache negative OMDb lookups for a short period to avoid
+        # repeatedly hitting OMDb while still allowing quick recovery.
+        cached = await self._cached(
+            self._omdb_key(imdb_id),
+            lambda value: TTL_OMDB_NEGATIVE if value.get("_missing") else TTL_MOVIE_DETAIL,
+            fetch,
+            prefetched,
+        )
+        if not isinstance(cached, dict) or cached.get("_missing"):
             return None
-        data = await self.omdb.rating(imdb_id)
-        if isinstance(data, dict):
-            await self.cache.set_json(key, data, TTL_MOVIE_DETAIL)
-        else:
-            # Cache negative OMDb lookups for a short period to avoid
-            # repeatedly hitting OMDb while still allowing quick recovery.
-            await self.cache.set_json(key, {"_missing": True}, TTL_OMDB_NEGATIVE)
-        return data
+        return cached
+
+    @staticmethod
+    def _project_tmdb_details(details: dict[str, Any]) -> dict[str, Any]:
+        """Keep only what _normalize_tmdb reads, so raw cache entries stay small."""
+        if not isinstance(details, dict):
+            return {}
+        out = {k: details[k] for k in TMDB_DETAIL_FIELDS if k in details}
+        out["genres"] = [
+            {"name": g.get("name")}
+            for g in details.get("genres") or []
+            if isinstance(g, dict) and g.get("name")
+        ]
+        out["production_countries"] = [
+            {"name": c.get("name"), "iso_3166_1": c.get("iso_3166_1")}
+            for c in details.get("production_countries") or []
+            if isinstance(c, dict)
+        ]
+        external = details.get("external_ids")
+        out["external_ids"] = (
+            {"imdb_id": external.get("imdb_id")} if isinstance(external, dict) else {}
+        )
+        out["credits"] = {
+            "crew": [
+                {"job": "Director", "name": name}
+                for name in MovieResolverService._extract_tmdb_directors(details)
+            ],
+            "cast": [
+                {"name": name}
+                for name in MovieResolverService._extract_tmdb_cast(details)
+            ],
+        }
+        return out
+
+    @staticmethod
+    def _project_tmdb_watch(payload: dict[str, Any]) -> dict[str, Any]:
+        """Keep every region (the card picks one later) but only provider basics."""
+        results = payload.get("results") if isinstance(payload, dict) else None
+        if not isinstance(results, dict):
+            return {}
+        projected: dict[str, Any] = {}
+        for region, region_payload in results.items():
+            if not isinstance(region_payload, dict):
+                continue
+            row: dict[str, Any] = {}
+            if region_payload.get("link"):
+                row["link"] = region_payload.get("link")
+            for key in WATCH_OFFER_TYPES:
+                values = region_payload.get(key)
+                if isinstance(values, list):
+                    row[key] = [
+                        {
+                            "provider_id": v.get("provider_id"),
+                            "provider_name": v.get("provider_name"),
+                            "logo_path": v.get("logo_path"),
+                        }
+                        for v in values
+                        if isinstance(v, dict)
+                    ]
+            projected[region] = row
+        return {"results": projected}
+
+    @staticmethod
+    def _project_kp_movie(movie: dict[str, Any]) -> dict[str, Any]:
+        """Keep only what _normalize_kp and the id mappings read."""
+        if not isinstance(movie, dict):
+            return {}
+        out = {k: movie[k] for k in KP_MOVIE_FIELDS if k in movie}
+        for key in ("genres", "countries"):
+            out[key] = [
+                {"name": row.get("name")}
+                for row in movie.get(key) or []
+                if isinstance(row, dict) and row.get("name")
+            ]
+        for key, fields in (
+            ("externalId", ("imdb", "tmdb")),
+            ("rating", ("imdb", "kp")),
+            ("votes", ("imdb", "kp")),
+        ):
+            value = movie.get(key)
+            if isinstance(value, dict):
+                out[key] = {f: value.get(f) for f in fields if value.get(f) is not None}
+        for key in ("poster", "backdrop"):
+            value = movie.get(key)
+            if isinstance(value, dict) and value.get("url"):
+                out[key] = {"url": value.get("url")}
+        if isinstance(movie.get("persons"), list):
+            out["persons"] = [
+                {"enProfession": "director", "name": name}
+                for name in MovieResolverService._extract_kp_people(movie, role="director")
+            ] + [
+                {"enProfession": "actor", "name": name}
+                for name in MovieResolverService._extract_kp_people(movie, role="actor")
+            ]
+        return out
 
     @staticmethod
     def _normalize_tmdb(
@@ -368,7 +772,7 @@ class MovieResolverService:
             return [], None, []
         offers: list[dict[str, Any]] = []
         seen: set[str] = set()
-        for key in ("flatrate", "ads", "rent", "buy"):
+        for key in WATCH_OFFER_TYPES:
             values = region_payload.get(key)
             if not isinstance(values, list):
                 continue
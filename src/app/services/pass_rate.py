@@ -0,0 +1,84 @@
+import math
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+# Ratings are kept at 0.1 resolution, which is the step of the rating slider.
+RATING_BIN_SCALE = 10
+MISSING_BIN = "none"
+
+
+def rating_bin(rating: Optional[float]) -> str:
+    if rating is None:
+        return MISSING_BIN
+    try:
+        value = float(rating)
+    except (TypeError, ValueError):
+        return MISSING_BIN
+    return str(max(0, min(10 * RATING_BIN_SCALE, int(round(value * RATING_BIN_SCALE)))))
+
+
+def wilson_interval(passed: int, total: int, *, z: float = 1.96) -> tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+    if total <= 0:
+        return 0.0, 1.0
+    p = passed / total
+    denom = 1 + z * z / total
+    centre = (p + z * z / (2 * total)) / denom
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denom
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+@dataclass
+class PassRateEstimate:
+    rate: float
+    low: float
+    high: float
+    samples: int
+
+    @property
+    def half_width(self) -> float:
+        return (self.high - self.low) / 2
+
+
+@dataclass
+class RatingHistogram:
+    """IMDb ratings observed for one filter bucket, counted per 0.1 bin.
+
+    Storing the distribution instead of pass/fail counts lets one set of
+    samples answer every threshold on the slider.
+    """
+
+    counts: dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_ratings(cls, ratings: Iterable[Optional[float]]) -> "RatingHistogram":
+        histogram = cls()
+        for rating in ratings:
+            key = rating_bin(rating)
+            histogram.counts[key] = histogram.counts.get(key, 0) + 1
+        return histogram
+
+    @property
+    def samples(self) -> int:
+        return sum(self.counts.values())
+
+    def passing(self, min_rating: float) -> int:
+        if min_rating <= 0:
+            return self.samples
+        threshold = math.ceil(min_rating * RATING_BIN_SCALE - 1e-9)
+        return sum(
+            count
+            for key, count in self.counts.items()
+            if key != MISSING_BIN and int(key) >= threshold
+        )
+
+    def estimate(self, min_rating: float) -> PassRateEstimate:
+        total = self.samples
+        passed = self.passing(min_rating)
+        low, high = wilson_interval(passed, total)
+        return PassRateEstimate(
+            rate=passed / total if total else 0.0,
+            low=low,
+            high=high,
+            samples=total,
+        )
@@ -2,16 +2,82 @@ import asyncio
 import logging
 import random
 import re
-from typing import Optional
-
-from ..clients import PoiskkinoClient, TmdbClient
-from ..core.config import RECENT_LIMIT, TTL_RECENT
-from ..repositories import CacheRepository, RecentRepository
+from contextlib import aclosing
+from functools import partial
+from typing import AsyncIterator, Iterable, Optional
+
+import httpx
+
+from ..clients import PoiskkinoClient, Priority, TmdbClient, upstream_priority
+from ..core.config import (
+    CANDIDATE_INDEX_POOL_FACTOR,
+    CANDIDATE_INDEX_STALE_SEC,
+    DISCOVER_PAGE_CONCURRENCY,
+    KP_POOL_PAGE_SIZE,
+    PREVIEW_ESTIMATOR_BATCH,
+    PREVIEW_ESTIMATOR_MAX_HALF_WIDTH,
+    PREVIEW_ESTIMATOR_MIN_SAMPLES,
+    RECENT_LIMIT,
+    SPECULATIVE_WINDOW_MAX,
+    TTL_KP_POOL,
+    TTL_RECENT,
+)
+from ..repositories import (
+    CacheRepository,
+    CandidateIndexRepository,
+    CandidatePool,
+    FilterStatsRepository,
+    PassRateRepository,
+    RatingEntry,
+    RatingIndexRepository,
+    RecentRepository,
+    SeenFilterRepository,
+)
 from ..schemas import ApiError, FiltersPreviewOut, MovieCard
 from .movie_service import MovieResolverService
+from .pass_rate import RatingHistogram
+from .speculative import PassRateTracker, SpeculativeResolver
 
 logger = logging.getLogger("uvicorn.error")
 TTL_PREVIEW_ESTIMATE = min(TTL_RECENT, 60 * 15)
+DISCOVER_PAGE_SIZE = 20
+RU_POOL_PAGE_ATTEMPTS = 2
+RU_POOL_RESOLVE_ATTEMPTS = 3
+# Discover params besides genres that key a preview rating histogram.
+PREVIEW_BUCKET_PARAMS = (
+    ("primary_release_date.gte", "from"),
+    ("primary_release_date.lte", "to"),
+    ("with_runtime.gte", "rmin"),
+    ("with_runtime.lte", "rmax"),
+    ("with_origin_country", "c"),
+    ("sort_by", "s"),
+    ("vote_count.gte", "vc"),
+)
+# Everything _normalize_kp reads except persons, which would bloat 250-doc pages.
+KP_POOL_FIELDS = (
+    "id",
+    "name",
+    "alternativeName",
+    "enName",
+    "year",
+    "movieLength",
+    "description",
+    "shortDescription",
+    "genres",
+    "countries",
+    "poster",
+    "backdrop",
+    "externalId",
+    "rating",
+    "votes",
+)
+# Background preview sampling: strong refs to running tasks, one per bucket.
+_sampling_tasks: dict[str, asyncio.Task[None]] = {}
+
+
+def _forget_sampling_task(bucket: str, task: asyncio.Task[None]) -> None:
+    if _sampling_tasks.get(bucket) is task:
+        del _sampling_tasks[bucket]
 
 
 class RandomService:
@@ -23,12 +89,28 @@ class RandomService:
         tmdb: TmdbClient,
         poiskkino: PoiskkinoClient,
         movie_resolver: MovieResolverService,
+        pass_rates: PassRateTracker | None = None,
+        candidates: CandidateIndexRepository | None = None,
+        ratings: RatingIndexRepository | None = None,
+        rating_stats: PassRateRepository | None = None,
+        filter_stats: FilterStatsRepository | None = None,
+        seen: SeenFilterRepository | None = None,
     ) -> None:
         self.cache = cache
         self.recent = recent
+        self.candidates = candidates
+        self.ratings = ratings
+        self.rating_stats = rating_stats
+        self.filter_stats = filter_stats
+        self.seen = seen
         self.tmdb = tmdb
         self.poiskkino = poiskkino
         self.movie_resolver = movie_resolver
+        self.speculation: SpeculativeResolver[int, MovieCard] = SpeculativeResolver(
+            max_window=SPECULATIVE_WINDOW_MAX,
+            # The container shares one tracker so the window learns across spins.
+            tracker=pass_rates or PassRateTracker(),
+        )
 
     async def random_en(
         self,
@@ -43,6 +125,7 @@ class RandomService:
         exclude_tmdb: Optional[str],
         exclude_kp: Optional[str],
         lang: str,
+        session: Optional[str] = None,
     ) -> MovieCard | ApiError:
         strategy = self._discover_strategy(vote_avg_min)
         params: dict[str, object] = {
@@ -72,38 +155,26 @@ class RandomService:
         fkey = self.cache.filters_key(
             lang, year_from, year_to, runtime_min, runtime_max, genres, vote_avg_min, country
         )
-        recent_key = f"recent:tmdb:{fkey}"
-        first = await self.tmdb.get("/discover/movie", {**params, "page": 1, "language": lang})
-        total_pages = min(int(first.get("total_pages", 1) or 1), 500)
-        if total_pages == 0 or not first.get("results"):
-            return ApiError(error="No results for the current filters.")
-
-        page_plan = self._build_page_plan(total_pages, strategy["probe_pages"])
-        candidate_pool: list[dict[str, object]] = []
-        seen_ids: set[int] = set()
-
-        for page in page_plan:
-            page_data = first if page == 1 else await self.tmdb.get(
-                "/discover/movie", {**params, "page": page, "language": lang}
-            )
-            results = page_data.get("results", [])
-            if not isinstance(results, list):
-                continue
-            for item in results:
-                if not isinstance(item, dict):
-                    continue
-                mid = item.get("id")
-                if mid is None:
-                    continue
-                try:
-                    tmdb_id = int(mid)
-                except (TypeError, ValueError):
-                    continue
-                if tmdb_id in seen_ids or tmdb_id in excluded_tmdb_ids:
-                    continue
-                seen_ids.add(tmdb_id)
-                candidate_pool.append(item)
-
+        recent_key = f"recent:tmdb:v2:{fkey}"
+        await self._record_filters(
+            "en",
+            lang=lang,
+            year_from=year_from,
+            year_to=year_to,
+            runtime_min=runtime_min,
+            runtime_max=runtime_max,
+            genres=genres,
+            vote_avg_min=vote_avg_min,
+            country=country,
+        )
+        discovered = await self._discover_candidate_pool(
+            params=params, lang=lang, probe_pages=strategy["probe_pages"]
+        )
+        candidate_pool = [
+            item
+            for item in discovered
+            if self._safe_int(item.get("id")) not in excluded_tmdb_ids
+        ]
         if not candidate_pool:
             return ApiError(error="No results for the current filters.")
 
@@ -115,7 +186,7 @@ class RandomService:
             id_to_item[movie_id] = item
 
         candidate_ids = await self._order_by_recentness(
-            recent_key, list(id_to_item.keys()), prefer_shuffle=False
+            recent_key, list(id_to_item.keys()), prefer_shuffle=False, session=session
         )
         candidate_ids = self._weighted_order_candidates(
             candidate_ids,
@@ -127,25 +198,50 @@ class RandomService:
             runtime_max=runtime_max,
             prefer_shuffle=strategy["shuffle_candidates"],
         )
+        candidate_ids = await self._drop_known_rating_misses(candidate_ids, vote_avg_min)
         candidate_ids = candidate_ids[: strategy["max_resolve_candidates"]]
         watch_region = self._watch_region_for_request(lang=lang, country=country)
 
+        prefetched = await self.movie_resolver.prefetch(
+            lang=lang, tmdb_ids=candidate_ids, watch_region=watch_region
+        )
         checked = 0
         with_imdb = 0
-        for tmdb_id in candidate_ids:
-            checked += 1
-            movie = await self.movie_resolver.resolve(
+
+        async def resolve_candidate(tmdb_id: int) -> MovieCard:
+            return await self.movie_resolver.resolve(
                 lang=lang,
                 tmdb_id=tmdb_id,
                 watch_region=watch_region,
+                prefetched=prefetched,
             )
+
+        def accept(_: int, movie: MovieCard) -> bool:
+            nonlocal checked, with_imdb
+            checked += 1
             if movie.imdb_rating is not None:
                 with_imdb += 1
             if not self._passes_imdb_filter(movie.imdb_rating, vote_avg_min):
-                continue
+                return False
             kp_movie_id = self._safe_int(movie.kp_id)
-            if kp_movie_id is not None and kp_movie_id in excluded_kp_ids:
-                continue
+            return kp_movie_id is None or kp_movie_id not in excluded_kp_ids
+
+        tmdb_id, movie, speculation = await self.speculation.first_match(
+            candidate_ids,
+            resolve=resolve_candidate,
+            accept=accept,
+            bucket=self._pass_rate_bucket("en", vote_avg_min),
+        )
+        if speculation.wasted:
+            logger.info(
+                "[FilmSpin] speculative resolve: launched=%s consumed=%s cancelled=%s wasted=%s window=%s",
+                speculation.launched,
+                speculation.consumed,
+                speculation.cancelled,
+                speculation.wasted,
+                speculation.max_window,
+            )
+        if tmdb_id is not None and movie is not None:
             movie.recommendation_reason = self._build_recommendation_reason(
                 lang=lang,
                 movie=movie,
@@ -157,9 +253,7 @@ class RandomService:
                 vote_avg_min=vote_avg_min,
                 country=country,
             )
-            await self.recent.add(
-                recent_key, str(tmdb_id), ttl=TTL_RECENT, limit=RECENT_LIMIT
-            )
+            await self._remember_shown(recent_key, str(tmdb_id), session=session, kind="tmdb")
             return movie
 
         logger.info(
@@ -185,6 +279,7 @@ class RandomService:
         country: Optional[str],
         exclude_tmdb: Optional[str],
         exclude_kp: Optional[str],
+        session: Optional[str] = None,
     ) -> MovieCard | ApiError:
         params: dict[str, object] = {"type": "movie"}
         if year_from and year_to:
@@ -205,21 +300,156 @@ class RandomService:
         fkey = self.cache.filters_key(
             year_from, year_to, runtime_min, runtime_max, genres, vote_avg_min, country
         )
-        recent_key = f"recent:kp:{fkey}"
-        recent_ids = await self.recent.members(recent_key)
+        recent_key = f"recent:kp:v2:{fkey}"
+        await self._record_filters(
+            "ru",
+            year_from=year_from,
+            year_to=year_to,
+            runtime_min=runtime_min,
+            runtime_max=runtime_max,
+            genres=genres,
+            vote_avg_min=vote_avg_min,
+            country=country,
+        )
+        # Filled page by page with the ids in hand, not the whole history.
+        recent_ids: set[str] = set()
         watch_region = self._watch_region_for_request(lang="ru-RU", country=country)
 
+        def eligible(doc: dict[str, object]) -> bool:
+            kp_id = self._safe_int(doc.get("id"))
+            if kp_id is None or str(kp_id) in recent_ids or kp_id in excluded_kp_ids:
+                return False
+            external = doc.get("externalId") if isinstance(doc.get("externalId"), dict) else {}
+            if self._safe_int(external.get("tmdb")) in excluded_tmdb_ids:
+                return False
+            rating = doc.get("rating") if isinstance(doc.get("rating"), dict) else {}
+            return self._passes_imdb_filter(rating.get("imdb"), vote_avg_min)
+
+        checked = 0
+        with_imdb = 0
+        pages_tried: set[int] = set()
+        pool_key = f"kp:pool:v1:{fkey}"
+        total_pages = await self.cache.get_json(f"{pool_key}:pages")
+        # Ratings are embedded in list documents, so most spins resolve exactly
+        # one card from one (usually cached) page.
+        while len(pages_tried) < RU_POOL_PAGE_ATTEMPTS:
+            page = self._pick_pool_page(self._safe_int(total_pages), pages_tried)
+            if page is None:
+                break
+            pages_tried.add(page)
+            try:
+                pool = await self._kp_pool(pool_key, params, vote_avg_min, page)
+            except httpx.HTTPError as exc:
+                # The list endpoint is the fast path; /random still works without it.
+                logger.warning(
+                    "[FilmSpin] kp pool unavailable, sampling /random: error=%s",
+                    exc.__class__.__name__,
+                )
+                break
+            total_pages = pool.get("pages")
+            page_docs = [doc for doc in pool.get("docs") or [] if isinstance(doc, dict)]
+            recent_ids |= await self._recently_shown(
+                recent_key,
+                (str(doc.get("id")) for doc in page_docs),
+                session=session,
+                kind="kp",
+            )
+            docs = [doc for doc in page_docs if eligible(doc)]
+            random.shuffle(docs)
+            for doc in docs[:RU_POOL_RESOLVE_ATTEMPTS]:
+                kp_id = int(doc["id"])
+                checked += 1
+                movie = await self.movie_resolver.resolve(
+                    lang="ru-RU", kp_id=kp_id, watch_region=watch_region
+                )
+                if movie.imdb_rating is not None:
+                    with_imdb += 1
+                recent_ids.add(str(kp_id))
+                if not self._passes_imdb_filter(movie.imdb_rating, vote_avg_min):
+                    continue
+                if self._safe_int(movie.tmdb_id) in excluded_tmdb_ids:
+                    continue
+                return await self._finish_ru_pick(
+                    movie,
+                    kp_id=kp_id,
+                    recent_key=recent_key,
+                    session=session,
+                    year_from=year_from,
+                    year_to=year_to,
+                    runtime_min=runtime_min,
+                    runtime_max=runtime_max,
+                    genres=genres,
+                    vote_avg_min=vote_avg_min,
+                    country=country,
+                )
+
+        if self._safe_int(total_pages) == 0:
+            # The list is already filtered by rating: nothing /random finds would pass.
+            logger.info(
+                "[FilmSpin] ru imdb filter miss: min=%.1f empty kp pool", vote_avg_min
+            )
+            return ApiError(
+                error="No movies found for the selected IMDb rating filter. Try lowering the minimum rating."
+            )
+        # The sampled pages were all shown or excluded; /random reaches the rest
+        # of the catalogue, and recent_ids keeps what this spin already checked.
+        logger.info(
+            "[FilmSpin] kp pool exhausted, sampling /random: checked=%s with_imdb=%s pages_tried=%s",
+            checked,
+            with_imdb,
+            len(pages_tried),
+        )
+        return await self._random_ru_sampled(
+            params=params,
+            recent_key=recent_key,
+            recent_ids=recent_ids,
+            session=session,
+            watch_region=watch_region,
+            excluded_tmdb_ids=excluded_tmdb_ids,
+            excluded_kp_ids=excluded_kp_ids,
+            year_from=year_from,
+            year_to=year_to,
+            runtime_min=runtime_min,
+            runtime_max=runtime_max,
+            genres=genres,
+            vote_avg_min=vote_avg_min,
+            country=country,
+        )
+
+    async def _random_ru_sampled(
+        self,
+        *,
+        params: dict[str, object],
+        recent_key: str,
+        recent_ids: set[str],
+        session: Optional[str],
+        watch_region: str,
+        excluded_tmdb_ids: set[int],
+        excluded_kp_ids: set[int],
+        year_from: Optional[int],
+        year_to: Optional[int],
+        runtime_min: Optional[int],
+        runtime_max: Optional[int],
+        genres: Optional[str],
+        vote_avg_min: float,
+        country: Optional[str],
+    ) -> MovieCard | ApiError:
         attempts = self._ru_attempt_budget(vote_avg_min)
         checked = 0
         with_imdb = 0
         seen_this_round: set[str] = set()
         while attempts > 0:
             cand = await self.poiskkino.get("/v1.4/movie/random", params=params)
+            await self._seed_kp_documents([cand])
             cid = cand.get("id")
             if cid is None:
                 attempts -= 1
                 continue
             sid = str(cid)
+            if sid not in seen_this_round and sid not in recent_ids:
+                recent_ids |= await self._recently_shown(
+                    recent_key, [sid], session=session, kind="kp"
+                )
             if sid in recent_ids or sid in seen_this_round or self._safe_int(cid) in excluded_kp_ids:
                 attempts -= 1
                 continue
@@ -241,9 +471,11 @@ class RandomService:
             if tmdb_movie_id is not None and tmdb_movie_id in excluded_tmdb_ids:
                 attempts -= 1
                 continue
-            movie.recommendation_reason = self._build_recommendation_reason(
-                lang="ru-RU",
-                movie=movie,
+            return await self._finish_ru_pick(
+                movie,
+                kp_id=kp_id,
+                recent_key=recent_key,
+                session=session,
                 year_from=year_from,
                 year_to=year_to,
                 runtime_min=runtime_min,
@@ -252,10 +484,6 @@ class RandomService:
                 vote_avg_min=vote_avg_min,
                 country=country,
             )
-            await self.recent.add(
-                recent_key, str(kp_id), ttl=TTL_RECENT, limit=RECENT_LIMIT
-            )
-            return movie
 
         logger.info(
             "[FilmSpin] ru imdb filter miss: min=%.1f checked=%s with_imdb=%s attempt_budget=%s",
@@ -268,6 +496,101 @@ class RandomService:
             error="No movies found for the selected IMDb rating filter. Try lowering the minimum rating."
         )
 
+    async def _finish_ru_pick(
+        self,
+        movie: MovieCard,
+        *,
+        kp_id: int,
+        recent_key: str,
+        session: Optional[str],
+        year_from: Optional[int],
+        year_to: Optional[int],
+        runtime_min: Optional[int],
+        runtime_max: Optional[int],
+        genres: Optional[str],
+        vote_avg_min: float,
+        country: Optional[str],
+    ) -> MovieCard:
+        movie.recommendation_reason = self._build_recommendation_reason(
+            lang="ru-RU",
+            movie=movie,
+            year_from=year_from,
+            year_to=year_to,
+            runtime_min=runtime_min,
+            runtime_max=runtime_max,
+            genres=genres,
+            vote_avg_min=vote_avg_min,
+            country=country,
+        )
+        await self._remember_shown(recent_key, str(kp_id), session=session, kind="kp")
+        return movie
+
+    async def _record_filters(self, kind: str, **filters: object) -> None:
+        if self.filter_stats is None:
+            return
+        try:
+            await self.filter_stats.record(kind, filters)
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] filter stats write failed: error=%s", exc.__class__.__name__
+            )
+
+    async def _seed_kp_documents(self, docs: list[object]) -> None:
+        try:
+            await self.movie_resolver.seed_kp_documents(
+                [doc for doc in docs if isinstance(doc, dict)]
+            )
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] kp document seeding failed: error=%s", exc.__class__.__name__
+            )
+
+    @staticmethod
+    def _pick_pool_page(total_pages: Optional[int], tried: set[int]) -> Optional[int]:
+        if not total_pages:
+            return None if 1 in tried else 1
+        untried = [p for p in range(1, total_pages + 1) if p not in tried]
+        return random.choice(untried) if untried else None
+
+    async def _kp_pool(
+        self,
+        pool_key: str,
+        params: dict[str, object],
+        min_rating: float,
+        page: int,
+    ) -> dict[str, object]:
+        """One page of KP list documents for the filters, cached as a pool."""
+
+        async def fetch() -> dict[str, object]:
+            list_params: dict[str, object] = {
+                **params,
+                "page": page,
+                "limit": KP_POOL_PAGE_SIZE,
+                "selectFields": list(KP_POOL_FIELDS),
+            }
+            if min_rating > 0:
+                list_params["rating.imdb"] = f"{min_rating:g}-10"
+            payload = await self.poiskkino.get("/v1.4/movie", params=list_params)
+            docs = payload.get("docs")
+            if isinstance(docs, list):
+                await self._seed_kp_documents(docs)
+            total_pages = self._safe_int(payload.get("pages"))
+            if total_pages is None:
+                total = self._extract_poiskkino_total(payload) or 0
+                total_pages = (total + KP_POOL_PAGE_SIZE - 1) // KP_POOL_PAGE_SIZE
+            await self.cache.set_json(f"{pool_key}:pages", total_pages, TTL_KP_POOL)
+            return {
+                "pages": total_pages,
+                "docs": [
+                    MovieResolverService._project_kp_movie(doc)
+                    for doc in (docs if isinstance(docs, list) else [])
+                    if isinstance(doc, dict)
+                ],
+            }
+
+        pool = await self.cache.get_or_compute(f"{pool_key}:{page}", TTL_KP_POOL, fetch)
+        return pool if isinstance(pool, dict) else {}
+
     async def preview_en(
         self,
         *,
@@ -289,13 +612,45 @@ class RandomService:
             "preview:en:"
             f"{self.cache.filters_key(lang, year_from, year_to, runtime_min, runtime_max, genres, vote_avg_min, country, exclude_tmdb, exclude_kp)}"
         )
-        hit, cached = await self.cache.get_json_hit(cache_key)
-        if hit and isinstance(cached, dict):
+
+        async def estimate() -> dict[str, object]:
+            return await self._estimate_preview_en(
+                year_from=year_from,
+                year_to=year_to,
+                runtime_min=runtime_min,
+                runtime_max=runtime_max,
+                genres=genres,
+                vote_avg_min=vote_avg_min,
+                country=country,
+                excluded_tmdb_ids=excluded_tmdb_ids,
+                excluded_kp_ids=excluded_kp_ids,
+                lang=lang,
+            )
+
+        # Previews yield upstream capacity to spins.
+        with upstream_priority(Priority.PREVIEW):
+            cached = await self.cache.get_or_compute(
+                cache_key, TTL_PREVIEW_ESTIMATE, estimate
+            )
             try:
                 return FiltersPreviewOut.model_validate(cached)
             except Exception:
-                pass
+                return FiltersPreviewOut.model_validate(await estimate())
 
+    async def _estimate_preview_en(
+        self,
+        *,
+        year_from: Optional[int],
+        year_to: Optional[int],
+        runtime_min: Optional[int],
+        runtime_max: Optional[int],
+        genres: Optional[str],
+        vote_avg_min: float,
+        country: Optional[str],
+        excluded_tmdb_ids: set[int],
+        excluded_kp_ids: set[int],
+        lang: str,
+    ) -> dict[str, object]:
         strategy = self._discover_strategy(vote_avg_min)
         params: dict[str, object] = {
             "include_adult": "false",
@@ -323,19 +678,34 @@ class RandomService:
         total_pages = min(int(first.get("total_pages", 1) or 1), 500)
 
         if total_pages == 0 or total == 0:
-            result = FiltersPreviewOut(estimated_total=0, low_results=True, unavailable=False)
-            await self.cache.set_json(cache_key, result.model_dump(), TTL_PREVIEW_ESTIMATE)
-            return result
+            return FiltersPreviewOut(
+                estimated_total=0, low_results=True, unavailable=False
+            ).model_dump()
 
         if vote_avg_min <= 1.05:
             adjusted = max(0, total - len(excluded_tmdb_ids))
-            result = FiltersPreviewOut(
+            return FiltersPreviewOut(
                 estimated_total=adjusted,
                 low_results=adjusted < 25,
                 unavailable=False,
-            )
-            await self.cache.set_json(cache_key, result.model_dump(), TTL_PREVIEW_ESTIMATE)
-            return result
+            ).model_dump()
+
+        bucket = self._preview_bucket(params)
+        histogram = await self._load_rating_histogram(bucket)
+        if histogram is not None and histogram.samples >= PREVIEW_ESTIMATOR_MIN_SAMPLES:
+            estimate = histogram.estimate(vote_avg_min)
+            if estimate.half_width > PREVIEW_ESTIMATOR_MAX_HALF_WIDTH:
+                self._sample_ratings_later(
+                    bucket, params=params, lang=lang, total_pages=total_pages
+                )
+            estimated = max(0, int(round(total * estimate.rate)) - len(excluded_tmdb_ids))
+            if estimate.rate > 0 and estimated == 0:
+                estimated = 1
+            return FiltersPreviewOut(
+                estimated_total=estimated,
+                low_results=estimated < 25,
+                unavailable=False,
+            ).model_dump()
 
         sample_target = self._preview_sample_target(vote_avg_min, total)
         probe_pages = self._preview_probe_pages(vote_avg_min, total_pages, sample_target)
@@ -348,16 +718,14 @@ class RandomService:
             sample_target=sample_target,
         )
         if not candidate_ids:
-            result = FiltersPreviewOut(unavailable=True)
-            await self.cache.set_json(cache_key, result.model_dump(), TTL_PREVIEW_ESTIMATE)
-            return result
+            return FiltersPreviewOut(unavailable=True).model_dump()
 
         if excluded_tmdb_ids:
             candidate_ids = [x for x in candidate_ids if x not in excluded_tmdb_ids]
             if not candidate_ids:
-                result = FiltersPreviewOut(estimated_total=0, low_results=True, unavailable=False)
-                await self.cache.set_json(cache_key, result.model_dump(), TTL_PREVIEW_ESTIMATE)
-                return result
+                return FiltersPreviewOut(
+                    estimated_total=0, low_results=True, unavailable=False
+                ).model_dump()
 
         pass_stats = await self._count_imdb_preview_hits(
             lang=lang,
@@ -365,23 +733,23 @@ class RandomService:
             min_rating=vote_avg_min,
             excluded_kp_ids=excluded_kp_ids,
         )
+        # This sample leans on the top of the sort order and skips the
+        # caller's excludes, so it must not seed the shared statistics;
+        # an unbiased random-page batch does that in the background.
+        self._sample_ratings_later(bucket, params=params, lang=lang, total_pages=total_pages)
         if pass_stats is None:
-            result = FiltersPreviewOut(unavailable=True)
-            await self.cache.set_json(cache_key, result.model_dump(), TTL_PREVIEW_ESTIMATE)
-            return result
+            return FiltersPreviewOut(unavailable=True).model_dump()
 
         passed, checked = pass_stats
         estimated = int(round(total * (passed / checked))) if checked > 0 else 0
         if passed > 0 and estimated == 0:
             estimated = 1
 
-        result = FiltersPreviewOut(
+        return FiltersPreviewOut(
             estimated_total=max(0, estimated),
             low_results=estimated < 25,
             unavailable=False,
-        )
-        await self.cache.set_json(cache_key, result.model_dump(), TTL_PREVIEW_ESTIMATE)
-        return result
+        ).model_dump()
 
     async def preview_ru(
         self,
@@ -401,13 +769,39 @@ class RandomService:
             "preview:ru:"
             f"{self.cache.filters_key(year_from, year_to, runtime_min, runtime_max, genres, vote_avg_min, country, exclude_tmdb, exclude_kp)}"
         )
-        hit, cached = await self.cache.get_json_hit(cache_key)
-        if hit and isinstance(cached, dict):
+
+        async def estimate() -> dict[str, object]:
+            return await self._estimate_preview_ru(
+                year_from=year_from,
+                year_to=year_to,
+                runtime_min=runtime_min,
+                runtime_max=runtime_max,
+                genres=genres,
+                country=country,
+                excluded_kp_ids=excluded_kp_ids,
+            )
+
+        # Previews yield upstream capacity to spins.
+        with upstream_priority(Priority.PREVIEW):
+            cached = await self.cache.get_or_compute(
+                cache_key, TTL_PREVIEW_ESTIMATE, estimate
+            )
             try:
                 return FiltersPreviewOut.model_validate(cached)
             except Exception:
-                pass
+                return FiltersPreviewOut.model_validate(await estimate())
 
+    async def _estimate_preview_ru(
+        self,
+        *,
+        year_from: Optional[int],
+        year_to: Optional[int],
+        runtime_min: Optional[int],
+        runtime_max: Optional[int],
+        genres: Optional[str],
+        country: Optional[str],
+        excluded_kp_ids: set[int],
+    ) -> dict[str, object]:
         params: dict[str, object] = {"type": "movie", "page": 1, "limit": 1}
         if year_from and year_to:
             params["year"] = f"{year_from}-{year_to}"
@@ -422,19 +816,17 @@ class RandomService:
         self._apply_ru_runtime_filter(params, runtime_min=runtime_min, runtime_max=runtime_max)
 
         payload = await self.poiskkino.get("/v1.4/movie", params=params)
+        if isinstance(payload.get("docs"), list):
+            await self._seed_kp_documents(payload["docs"])
         total = self._extract_poiskkino_total(payload)
         if total is None:
-            result = FiltersPreviewOut(unavailable=True)
-            await self.cache.set_json(cache_key, result.model_dump(), TTL_PREVIEW_ESTIMATE)
-            return result
+            return FiltersPreviewOut(unavailable=True).model_dump()
         adjusted = max(0, total - len(excluded_kp_ids))
-        result = FiltersPreviewOut(
+        return FiltersPreviewOut(
             estimated_total=adjusted,
             low_results=adjusted < 25,
             unavailable=False,
-        )
-        await self.cache.set_json(cache_key, result.model_dump(), TTL_PREVIEW_ESTIMATE)
-        return result
+        ).model_dump()
 
     @staticmethod
     def _normalize_iso_country_filter(raw: str) -> str:
@@ -455,6 +847,10 @@ class RandomService:
         except (TypeError, ValueError):
             return False
 
+    @staticmethod
+    def _pass_rate_bucket(source: str, min_rating: float) -> str:
+        return f"{source}:{round(max(0.0, min_rating) * 2) / 2:.1f}"
+
     @staticmethod
     def _discover_strategy(min_rating: float) -> dict[str, object]:
         if min_rating >= 8.5:
@@ -490,16 +886,117 @@ class RandomService:
         }
 
     @staticmethod
-    def _build_page_plan(total_pages: int, probe_pages: int) -> list[int]:
+    def _build_page_plan(
+        total_pages: int, probe_pages: int, *, skip: set[int] | None = None
+    ) -> list[int]:
         if total_pages <= 1:
             return [1]
         max_probe = max(1, min(probe_pages, total_pages))
         if max_probe == 1:
             return [1]
-        candidates = list(range(2, total_pages + 1))
-        extras = random.sample(candidates, k=max_probe - 1)
+        candidates = [p for p in range(2, total_pages + 1) if not skip or p not in skip]
+        extras = random.sample(candidates, k=min(max_probe - 1, len(candidates)))
         return [1, *extras]
 
+    async def _discover_candidate_pool(
+        self, *, params: dict[str, object], lang: str, probe_pages: int
+    ) -> list[dict[str, object]]:
+        """Candidates for one spin, served from the candidate index when it is
+        big and fresh enough; otherwise new discover pages are fetched into it.
+        """
+        sample_size = probe_pages * DISCOVER_PAGE_SIZE
+        index_key = self._candidate_index_key(params, lang)
+        pool = await self._load_candidate_index(index_key)
+        fresh = pool is not None and pool.age() < CANDIDATE_INDEX_STALE_SEC
+        if fresh and not self._candidate_index_is_thin(pool, sample_size):
+            return self._sample_candidates(list(pool.items.values()), sample_size)
+
+        first = await self.tmdb.get("/discover/movie", {**params, "page": 1, "language": lang})
+        total_pages = min(int(first.get("total_pages", 1) or 1), 500)
+        if total_pages == 0 or not first.get("results"):
+            return []
+
+        page_plan = self._build_page_plan(
+            total_pages, probe_pages, skip=pool.pages if fresh else None
+        )
+        fetched_pages = {1}
+        items = await self._collect_discover_candidates(
+            params=params,
+            lang=lang,
+            first_page=first,
+            pages=[page for page in page_plan if page != 1],
+            fetched_pages=fetched_pages,
+        )
+        await self._record_candidate_index(
+            index_key,
+            items=items,
+            pages=fetched_pages,
+            total_pages=total_pages,
+            total_results=self._safe_int(first.get("total_results")) or 0,
+            reset=not fresh,
+        )
+        if not fresh:
+            return items
+        merged: dict[object, dict[str, object]] = dict(pool.items)
+        for item in items:
+            merged[self._safe_int(item.get("id"))] = item
+        return self._sample_candidates(list(merged.values()), sample_size)
+
+    def _candidate_index_key(self, params: dict[str, object], lang: str) -> str:
+        return self.cache.filters_key(lang, *(f"{k}={params[k]}" for k in sorted(params)))
+
+    @staticmethod
+    def _candidate_index_is_thin(pool: CandidatePool, sample_size: int) -> bool:
+        if pool.total_pages and len(pool.pages) >= pool.total_pages:
+            return False
+        # Keep a few spins' worth of candidates so consecutive spins still vary.
+        return len(pool.items) < sample_size * CANDIDATE_INDEX_POOL_FACTOR
+
+    @staticmethod
+    def _sample_candidates(
+        items: list[dict[str, object]], sample_size: int
+    ) -> list[dict[str, object]]:
+        if len(items) <= sample_size:
+            return items
+        return random.sample(items, k=sample_size)
+
+    async def _load_candidate_index(self, index_key: str) -> Optional[CandidatePool]:
+        if self.candidates is None:
+            return None
+        try:
+            return await self.candidates.load(index_key)
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] candidate index read failed: error=%s", exc.__class__.__name__
+            )
+            return None
+
+    async def _record_candidate_index(
+        self,
+        index_key: str,
+        *,
+        items: list[dict[str, object]],
+        pages: set[int],
+        total_pages: int,
+        total_results: int,
+        reset: bool,
+    ) -> None:
+        if self.candidates is None or not items:
+            return
+        try:
+            await self.candidates.record(
+                index_key,
+                items=items,
+                pages=pages,
+                total_pages=total_pages,
+                total_results=total_results,
+                reset=reset,
+            )
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] candidate index write failed: error=%s", exc.__class__.__name__
+            )
+
     async def _collect_preview_candidates(
         self,
         *,
@@ -514,38 +1011,103 @@ class RandomService:
             return []
 
         page_plan = self._build_page_plan(total_pages, probe_pages)
-        pages = [page for page in page_plan if page != 1]
-        payloads: list[dict[str, object]] = [first_page]
-
-        if pages:
-            tasks = [
-                self.tmdb.get("/discover/movie", {**params, "page": page, "language": lang})
-                for page in pages
-            ]
-            responses = await asyncio.gather(*tasks, return_exceptions=True)
-            for response in responses:
-                if isinstance(response, Exception):
-                    continue
-                payloads.append(response)
-
+        items = await self._collect_discover_candidates(
+            params=params,
+            lang=lang,
+            first_page=first_page,
+            pages=[page for page in page_plan if page != 1],
+            limit=sample_target,
+        )
         candidate_ids: list[int] = []
+        for item in items:
+            movie_id = self._safe_int(item.get("id"))
+            if movie_id is not None:
+                candidate_ids.append(movie_id)
+        return candidate_ids
+
+    async def _collect_discover_candidates(
+        self,
+        *,
+        params: dict[str, object],
+        lang: str,
+        first_page: dict[str, object],
+        pages: list[int],
+        excluded_ids: set[int] | None = None,
+        limit: Optional[int] = None,
+        fetched_pages: set[int] | None = None,
+    ) -> list[dict[str, object]]:
+        excluded = excluded_ids or set()
+        candidates: list[dict[str, object]] = []
         seen_ids: set[int] = set()
 
-        for payload in payloads:
+        def consume(payload: dict[str, object]) -> bool:
+            page = self._safe_int(payload.get("page"))
+            if fetched_pages is not None and page is not None:
+                fetched_pages.add(page)
             results = payload.get("results")
             if not isinstance(results, list):
-                continue
+                return False
             for item in results:
                 if not isinstance(item, dict):
                     continue
                 movie_id = self._safe_int(item.get("id"))
-                if movie_id is None or movie_id in seen_ids:
+                if movie_id is None or movie_id in seen_ids or movie_id in excluded:
                     continue
                 seen_ids.add(movie_id)
-                candidate_ids.append(movie_id)
-                if len(candidate_ids) >= sample_target:
-                    return candidate_ids
-        return candidate_ids
+                candidates.append(item)
+                if limit is not None and len(candidates) >= limit:
+                    return True
+            return False
+
+        if consume(first_page):
+            return candidates
+        async with aclosing(
+            self._iter_discover_pages(params=params, lang=lang, pages=pages)
+        ) as stream:
+            async for payload in stream:
+                if consume(payload):
+                    break
+        return candidates
+
+    async def _iter_discover_pages(
+        self, *, params: dict[str, object], lang: str, pages: list[int]
+    ) -> AsyncIterator[dict[str, object]]:
+        if not pages:
+            return
+        semaphore = asyncio.Semaphore(DISCOVER_PAGE_CONCURRENCY)
+
+        async def fetch(page: int) -> dict[str, object]:
+            async with semaphore:
+                return await self.tmdb.get(
+                    "/discover/movie", {**params, "page": page, "language": lang}
+                )
+
+        tasks = [asyncio.create_task(fetch(page)) for page in pages]
+        failed = 0
+        try:
+            # Yield pages in completion order so callers can stop early.
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    payload = await next_done
+                except Exception as exc:
+                    failed += 1
+                    logger.info(
+                        "[FilmSpin] discover page failed: error=%s",
+                        exc.__class__.__name__,
+                    )
+                    continue
+                yield payload
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if failed:
+                logger.warning(
+                    "[FilmSpin] discover pages partially failed: failed=%s requested=%s",
+                    failed,
+                    len(pages),
+                )
 
     async def _count_imdb_preview_hits(
         self,
@@ -554,18 +1116,35 @@ class RandomService:
         tmdb_ids: list[int],
         min_rating: float,
         excluded_kp_ids: set[int],
+        ratings_out: Optional[list[Optional[float]]] = None,
     ) -> Optional[tuple[int, int]]:
         if not tmdb_ids:
             return None
 
+        known = await self._known_ratings(tmdb_ids)
+        prefetched = await self.movie_resolver.prefetch(
+            lang=lang, tmdb_ids=[x for x in tmdb_ids if x not in known]
+        )
         semaphore = asyncio.Semaphore(6)
 
         async def inspect(tmdb_id: int) -> Optional[bool]:
+            entry = known.get(tmdb_id)
+            if entry is not None:
+                passes = self._passes_imdb_filter(entry.rating, min_rating)
+                # A known pass still needs the card when KP ids are excluded.
+                if not passes or not excluded_kp_ids:
+                    if ratings_out is not None:
+                        ratings_out.append(entry.rating)
+                    return passes
             async with semaphore:
                 try:
-                    movie = await self.movie_resolver.resolve(lang=lang, tmdb_id=tmdb_id)
+                    movie = await self.movie_resolver.resolve(
+                        lang=lang, tmdb_id=tmdb_id, prefetched=prefetched
+                    )
                 except Exception:
                     return None
+                if ratings_out is not None:
+                    ratings_out.append(movie.imdb_rating)
                 kp_movie_id = self._safe_int(movie.kp_id)
                 if kp_movie_id is not None and kp_movie_id in excluded_kp_ids:
                     return False
@@ -581,6 +1160,145 @@ class RandomService:
         checked = len(usable)
         return passed, checked
 
+    @staticmethod
+    def _preview_bucket(params: dict[str, object]) -> str:
+        """Histogram key for the discover query the background sampler replays.
+
+        Every filter that narrows the result set is part of the key, so a
+        bucket's ratings always come from the population it estimates.
+        """
+        genres = str(params.get("with_genres") or "")
+        # "," means all genres and "|" any genre on TMDb, so keep the separator.
+        separator = "|" if "|" in genres else ","
+        genre_key = separator.join(
+            sorted(p.strip() for p in re.split(r"[|,]", genres) if p.strip())
+        )
+        parts = [f"g={genre_key or '*'}"]
+        for name, short in PREVIEW_BUCKET_PARAMS:
+            value = params.get(name)
+            parts.append(f"{short}={'*' if value in (None, '') else value}")
+        return "en:" + ":".join(parts)
+
+    async def _load_rating_histogram(self, bucket: str) -> Optional[RatingHistogram]:
+        if self.rating_stats is None:
+            return None
+        try:
+            return RatingHistogram(counts=await self.rating_stats.load(bucket))
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] preview stats read failed: error=%s", exc.__class__.__name__
+            )
+            return None
+
+    async def _record_rating_histogram(
+        self, bucket: str, ratings: list[Optional[float]]
+    ) -> None:
+        if self.rating_stats is None or not ratings:
+            return
+        try:
+            await self.rating_stats.add(bucket, RatingHistogram.from_ratings(ratings).counts)
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] preview stats write failed: error=%s", exc.__class__.__name__
+            )
+
+    def _sample_ratings_later(
+        self,
+        bucket: str,
+        *,
+        params: dict[str, object],
+        lang: str,
+        total_pages: int,
+    ) -> None:
+        """Add one batch of samples to a bucket whose estimate is still too wide."""
+        running = _sampling_tasks.get(bucket)
+        if self.rating_stats is None or (running is not None and not running.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # The task copies the current context, lane included.
+        with upstream_priority(Priority.BACKGROUND):
+            task = loop.create_task(
+                self._sample_ratings(
+                    bucket, params=params, lang=lang, total_pages=total_pages
+                )
+            )
+        _sampling_tasks[bucket] = task
+        task.add_done_callback(partial(_forget_sampling_task, bucket))
+
+    async def _sample_ratings(
+        self,
+        bucket: str,
+        *,
+        params: dict[str, object],
+        lang: str,
+        total_pages: int,
+    ) -> None:
+        try:
+            if not await self.rating_stats.claim(bucket, seconds=60):
+                return
+            # Random pages only: page 1 is the top of the sort order and would
+            # skew the distribution, unless it is the whole result.
+            candidates = range(2, total_pages + 1) if total_pages > 1 else range(1, 2)
+            page_count = min(len(candidates), PREVIEW_ESTIMATOR_BATCH // DISCOVER_PAGE_SIZE + 2)
+            pages = random.sample(candidates, k=page_count)
+            items = await self._collect_discover_candidates(
+                params=params,
+                lang=lang,
+                first_page={},
+                pages=pages,
+                limit=PREVIEW_ESTIMATOR_BATCH,
+            )
+            tmdb_ids = [
+                movie_id
+                for movie_id in (self._safe_int(item.get("id")) for item in items)
+                if movie_id is not None
+            ]
+            observed: list[Optional[float]] = []
+            await self._count_imdb_preview_hits(
+                lang=lang,
+                tmdb_ids=tmdb_ids,
+                min_rating=0.0,
+                excluded_kp_ids=set(),
+                ratings_out=observed,
+            )
+            await self._record_rating_histogram(bucket, observed)
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] background preview sampling failed: bucket=%s error=%s",
+                bucket,
+                exc.__class__.__name__,
+            )
+
+    async def _known_ratings(self, tmdb_ids: list[int]) -> dict[int, RatingEntry]:
+        if self.ratings is None or not tmdb_ids:
+            return {}
+        try:
+            return await self.ratings.lookup(tmdb_ids)
+        except Exception as exc:
+            logger.info(
+                "[FilmSpin] rating index read failed: error=%s", exc.__class__.__name__
+            )
+            return {}
+
+    async def _drop_known_rating_misses(
+        self, tmdb_ids: list[int], min_rating: float
+    ) -> list[int]:
+        """Skip candidates the rating index already knows fail the filter."""
+        if min_rating <= 0:
+            return tmdb_ids
+        known = await self._known_ratings(tmdb_ids)
+        if not known:
+            return tmdb_ids
+        return [
+            tmdb_id
+            for tmdb_id in tmdb_ids
+            if tmdb_id not in known
+            or self._passes_imdb_filter(known[tmdb_id].rating, min_rating)
+        ]
+
     @staticmethod
     def _parse_int_set(raw: Optional[str]) -> set[int]:
         if not raw:
@@ -687,8 +1405,9 @@ class RandomService:
         votes_component = min(1.0, vote_count / 1400.0)
         score = 0.45 + rating_component * 1.35 + pop_component * 0.7 + votes_component * 0.55
 
-        release_date = str(item.get("release_date") or "")
-        release_year = RandomService._safe_int(release_date[:4])
+        release_year = RandomService._safe_int(item.get("release_year"))
+        if release_year is None:
+            release_year = RandomService._safe_int(str(item.get("release_date") or "")[:4])
         if release_year is not None and year_from and year_to and year_from <= year_to:
             mid = (year_from + year_to) / 2.0
             span = max(1.0, (year_to - year_from) / 2.0)
@@ -746,17 +1465,42 @@ class RandomService:
             return "Под ваш запрос" if is_ru else "Picked for your request"
         return " • ".join(parts[:4])
 
+    async def _recently_shown(
+        self, recent_key: str, ids: Iterable[str], *, session: Optional[str], kind: str
+    ) -> set[str]:
+        # A visitor with a session is compared with their own history only.
+        if session and self.seen is not None:
+            return await self.seen.seen(session, kind, ids)
+        return await self.recent.seen(recent_key, ids)
+
+    async def _remember_shown(
+        self, recent_key: str, movie_id: str, *, session: Optional[str], kind: str
+    ) -> None:
+        if session and self.seen is not None:
+            await self.seen.add(session, kind, movie_id)
+            return
+        await self.recent.add(recent_key, movie_id, ttl=TTL_RECENT, limit=RECENT_LIMIT)
+
     async def _order_by_recentness(
-        self, recent_key: str, candidate_pool: list[int], *, prefer_shuffle: bool
+        self,
+        recent_key: str,
+        candidate_pool: list[int],
+        *,
+        prefer_shuffle: bool,
+        session: Optional[str] = None,
     ) -> list[int]:
         if not candidate_pool:
             return []
-        recent = await self.recent.members(recent_key)
+        recent = await self._recently_shown(
+            recent_key, (str(x) for x in candidate_pool), session=session, kind="tmdb"
+        )
         fresh = [x for x in candidate_pool if str(x) not in recent]
         stale = [x for x in candidate_pool if str(x) in recent]
 
         if not fresh:
-            await self.recent.redis.delete(recent_key)
+            # A session's Bloom filter cannot drop single titles; allow repeats.
+            if not session or self.seen is None:
+                await self.recent.clear(recent_key)
             ordered = candidate_pool[:]
         else:
             ordered = [*fresh, *stale]
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from threading import Lock
+from typing import Awaitable, Callable, Optional
+
+from redis.asyncio import Redis
+
+from ..clients import Priority, upstream_priority
+
+logger = logging.getLogger("uvicorn.error")
+
+_RENEW_LEASE = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class HotCardTracker:
+    """Counts card reads locally; the counts are flushed to Redis in batches.
+
+    A member is ``"{tmdb_id}:{lang}:{region}"``, which is everything needed to
+    rebuild the card, so any worker can refresh what another worker served.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._pending: Counter[str] = Counter()
+
+    @staticmethod
+    def member(tmdb_id: int, lang: str, region: str) -> str:
+        return f"{tmdb_id}:{lang}:{region}"
+
+    @staticmethod
+    def parse(member: str) -> Optional[tuple[int, str, str]]:
+        parts = member.split(":")
+        if len(parts) != 3:
+            return None
+        try:
+            return int(parts[0]), parts[1], parts[2]
+        except ValueError:
+            return None
+
+    def touch(self, tmdb_id: int, lang: str, region: str) -> None:
+        with self._lock:
+            self._pending[self.member(tmdb_id, lang, region)] += 1
+
+    def drain(self) -> dict[str, int]:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        return dict(pending)
+
+
+class RefreshScheduler:
+    """Rebuilds the hottest cards shortly before they expire.
+
+    Every worker flushes its read counts into one sorted set; only the worker
+    holding the leader lease decays the counts and spends the refresh budget.
+    """
+
+    HOT_KEY = "hot:cards"
+    LEADER_KEY = "lock:refresh:leader"
+
+    def __init__(
+        self,
+        tracker: HotCardTracker,
+        *,
+        interval_sec: float,
+        top_n: int,
+        lead_sec: int,
+        budget: int,
+        stale_sec: int = 0,
+        decay: float = 0.95,
+        max_tracked: int = 5_000,
+    ) -> None:
+        self.tracker = tracker
+        self.interval_sec = interval_sec
+        self.top_n = top_n
+        self.lead_sec = lead_sec
+        self.budget = budget
+        # Cards outlive their freshness by the stale window; PTTL includes it.
+        self.stale_sec = stale_sec
+        self.decay = decay
+        self.max_tracked = max_tracked
+        self._token = uuid.uuid4().hex
+        self._task: asyncio.Task[None] | None = None
+        self._stats: Counter[str] = Counter()
+        self._leader = False
+
+    def start(
+        self,
+        redis_factory: Callable[[], Awaitable[Redis]],
+        card_key: Callable[[int, str, str], str],
+        refresh_card: Callable[[int, str, str], Awaitable[object]],
+    ) -> None:
+        if self._task is None or self._task.done():
+            # Refreshes run in the background lane: spins go first.
+            with upstream_priority(Priority.BACKGROUND):
+                self._task = asyncio.create_task(
+                    self._run(redis_factory, card_key, refresh_card)
+                )
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(
+        self,
+        redis_factory: Callable[[], Awaitable[Redis]],
+        card_key: Callable[[int, str, str], str],
+        refresh_card: Callable[[int, str, str], Awaitable[object]],
+    ) -> None:
+        while True:
+            await asyncio.sleep(self.interval_sec)
+            try:
+                redis = await redis_factory()
+                await self.tick(redis, card_key, refresh_card)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._stats["errors"] += 1
+                logger.warning(
+                    "[FilmSpin] refresh tick failed: error=%s", exc.__class__.__name__
+                )
+
+    async def tick(
+        self,
+        redis: Redis,
+        card_key: Callable[[int, str, str], str],
+        refresh_card: Callable[[int, str, str], Awaitable[object]],
+    ) -> int:
+        """Flush local counts and, when leading, refresh expiring hot cards."""
+        self._stats["ticks"] += 1
+        pending = self.tracker.drain()
+        if pending:
+            pipe = redis.pipeline()
+            for member, count in pending.items():
+                pipe.zincrby(self.HOT_KEY, count, member)
+            await pipe.execute()
+
+        self._leader = await self.hold_lease(redis)
+        if not self._leader:
+            return 0
+
+        hot = await redis.zrevrange(self.HOT_KEY, 0, self.top_n - 1)
+        cards = [(m, parsed) for m in hot if (parsed := self.tracker.parse(str(m)))]
+        due: list[tuple[int, str, str]] = []
+        if cards:
+            pipe = redis.pipeline()
+            for _, parsed in cards:
+                pipe.pttl(card_key(*parsed))
+            for (_, parsed), pttl in zip(cards, await pipe.execute(), strict=False):
+                # -2: already gone (the next reader would pay the cold path).
+                horizon = (self.lead_sec + self.stale_sec) * 1000
+                if pttl == -2 or (isinstance(pttl, int) and 0 <= pttl < horizon):
+                    due.append(parsed)
+
+        refreshed = 0
+        for parsed in due[: self.budget]:
+            try:
+                await refresh_card(*parsed)
+                refreshed += 1
+            except Exception as exc:
+                self._stats["failed"] += 1
+                logger.info(
+                    "[FilmSpin] card refresh failed: card=%s error=%s",
+                    HotCardTracker.member(*parsed),
+                    exc.__class__.__name__,
+                )
+        self._stats["refreshed"] += refreshed
+        self._stats["over_budget"] += max(0, len(due) - self.budget)
+
+        # Decay so old hits fade out over a few minutes, and keep the set bounded.
+        pipe = redis.pipeline()
+        pipe.zunionstore(self.HOT_KEY, {self.HOT_KEY: self.decay})
+        pipe.zremrangebyrank(self.HOT_KEY, 0, -(self.max_tracked + 1))
+        await pipe.execute()
+        return refreshed
+
+    async def hold_lease(self, redis: Redis) -> bool:
+        """Take or renew the leader lease; True while this worker leads."""
+        lease_ms = int(self.interval_sec * 3 * 1000)
+        if await redis.set(self.LEADER_KEY, self._token, nx=True, px=lease_ms):
+            return True
+        return bool(await redis.eval(_RENEW_LEASE, 1, self.LEADER_KEY, self._token, lease_ms))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "ticks": self._stats["ticks"],
+            "leader": int(self._leader),
+            "refreshed": self._stats["refreshed"],
+            "failed": self._stats["failed"],
+            "over_budget": self._stats["over_budget"],
+            "errors": self._stats["errors"],
+        }
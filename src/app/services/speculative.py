@@ -0,0 +1,118 @@
+import asyncio
+import math
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+K = TypeVar("K")
+R = TypeVar("R")
+
+_EXHAUSTED = object()
+
+
+@dataclass
+class SpeculationStats:
+    launched: int = 0
+    consumed: int = 0
+    cancelled: int = 0
+    max_window: int = 0
+
+    @property
+    def wasted(self) -> int:
+        # Launched lookups whose result never decided the outcome.
+        return max(0, self.launched - self.consumed)
+
+
+class PassRateTracker:
+    """EWMA of how often resolved candidates pass a filter, per bucket."""
+
+    def __init__(self, *, alpha: float = 0.2, prior: float = 0.5) -> None:
+        self._lock = Lock()
+        self._alpha = min(1.0, max(0.01, alpha))
+        self._prior = min(1.0, max(0.01, prior))
+        self._rates: dict[str, float] = {}
+
+    def rate(self, bucket: str) -> float:
+        with self._lock:
+            return self._rates.get(bucket, self._prior)
+
+    def observe(self, bucket: str, passed: bool) -> None:
+        with self._lock:
+            current = self._rates.get(bucket, self._prior)
+            sample = 1.0 if passed else 0.0
+            self._rates[bucket] = current + self._alpha * (sample - current)
+
+
+class SpeculativeResolver(Generic[K, R]):
+    """Resolves ordered candidates concurrently and returns the first match.
+
+    The winner is always the earliest candidate (in the given order) whose
+    result is accepted, so speculation never changes which movie is picked;
+    it only overlaps the lookups that would otherwise run one after another.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_window: int,
+        tracker: PassRateTracker,
+        confidence: float = 0.9,
+    ) -> None:
+        self.max_window = max(1, max_window)
+        self.tracker = tracker
+        self.confidence = min(0.99, max(0.5, confidence))
+
+    def window_for(self, bucket: str) -> int:
+        rate = self.tracker.rate(bucket)
+        if rate >= 0.99:
+            return 1
+        # Smallest window that contains a passing candidate with the target
+        # probability, assuming independent candidates.
+        needed = math.log(1.0 - self.confidence) / math.log(1.0 - max(0.01, rate))
+        return max(1, min(self.max_window, math.ceil(needed)))
+
+    async def first_match(
+        self,
+        candidates: list[K],
+        *,
+        resolve: Callable[[K], Awaitable[R]],
+        accept: Callable[[K, R], bool],
+        bucket: str,
+    ) -> tuple[Optional[K], Optional[R], SpeculationStats]:
+        stats = SpeculationStats()
+        pending: deque[tuple[K, asyncio.Task[R]]] = deque()
+        remaining = iter(candidates)
+        exhausted = False
+
+        def refill() -> None:
+            nonlocal exhausted
+            window = self.window_for(bucket)
+            stats.max_window = max(stats.max_window, window)
+            while not exhausted and len(pending) < window:
+                candidate = next(remaining, _EXHAUSTED)
+                if candidate is _EXHAUSTED:
+                    exhausted = True
+                    break
+                pending.append((candidate, asyncio.create_task(resolve(candidate))))
+                stats.launched += 1
+
+        try:
+            refill()
+            while pending:
+                candidate, task = pending.popleft()
+                result = await task
+                stats.consumed += 1
+                passed = accept(candidate, result)
+                self.tracker.observe(bucket, passed)
+                if passed:
+                    return candidate, result, stats
+                refill()
+            return None, None, stats
+        finally:
+            for _, task in pending:
+                if not task.done():
+                    task.cancel()
+                    stats.cancelled += 1
+            if pending:
+                await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
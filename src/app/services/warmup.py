@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from redis.asyncio import Redis
+
+from ..clients import TmdbClient
+from ..repositories import FilterStatsRepository, MappingRepository
+from .genres_service import GenresService
+from .movie_service import MovieResolverService
+from .random_service import RandomService
+from .refresh import HotCardTracker, RefreshScheduler
+
+logger = logging.getLogger("uvicorn.error")
+
+GENRE_LANGS = ("en-US", "ru-RU")
+DEFAULT_REGION = {"en": "US", "ru": "RU"}
+
+
+@dataclass
+class WarmupReport:
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    by_stage: dict[str, int] = field(default_factory=dict)
+
+
+class _Pacer:
+    """Spaces job starts so the runner starts at most ``rate`` jobs per second."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if self.interval <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class WarmupRunner:
+    """Refills an empty cache from recorded traffic and TMDb popularity.
+
+    Jobs run in stages: genre lists, previews for the most spun filter
+    combinations (discover pages, candidate index, preview estimates) and
+    then movie cards for hot and popular ids (raw details, mappings, cards).
+    RU cards spend KP quota, so only ids whose KP details are not cached yet
+    are warmed, up to ``ru_cards`` per run.
+    """
+
+    def __init__(
+        self,
+        *,
+        redis: Redis,
+        genres: GenresService,
+        random_service: RandomService,
+        movie_resolver: MovieResolverService,
+        tmdb: TmdbClient,
+        mappings: MappingRepository,
+        filter_stats: FilterStatsRepository | None,
+        concurrency: int,
+        rate: float,
+        ru_enabled: bool = True,
+        progress: Callable[[WarmupReport], None] | None = None,
+    ) -> None:
+        self.redis = redis
+        self.genres = genres
+        self.random_service = random_service
+        self.movie_resolver = movie_resolver
+        self.tmdb = tmdb
+        self.mappings = mappings
+        self.filter_stats = filter_stats
+        self.concurrency = max(1, concurrency)
+        self.pacer = _Pacer(rate)
+        self.ru_enabled = ru_enabled
+        self.progress = progress
+
+    async def run(
+        self, *, top_filters: int, hot_cards: int, popular_pages: int, ru_cards: int
+    ) -> WarmupReport:
+        report = WarmupReport()
+        started = time.perf_counter()
+        await self._run_stage(report, "genres", self._genre_jobs())
+        await self._run_stage(report, "filters", await self._filter_jobs(top_filters))
+        await self._run_stage(
+            report, "cards", await self._card_jobs(hot_cards, popular_pages, ru_cards)
+        )
+        report.seconds = round(time.perf_counter() - started, 3)
+        logger.info(
+            "[FilmSpin] warm-up finished: done=%s failed=%s seconds=%s stages=%s",
+            report.done,
+            report.failed,
+            report.seconds,
+            report.by_stage,
+        )
+        return report
+
+    def _genre_jobs(self) -> list[Callable[[], Awaitable[Any]]]:
+        jobs: list[Callable[[], Awaitable[Any]]] = [
+            lambda lang=lang: self.genres.get_genres(lang) for lang in GENRE_LANGS
+        ]
+        if self.ru_enabled:
+            jobs.append(self.genres.get_genres_ru)
+        return jobs
+
+    async def _filter_jobs(self, limit: int) -> list[Callable[[], Awaitable[Any]]]:
+        if self.filter_stats is None:
+            return []
+        jobs: list[Callable[[], Awaitable[Any]]] = []
+        for combo in await self.filter_stats.top("en", limit):
+            jobs.append(lambda combo=combo: self._preview("en", combo))
+        if self.ru_enabled:
+            for combo in await self.filter_stats.top("ru", limit):
+                jobs.append(lambda combo=combo: self._preview("ru", combo))
+        return jobs
+
+    async def _preview(self, kind: str, combo: dict[str, Any]) -> None:
+        filters = {
+            "year_from": combo.get("year_from"),
+            "year_to": combo.get("year_to"),
+            "runtime_min": combo.get("runtime_min"),
+            "runtime_max": combo.get("runtime_max"),
+            "genres": combo.get("genres"),
+            "vote_avg_min": float(combo.get("vote_avg_min") or 0.0),
+            "country": combo.get("country"),
+            "exclude_tmdb": None,
+            "exclude_kp": None,
+        }
+        if kind == "ru":
+            await self.random_service.preview_ru(**filters)
+        else:
+            await self.random_service.preview_en(
+                **filters, lang=str(combo.get("lang") or "en-US")
+            )
+
+    async def _card_jobs(
+        self, hot_limit: int, popular_pages: int, ru_limit: int
+    ) -> list[Callable[[], Awaitable[Any]]]:
+        cards: dict[tuple[int, str, str], None] = {}
+        if hot_limit > 0:
+            for member in await self.redis.zrevrange(
+                RefreshScheduler.HOT_KEY, 0, hot_limit - 1
+            ):
+                parsed = HotCardTracker.parse(str(member))
+                if parsed is not None:
+                    cards[parsed] = None
+        for tmdb_id in await self._popular_ids(popular_pages):
+            cards.setdefault((tmdb_id, "en-US", DEFAULT_REGION["en"]), None)
+            if self.ru_enabled:
+                cards.setdefault((tmdb_id, "ru-RU", DEFAULT_REGION["ru"]), None)
+        ru = [card for card in cards if card[1].startswith("ru")]
+        keep_ru = await self._ru_cards_to_warm(ru, ru_limit) if self.ru_enabled else set()
+        cards = {
+            card: None for card in cards if not card[1].startswith("ru") or card in keep_ru
+        }
+        return [
+            lambda card=card: self.movie_resolver.resolve(
+                lang=card[1], tmdb_id=card[0], watch_region=card[2]
+            )
+            for card in cards
+        ]
+
+    async def _ru_cards_to_warm(
+        self, cards: list[tuple[int, str, str]], limit: int
+    ) -> set[tuple[int, str, str]]:
+        """The first ``limit`` RU cards whose KP details are not cached yet."""
+        if limit <= 0 or not cards:
+            return set()
+        mapped = await asyncio.gather(
+            *(self.mappings.get_by_tmdb(tmdb_id) for tmdb_id, _, _ in cards)
+        )
+        kp_ids = [mapping.get("kp_id") for mapping in mapped]
+        pipe = self.redis.pipeline()
+        for kp_id in kp_ids:
+            if kp_id:
+                pipe.exists(MovieResolverService._kp_details_key(kp_id))
+        found = iter(await pipe.execute() if pipe.command_stack else [])
+        # Without a KP mapping the resolve has to ask KP, so the card still counts.
+        missing = [card for card, kp_id in zip(cards, kp_ids) if not kp_id or not next(found)]
+        return set(missing[:limit])
+
+    async def _popular_ids(self, pages: int) -> list[int]:
+        ids: list[int] = []
+        for page in range(1, pages + 1):
+            await self.pacer.wait()
+            try:
+                payload = await self.tmdb.get("/movie/popular", {"page": page})
+            except Exception as exc:
+                logger.info(
+                    "[FilmSpin] warm-up popular page failed: page=%s error=%s",
+                    page,
+                    exc.__class__.__name__,
+                )
+                break
+            for item in payload.get("results") or []:
+                tmdb_id = self._safe_int(item.get("id")) if isinstance(item, dict) else None
+                if tmdb_id is not None:
+                    ids.append(tmdb_id)
+        return ids
+
+    async def _run_stage(
+        self,
+        report: WarmupReport,
+        stage: str,
+        jobs: list[Callable[[], Awaitable[Any]]],
+    ) -> None:
+        report.total += len(jobs)
+        logger.info("[FilmSpin] warm-up stage: stage=%s jobs=%s", stage, len(jobs))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(job: Callable[[], Awaitable[Any]]) -> None:
+            async with semaphore:
+                await self.pacer.wait()
+                try:
+                    await job()
+                except Exception as exc:
+                    report.failed += 1
+                    logger.info(
+                        "[FilmSpin] warm-up job failed: stage=%s error=%s",
+                        stage,
+                        exc.__class__.__name__,
+                    )
+                else:
+                    report.done += 1
+                    report.by_stage[stage] = report.by_stage.get(stage, 0) + 1
+                if self.progress is not None:
+                    self.progress(report)
+
+        await asyncio.gather(*(run(job) for job in jobs))
+
+    @staticmethod
+    def _safe_int(value: Any) -> Optional[int]:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
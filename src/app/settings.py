@@ -17,6 +17,7 @@ class Settings(BaseSettings):
     omdb_api_key_2: str = ""
     omdb_api_key_backup: str = ""
     omdb_mock_enabled: bool = False
+    omdb_daily_limit: int = 1000
     kinopoisk_api_key: str | None = None
 
     tmdb_base: str = "https://api.themoviedb.org/3"
@@ -38,12 +39,71 @@ class Settings(BaseSettings):
     http_enable_http2: bool = False
     http_trust_env: bool = True
     ru_enabled: bool = True
+    discover_page_concurrency: int = 6
+    speculative_window_max: int = 6
+    candidate_index_enabled: bool = True
+    candidate_index_stale_sec: int = 60 * 60 * 6
+    candidate_index_pool_factor: float = 3.0
+    rating_index_enabled: bool = True
+    rating_index_max_age_sec: int = 60 * 60 * 24 * 7
+    rating_index_snapshot_path: str = ""
+    kp_pool_page_size: int = 250
+    preview_estimator_enabled: bool = True
+    preview_estimator_min_samples: int = 40
+    preview_estimator_max_half_width: float = 0.08
+    preview_estimator_batch: int = 16
+    preview_estimator_ttl: int = 60 * 60 * 24 * 7
+    refresh_enabled: bool = True
+    refresh_interval_sec: int = 60
+    refresh_top_n: int = 200
+    refresh_lead_sec: int = 60 * 30
+    refresh_budget: int = 20
+    filter_stats_enabled: bool = True
+    filter_stats_ttl: int = 60 * 60 * 24 * 30
+    warmup_on_start: bool = False
+    warmup_top_filters: int = 30
+    warmup_hot_cards: int = 300
+    warmup_popular_pages: int = 5
+    # RU cards cost KP quota; only ids without cached KP details count.
+    warmup_ru_cards: int = 50
+    warmup_concurrency: int = 4
+    warmup_rate: float = 5.0
+    upstream_governor_enabled: bool = True
+    upstream_limits: str = "tmdb=40:16,kp=10:8,omdb=10:8"
+    upstream_breaker_failures: int = 5
+    upstream_breaker_reset_sec: float = 30.0
+    upstream_hedge_enabled: bool = True
+    # A hedge is a second request: only hosts without a request quota get one.
+    # KP counts every call against its daily plan, so it is left out by default.
+    upstream_hedge_hosts: str = "tmdb"
+    upstream_hedge_ratio: float = 0.05
+    metrics_publish_interval_sec: int = 15
 
     ttl_genres: int = 60 * 60 * 24 * 30
     ttl_movie_detail: int = 60 * 60 * 24
     ttl_omdb_negative: int = 60 * 10
     ttl_recent: int = 60 * 60 * 12
+    ttl_kp_pool: int = 60 * 60 * 6
     recent_limit: int = 100
+    seen_filter_enabled: bool = True
+    seen_filter_bits: int = 1 << 16
+    seen_filter_hashes: int = 6
+    seen_filter_ttl: int = 60 * 60 * 24 * 14
+    # Titles per bitmap generation before it rotates; keeps false positives low.
+    seen_filter_capacity: int = 5000
+
+    cache_lock_lease_ms: int = 15_000
+    cache_lock_wait_ms: int = 5_000
+    cache_lock_poll_ms: int = 50
+    cache_xfetch_beta: float = 1.0
+    cache_codec: str = "json"
+    cache_compression: str = "auto"
+    cache_compress_min_bytes: int = 1024
+    cache_stale_ttl: int = 60 * 60 * 24
+    cache_l1_enabled: bool = True
+    cache_l1_rules: str = "genres:=3600,norm:movie:=120"
+    cache_l1_max_entries: int = 2_000
+    cache_l1_max_bytes: int = 16 * 1024 * 1024
 
     @field_validator("cors_allow_origins", mode="before")
     @classmethod
@@ -59,6 +119,43 @@ class Settings(BaseSettings):
             return ["*"]
         return [x.strip() for x in raw.split(",") if x.strip()]
 
+    @property
+    def cache_l1_rules_map(self) -> dict[str, float]:
+        # "prefix=max_seconds" pairs; a bare prefix uses a 60 second cap.
+        rules: dict[str, float] = {}
+        for chunk in (self.cache_l1_rules or "").split(","):
+            prefix, _, max_ttl = chunk.strip().partition("=")
+            if not prefix:
+                continue
+            try:
+                rules[prefix] = float(max_ttl) if max_ttl else 60.0
+            except ValueError:
+                continue
+        return rules
+
+    @property
+    def upstream_limits_map(self) -> dict[str, tuple[float, int]]:
+        # "host=requests_per_second:max_concurrency"; missing hosts use 10:8.
+        limits: dict[str, tuple[float, int]] = {
+            "tmdb": (40.0, 16),
+            "kp": (10.0, 8),
+            "omdb": (10.0, 8),
+        }
+        for chunk in (self.upstream_limits or "").split(","):
+            host, _, spec = chunk.strip().partition("=")
+            rate, _, concurrency = spec.partition(":")
+            if not host or not rate:
+                continue
+            try:
+                limits[host] = (float(rate), int(concurrency) if concurrency else 8)
+            except ValueError:
+                continue
+        return limits
+
+    @property
+    def upstream_hedge_hosts_list(self) -> list[str]:
+        return [h.strip() for h in (self.upstream_hedge_hosts or "").split(",") if h.strip()]
+
     @property
     def omdb_api_keys_list(self) -> list[str]:
         keys = [self.omdb_api_key, self.omdb_api_key_2, self.omdb_api_key_backup]
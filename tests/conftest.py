@@ -1,7 +1,563 @@
+import asyncio
+import fnmatch
+import pickle
 import sys
+import time
 from pathlib import Path
 
+import httpx
+import pytest
+from redis.exceptions import ResponseError
+
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+from src.app.repositories import CacheRepository  # noqa: E402
+from src.app.schemas import MovieCard  # noqa: E402
+from src.app.services.movie_service import MovieResolverService  # noqa: E402
+from src.app.services.random_service import RandomService  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    # The app runs on uvicorn's asyncio loop and schedules asyncio tasks.
+    return "asyncio"
+
+
+class FakeRedis:
+    """Small in-memory stand-in for the redis.asyncio commands the repos use."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, object] = {}
+        self.expires: dict[str, float] = {}
+        self.commands: list[str] = []
+
+    def _alive(self, key: str) -> bool:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _expire_in(self, key: str, seconds: float | None) -> None:
+        if seconds is None:
+            self.expires.pop(key, None)
+        else:
+            self.expires[key] = time.monotonic() + seconds
+
+    async def get(self, key):
+        self.commands.append("get")
+        return self.data.get(key) if self._alive(key) else None
+
+    async def mget(self, keys):
+        self.commands.append("mget")
+        return [self.data.get(key) if self._alive(key) else None for key in keys]
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        self.commands.append("set")
+        if nx and self._alive(key):
+            return None
+        self.data[key] = value
+        self._expire_in(key, ex if ex is not None else (px / 1000 if px else None))
+        return True
+
+    async def delete(self, *keys):
+        self.commands.append("delete")
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    async def incr(self, key, amount=1):
+        self.commands.append("incr")
+        self._alive(key)
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+    async def exists(self, key):
+        self.commands.append("exists")
+        return int(self._alive(key))
+
+    async def pttl(self, key):
+        self.commands.append("pttl")
+        if not self._alive(key):
+            return -2
+        deadline = self.expires.get(key)
+        if deadline is None:
+            return -1
+        return max(0, int((deadline - time.monotonic()) * 1000))
+
+    async def expire(self, key, seconds):
+        self.commands.append("expire")
+        if not self._alive(key):
+            return False
+        self._expire_in(key, seconds)
+        return True
+
+    async def eval(self, script, numkeys, *args):
+        self.commands.append("eval")
+        keys, argv = args[:numkeys], args[numkeys:]
+        if "pexpire" in script:
+            if self._alive(keys[0]) and self.data[keys[0]] == argv[0]:
+                self._expire_in(keys[0], int(argv[1]) / 1000)
+                return 1
+            return 0
+        if "setbit" in script:
+            current, previous, count = keys
+            rotated = await self.incr(count) > int(argv[1])
+            if rotated:
+                await self.delete(previous)
+                if self._alive(current):
+                    self.data[previous] = self.data.pop(current)
+                self.data[count] = 1
+            self.data.setdefault(current, set()).update(int(bit) for bit in argv[2:])
+            for key in keys:
+                await self.expire(key, int(argv[0]))
+            return int(rotated)
+        if "getbit" in script:
+            generations = [
+                (self.data.get(key) or set()) if self._alive(key) else set() for key in keys
+            ]
+            k = int(argv[0])
+            offsets = [int(bit) for bit in argv[1:]]
+            return [
+                int(any(all(bit in bits for bit in offsets[i : i + k]) for bits in generations))
+                for i in range(0, len(offsets), k)
+            ]
+        if "zremrangebyrank" in script:
+            await self.zadd(keys[0], {argv[1]: float(argv[0])})
+            await self.zremrangebyrank(keys[0], 0, -int(argv[2]) - 1)
+            await self.expire(keys[0], int(argv[3]))
+            return 1
+        if "zrangebyscore" in script:
+            await self.hset(keys[0], argv[0], argv[1])
+            await self.zadd(keys[1], {argv[0]: float(argv[2])})
+            written = (self.data.get(keys[1]) or {}) if self._alive(keys[1]) else {}
+            old = sorted(
+                (m for m, score in written.items() if score <= float(argv[3])),
+                key=lambda m: written[m],
+            )[: int(argv[4])]
+            if old:
+                await self.hdel(keys[0], *old)
+                await self.zrem(keys[1], *old)
+            return len(old)
+        if 'redis.call("get", KEYS[1]) == ARGV[1]' in script:
+            if self._alive(keys[0]) and self.data[keys[0]] == argv[0]:
+                return await self.delete(keys[0])
+            return 0
+        raise NotImplementedError(script)
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        self.commands.append("hset")
+        self._alive(key)
+        bucket = self.data.setdefault(key, {})
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        added = 0
+        for name, item in items.items():
+            added += name not in bucket
+            bucket[name] = item
+        return added
+
+    async def hgetall(self, key):
+        self.commands.append("hgetall")
+        return dict(self.data.get(key) or {}) if self._alive(key) else {}
+
+    async def hincrby(self, key, field, amount=1):
+        self.commands.append("hincrby")
+        self._alive(key)
+        bucket = self.data.setdefault(key, {})
+        bucket[field] = int(bucket.get(field, 0)) + amount
+        return bucket[field]
+
+    async def hincrbyfloat(self, key, field, amount):
+        self.commands.append("hincrbyfloat")
+        self._alive(key)
+        bucket = self.data.setdefault(key, {})
+        bucket[field] = str(float(bucket.get(field, 0)) + float(amount))
+        return float(bucket[field])
+
+    async def hmget(self, key, fields):
+        self.commands.append("hmget")
+        bucket = (self.data.get(key) or {}) if self._alive(key) else {}
+        return [bucket.get(name) for name in fields]
+
+    async def hdel(self, key, *fields):
+        self.commands.append("hdel")
+        bucket = (self.data.get(key) or {}) if self._alive(key) else {}
+        return sum(bucket.pop(name, None) is not None for name in fields)
+
+    async def hscan_iter(self, key, match=None, count=None):
+        bucket = (self.data.get(key) or {}) if self._alive(key) else {}
+        for name, value in list(bucket.items()):
+            if match is None or fnmatch.fnmatchcase(name, match):
+                yield name, value
+
+    async def sadd(self, key, *members):
+        self.commands.append("sadd")
+        self._alive(key)
+        bucket = self.data.setdefault(key, set())
+        before = len(bucket)
+        bucket.update(members)
+        return len(bucket) - before
+
+    async def smembers(self, key):
+        self.commands.append("smembers")
+        return set(self.data.get(key) or ()) if self._alive(key) else set()
+
+    async def zadd(self, key, mapping):
+        self.commands.append("zadd")
+        self._alive(key)
+        bucket = self.data.setdefault(key, {})
+        added = sum(member not in bucket for member in mapping)
+        bucket.update({member: float(score) for member, score in mapping.items()})
+        return added
+
+    async def zrem(self, key, *members):
+        self.commands.append("zrem")
+        bucket = (self.data.get(key) or {}) if self._alive(key) else {}
+        return sum(bucket.pop(member, None) is not None for member in members)
+
+    async def zmscore(self, key, members):
+        self.commands.append("zmscore")
+        bucket = (self.data.get(key) or {}) if self._alive(key) else {}
+        return [bucket.get(member) for member in members]
+
+    async def zincrby(self, key, amount, member):
+        self.commands.append("zincrby")
+        self._alive(key)
+        bucket = self.data.setdefault(key, {})
+        bucket[member] = float(bucket.get(member, 0)) + amount
+        return bucket[member]
+
+    async def zrevrange(self, key, start, end):
+        self.commands.append("zrevrange")
+        bucket = (self.data.get(key) or {}) if self._alive(key) else {}
+        ranked = sorted(bucket, key=lambda m: (bucket[m], m), reverse=True)
+        return ranked[start : None if end == -1 else end + 1]
+
+    async def zunionstore(self, dest, keys):
+        self.commands.append("zunionstore")
+        weights = keys if isinstance(keys, dict) else dict.fromkeys(keys, 1)
+        merged: dict[str, float] = {}
+        for key, weight in weights.items():
+            bucket = (self.data.get(key) or {}) if self._alive(key) else {}
+            for member, score in bucket.items():
+                merged[member] = merged.get(member, 0) + score * weight
+        self.data[dest] = merged
+        self.expires.pop(dest, None)
+        return len(merged)
+
+    async def zremrangebyrank(self, key, start, end):
+        self.commands.append("zremrangebyrank")
+        bucket = (self.data.get(key) or {}) if self._alive(key) else {}
+        ranked = sorted(bucket, key=lambda m: (bucket[m], m))
+        size = len(ranked)
+        start = start + size if start < 0 else start
+        end = end + size if end < 0 else end
+        doomed = ranked[max(0, start) : end + 1] if end >= 0 else []
+        for member in doomed:
+            bucket.pop(member, None)
+        return len(doomed)
+
+    async def dump(self, key):
+        self.commands.append("dump")
+        return pickle.dumps(self.data[key]) if self._alive(key) else None
+
+    async def restore(self, key, ttl, value, replace=False, absttl=False):
+        self.commands.append("restore")
+        key = key.decode() if isinstance(key, bytes) else key
+        if self._alive(key) and not replace:
+            raise ResponseError("BUSYKEY Target key name already exists.")
+        self.data[key] = pickle.loads(value)
+        if not ttl:
+            self._expire_in(key, None)
+        elif absttl:
+            self._expire_in(key, ttl / 1000 - time.time())
+        else:
+            self._expire_in(key, ttl / 1000)
+        return True
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.data):
+            if self._alive(key) and (match is None or fnmatch.fnmatchcase(key, match)):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.command_stack: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.command_stack.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self, raise_on_error=True):
+        self.redis.commands.append("pipeline")
+        results = []
+        for name, args, kwargs in self.command_stack:
+            try:
+                results.append(await getattr(self.redis, name)(*args, **kwargs))
+            except ResponseError as exc:
+                if raise_on_error:
+                    raise
+                results.append(exc)
+        self.command_stack = []
+        return results
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
+
+
+class ConcurrencyRecorder:
+    """Counts overlapping fake upstream calls that each take ``delay`` seconds."""
+
+    def __init__(self, delay: float = 0.02) -> None:
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def call(self, value):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return value
+        finally:
+            self.in_flight -= 1
+
+
+class FakeTmdb:
+    """TMDb with numbered discover pages, a popular list, details and watch providers.
+
+    Discover ids are ``page * 100 + i``; ``item`` adds fields to every result.
+    """
+
+    def __init__(
+        self,
+        *,
+        total_pages: int = 20,
+        per_page: int = 20,
+        item: dict | None = None,
+        failing_pages=(),
+        popular=(550, 13),
+        recorder: ConcurrencyRecorder | None = None,
+    ) -> None:
+        self.total_pages = total_pages
+        self.per_page = per_page
+        self.item = item or {}
+        self.failing_pages = set(failing_pages)
+        self.popular = list(popular)
+        self.recorder = recorder
+        self.calls: list[tuple[str, dict]] = []
+        self.requested: list[int] = []
+
+    async def get(self, path, params=None):
+        params = dict(params or {})
+        self.calls.append((path, params))
+        if path == "/discover/movie":
+            page = int(params["page"])
+            self.requested.append(page)
+            payload = await self._answer(
+                {
+                    "page": page,
+                    "total_pages": self.total_pages,
+                    "total_results": self.total_pages * self.per_page,
+                    "results": [
+                        {"id": page * 100 + i, **self.item} for i in range(self.per_page)
+                    ],
+                }
+            )
+            if page in self.failing_pages:
+                raise RuntimeError("upstream failed")
+            return payload
+        if path == "/movie/popular":
+            return await self._answer({"results": [{"id": x} for x in self.popular]})
+        if path.endswith("/watch/providers"):
+            return await self._answer({"results": {}})
+        return await self._answer(
+            {
+                "id": int(path.split("/")[2]),
+                "title": "Fight Club",
+                "external_ids": {"imdb_id": "tt0137523"},
+            }
+        )
+
+    async def _answer(self, payload):
+        return await self.recorder.call(payload) if self.recorder is not None else payload
+
+
+class FakeKp:
+    """poiskkino.dev over a fixed list of documents."""
+
+    def __init__(
+        self, docs=(), *, pages: int = 1, list_fails: bool = False, random_doc=None
+    ) -> None:
+        self.docs = list(docs)
+        self.pages = pages
+        self.list_fails = list_fails
+        self.random_doc = random_doc
+        self.calls: list[tuple[str, dict]] = []
+
+    async def get(self, path, params=None):
+        params = dict(params or {})
+        self.calls.append((path, params))
+        if path == "/v1.4/movie/random":
+            return self.random_doc or self.docs[0]
+        if path == "/v1.4/movie":
+            if self.list_fails:
+                request = httpx.Request("GET", "https://kp.test/v1.4/movie")
+                raise httpx.HTTPStatusError(
+                    "forbidden", request=request, response=httpx.Response(403, request=request)
+                )
+            docs = [
+                doc for doc in self.docs if "id" not in params or doc["id"] == int(params["id"])
+            ]
+            return {
+                "docs": docs,
+                "total": len(docs) * self.pages,
+                "pages": self.pages,
+                "page": int(params.get("page", 1)),
+            }
+        kp_id = int(path.rsplit("/", 1)[1])
+        for doc in [*self.docs, self.random_doc]:
+            if doc and doc["id"] == kp_id:
+                return doc
+        raise AssertionError(f"unexpected KP call {path}")
+
+
+class FakeOmdb:
+    def __init__(
+        self, rating: float = 8.8, votes: int = 10, recorder: ConcurrencyRecorder | None = None
+    ) -> None:
+        self.payload = {"imdb_rating": rating, "imdb_votes": votes}
+        self.recorder = recorder
+        self.seen: list[str] = []
+
+    async def rating(self, imdb_id):
+        self.seen.append(imdb_id)
+        if self.recorder is not None:
+            return await self.recorder.call(dict(self.payload))
+        return dict(self.payload)
+
+
+class FakeMappings:
+    def __init__(self, by_tmdb: dict | None = None, by_kp: dict | None = None) -> None:
+        self.by_tmdb = by_tmdb or {}
+        self.by_kp = by_kp or {}
+
+    async def get_by_tmdb(self, tmdb_id):
+        return dict(self.by_tmdb)
+
+    async def get_by_kp(self, kp_id):
+        return dict(self.by_kp)
+
+    async def set_map(self, tmdb_id, kp_id, imdb_id):
+        return None
+
+
+class FakeResolver:
+    """Movie resolver whose cards carry ``ratings[id]`` (a dict or a function)."""
+
+    def __init__(self, ratings=None, *, failing=()) -> None:
+        self.rating_for = ratings if callable(ratings) else dict(ratings or {}).get
+        self.failing = set(failing)
+        self.resolved: list[int] = []
+        self.cards: list[tuple[int, str, str | None]] = []
+        self.seeded: list[int] = []
+
+    async def prefetch(self, *, lang, tmdb_ids, watch_region=None):
+        return {}
+
+    async def seed_kp_documents(self, docs):
+        self.seeded.extend(doc["id"] for doc in docs)
+        return len(docs)
+
+    async def resolve(self, *, lang, tmdb_id=None, kp_id=None, prefetched=None, watch_region=None):
+        movie_id = tmdb_id if tmdb_id is not None else kp_id
+        self.resolved.append(movie_id)
+        if movie_id in self.failing:
+            raise RuntimeError("upstream down")
+        self.cards.append((movie_id, lang, watch_region))
+        return MovieCard(
+            title="x", tmdb_id=tmdb_id, kp_id=kp_id, imdb_rating=self.rating_for(movie_id)
+        )
+
+
+class KeyOnlyCache:
+    """Just the cache's key helper, for services whose tests never touch Redis."""
+
+    filters_key = staticmethod(CacheRepository.filters_key)
+
+
+@pytest.fixture
+def make_tmdb():
+    return FakeTmdb
+
+
+@pytest.fixture
+def make_kp():
+    return FakeKp
+
+
+@pytest.fixture
+def make_omdb():
+    return FakeOmdb
+
+
+@pytest.fixture
+def make_mappings():
+    return FakeMappings
+
+
+@pytest.fixture
+def make_resolver():
+    return FakeResolver
+
+
+@pytest.fixture
+def make_recorder():
+    return ConcurrencyRecorder
+
+
+@pytest.fixture
+def make_random_service():
+    def build(**parts) -> RandomService:
+        options = dict(
+            cache=KeyOnlyCache(), recent=None, tmdb=None, poiskkino=None, movie_resolver=None
+        )
+        options.update(parts)
+        return RandomService(**options)
+
+    return build
+
+
+@pytest.fixture
+def make_movie_service(fake_redis):
+    def build(**parts) -> MovieResolverService:
+        options = dict(
+            cache=CacheRepository(fake_redis),
+            mappings=FakeMappings(),
+            tmdb=FakeTmdb(),
+            poiskkino=None,
+            omdb=None,
+        )
+        options.update(parts)
+        return MovieResolverService(**options)
+
+    return build
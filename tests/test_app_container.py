@@ -0,0 +1,81 @@
+import httpx
+import pytest
+
+from src.app import dependencies
+from src.app.clients import CircuitBreaker, SingleFlight
+from src.app.container import AppContainer
+from src.app.main import create_app
+
+
+@pytest.mark.anyio
+async def test_container_wires_one_shared_graph_with_overrides(fake_redis):
+    class _Tmdb:
+        pass
+
+    tmdb = _Tmdb()
+    async with httpx.AsyncClient() as http:
+        container = AppContainer.build(
+            redis=fake_redis, redis_bytes=fake_redis, http=http, tmdb=tmdb
+        )
+
+    assert container.random_service.movie_resolver is container.movie_service
+    assert container.random_service.cache is container.movie_service.cache
+    assert container.movie_service.tmdb is tmdb
+    assert container.genres_service.tmdb is tmdb
+    with pytest.raises(TypeError):
+        AppContainer.build(redis=fake_redis, redis_bytes=fake_redis, http=http, nope=1)
+
+
+@pytest.mark.anyio
+async def test_shared_state_overrides_reach_the_clients(fake_redis):
+    breakers = {name: CircuitBreaker(name) for name in ("tmdb", "kp", "omdb")}
+    flights = SingleFlight()
+    async with httpx.AsyncClient() as http:
+        container = AppContainer.build(
+            redis=fake_redis,
+            redis_bytes=fake_redis,
+            http=http,
+            upstream_breakers=breakers,
+            upstream_flights=flights,
+        )
+
+    assert container.tmdb._http.breaker is breakers["tmdb"]
+    assert container.poiskkino._http.breaker is breakers["kp"]
+    assert container.tmdb._flights is flights
+    assert container.omdb._keys is container.omdb_key_pool
+
+
+@pytest.mark.anyio
+async def test_two_containers_share_no_upstream_state(fake_redis):
+    async with httpx.AsyncClient() as http:
+        first = AppContainer.build(redis=fake_redis, redis_bytes=fake_redis, http=http)
+        second = AppContainer.build(redis=fake_redis, redis_bytes=fake_redis, http=http)
+
+    assert first.tmdb._http.breaker is first.upstream_breakers["tmdb"]
+    assert first.upstream_breakers["tmdb"] is not second.upstream_breakers["tmdb"]
+    assert first.upstream_governors["tmdb"] is not second.upstream_governors["tmdb"]
+    assert first.upstream_flights is not second.upstream_flights
+    assert first.omdb_key_pool is not second.omdb_key_pool
+    assert first.imdb_pass_rates is not second.imdb_pass_rates
+    assert first.random_service.speculation.tracker is first.imdb_pass_rates
+
+
+@pytest.mark.anyio
+async def test_dependencies_resolve_from_the_app_container(fake_redis):
+    async with httpx.AsyncClient() as http:
+        tripped = AppContainer.build(redis=fake_redis, redis_bytes=fake_redis, http=http)
+        healthy = AppContainer.build(redis=fake_redis, redis_bytes=fake_redis, http=http)
+    for _ in range(tripped.upstream_breakers["tmdb"].failure_threshold):
+        tripped.upstream_breakers["tmdb"].record_failure()
+
+    health = []
+    for container in (tripped, healthy):
+        app = create_app()
+        app.state.container = container
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/metrics")
+        health.append(response.json()["upstream_health"]["tmdb"]["open"])
+
+    assert health == [1, 0]
+    assert await dependencies.get_random_service(tripped) is tripped.random_service
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from src.app.repositories import CacheRepository
+from src.app.repositories.codecs import (
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    MAGIC,
+    CacheCodec,
+)
+
+
+def test_codec_round_trips_and_compresses_large_payloads():
+    codec = CacheCodec(codec="json", compression="zlib", compress_min_bytes=64)
+    small = {"id": 1}
+    large = {"cast": [{"name": f"Actor {i}", "character": "Extra"} for i in range(200)]}
+
+    small_raw = codec.encode(small)
+    large_raw = codec.encode(large)
+
+    assert small_raw.startswith(MAGIC) and small_raw[4] == COMPRESSION_NONE
+    assert large_raw[4] == COMPRESSION_ZLIB
+    assert len(large_raw) < len(json.dumps(large))
+    assert codec.decode(small_raw) == small
+    assert codec.decode(large_raw) == large
+
+
+def test_codec_reads_legacy_plain_json_entries():
+    codec = CacheCodec()
+    assert codec.decode('{"title": "Фильм"}') == {"title": "Фильм"}
+    assert codec.decode(json.dumps([1, 2]).encode("utf-8")) == [1, 2]
+
+
+def test_codec_rejects_unknown_format_version():
+    codec = CacheCodec()
+    with pytest.raises(ValueError):
+        codec.decode(MAGIC + bytes((99, 1, 0)) + b"{}")
+
+
+@pytest.mark.parametrize("name", ["json", "msgpack"])
+@pytest.mark.parametrize("compression", ["zstd", "lz4", "zlib", "auto"])
+def test_codec_round_trips_every_format(name, compression):
+    codec = CacheCodec(codec=name, compression=compression, compress_min_bytes=0)
+    value = {"title": "Фильм", "genres": [18, 80], "rating": 8.8, "poster": None}
+
+    raw = codec.encode(value)
+
+    assert raw[3] == codec.codec_id and raw[4] == codec.compression_id
+    assert codec.decode(raw) == value
+    # Entries written with one configuration stay readable after a switch.
+    assert CacheCodec().decode(raw) == value
+
+
+@pytest.mark.anyio
+async def test_cache_repository_treats_corrupt_entries_as_misses(fake_redis):
+    cache = CacheRepository(fake_redis)
+    await fake_redis.set("raw:kp:1", MAGIC + bytes((1, 1, 1)) + b"not-zlib")
+    assert await cache.get_json_hit("raw:kp:1") == (False, None)
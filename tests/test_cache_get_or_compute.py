@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import src.app.repositories.cache_repo as cache_module
+from src.app.observability import metrics
+from src.app.repositories import CacheRepository
+
+
+@pytest.mark.anyio
+async def test_get_or_compute_runs_producer_once_for_concurrent_misses(fake_redis, monkeypatch):
+    monkeypatch.setattr(cache_module, "CACHE_LOCK_POLL_MS", 5)
+    calls = 0
+
+    async def producer():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.03)
+        return {"id": 550}
+
+    caches = [CacheRepository(fake_redis) for _ in range(4)]
+    results = await asyncio.gather(
+        *(cache.get_or_compute("raw:tmdb:550", 60, producer) for cache in caches)
+    )
+
+    assert calls == 1
+    assert results == [{"id": 550}] * 4
+    assert await caches[0].get_json("raw:tmdb:550") == {"id": 550}
+    assert await fake_redis.get("lock:raw:tmdb:550") is None
+
+
+@pytest.mark.anyio
+async def test_get_or_compute_reads_legacy_plain_json(fake_redis):
+    await fake_redis.set("genres:en-US", json.dumps([{"id": 1, "name": "Drama"}]))
+
+    async def producer():
+        raise AssertionError("cached value should be used")
+
+    cache = CacheRepository(fake_redis)
+    assert await cache.get_or_compute("genres:en-US", 60, producer) == [
+        {"id": 1, "name": "Drama"}
+    ]
+
+
+@pytest.mark.anyio
+async def test_get_or_compute_refreshes_early_near_expiry(fake_redis, monkeypatch):
+    monkeypatch.setattr(cache_module, "CACHE_XFETCH_BETA", 1.0)
+    monkeypatch.setattr(cache_module.random, "random", lambda: 0.5)
+    cache = CacheRepository(fake_redis)
+    # Still fresh for a second, but a 5s recompute makes XFetch refresh now.
+    envelope = {"__fs": 1, "v": "old", "d": 5.0, "x": time.time() + 1}
+    await fake_redis.set("omdb:tt1", json.dumps(envelope), ex=60)
+
+    async def producer():
+        return "new"
+
+    assert await cache.get_or_compute("omdb:tt1", 60, producer) == "new"
+    assert await cache.get_json("omdb:tt1") == "new"
+
+
+@pytest.mark.anyio
+async def test_get_or_compute_uses_callable_ttl(fake_redis, monkeypatch):
+    monkeypatch.setattr(cache_module, "CACHE_STALE_TTL", 0)
+    cache = CacheRepository(fake_redis)
+
+    async def producer():
+        return {"_missing": True}
+
+    await cache.get_or_compute(
+        "omdb:tt2", lambda value: 5 if value.get("_missing") else 500, producer
+    )
+    assert 0 < fake_redis.expires["omdb:tt2"] - asyncio.get_running_loop().time() <= 6
+
+
+@pytest.mark.anyio
+async def test_get_or_compute_serves_stale_and_revalidates_in_background(fake_redis):
+    cache = CacheRepository(fake_redis)
+    envelope = {"__fs": 1, "v": "old", "d": 0.1, "x": time.time() - 5}
+    await fake_redis.set("omdb:tt3", json.dumps(envelope), ex=600)
+    served_before = metrics.snapshot().stale_served.get("omdb", 0)
+
+    async def producer():
+        await asyncio.sleep(0.01)
+        return "new"
+
+    assert await cache.get_or_compute("omdb:tt3", 60, producer) == "old"
+    assert metrics.snapshot().stale_served["omdb"] == served_before + 1
+    await asyncio.sleep(0.05)
+    assert await cache.get_json("omdb:tt3") == "new"
+
+
+@pytest.mark.anyio
+async def test_failed_revalidation_keeps_the_stale_value(fake_redis):
+    cache = CacheRepository(fake_redis)
+    envelope = {"__fs": 1, "v": "old", "d": 0.1, "x": time.time() - 5}
+    await fake_redis.set("omdb:tt4", json.dumps(envelope), ex=600)
+
+    async def producer():
+        raise RuntimeError("upstream down")
+
+    assert await cache.get_or_compute("omdb:tt4", 60, producer) == "old"
+    await asyncio.sleep(0.02)
+    # A soft-expired entry is a miss for plain reads, but still there for fallbacks.
+    assert await cache.get_json("omdb:tt4") is None
+    assert await cache.get_stale("omdb:tt4") == "old"
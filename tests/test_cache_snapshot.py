@@ -0,0 +1,48 @@
+import gzip
+
+import pytest
+
+from src.app.repositories import CacheSnapshotRepository
+
+
+@pytest.mark.anyio
+async def test_export_then_restore_keeps_values_and_ttls(fake_redis, tmp_path):
+    await fake_redis.hset("hmap:tmdb:550", mapping={"kp_id": "361", "imdb_id": "tt0137523"})
+    await fake_redis.set("norm:movie:v4:550:en-US:US", b"card", ex=3600)
+    await fake_redis.set("lock:norm:movie:v4:550:en-US:US", "token", px=5000)
+    await fake_redis.set("omdb:tt0137523", b"rating", px=500)
+    path = tmp_path / "cache.fscs.gz"
+
+    exported = await CacheSnapshotRepository(fake_redis, batch=1).export(
+        str(path), ("hmap:*", "norm:*", "omdb:*")
+    )
+
+    # Locks are not exported and keys about to expire are not worth keeping.
+    assert exported.keys == 2
+    assert exported.skipped == 1
+    assert gzip.open(path).read(4) == CacheSnapshotRepository.MAGIC
+
+    target = type(fake_redis)()
+    await target.set("norm:movie:v4:550:en-US:US", b"newer", ex=60)
+    restored = await CacheSnapshotRepository(target).restore(str(path))
+
+    assert restored.keys == 1
+    assert restored.skipped == 1
+    assert await target.hgetall("hmap:tmdb:550") == {"kp_id": "361", "imdb_id": "tt0137523"}
+    assert await target.pttl("hmap:tmdb:550") == -1
+    assert await target.get("norm:movie:v4:550:en-US:US") == b"newer"
+
+    replaced = await CacheSnapshotRepository(target).restore(str(path), replace=True)
+    assert replaced.keys == 2
+    assert await target.get("norm:movie:v4:550:en-US:US") == b"card"
+    assert 3_500_000 < await target.pttl("norm:movie:v4:550:en-US:US") <= 3_600_000
+
+
+@pytest.mark.anyio
+async def test_restore_rejects_foreign_files(fake_redis, tmp_path):
+    path = tmp_path / "other.gz"
+    with gzip.open(path, "wb") as fh:
+        fh.write(b"not a snapshot at all")
+
+    with pytest.raises(ValueError):
+        await CacheSnapshotRepository(fake_redis).restore(str(path))
@@ -0,0 +1,68 @@
+import pytest
+
+import src.app.services.random_service as random_module
+from src.app.repositories import CandidateIndexRepository
+from src.app.services.random_service import RandomService
+
+
+ITEM = {"vote_average": 7.1, "popularity": 12.5, "vote_count": 900, "release_date": "2004-05-01"}
+
+
+@pytest.mark.anyio
+async def test_candidate_index_round_trips_compact_tuples(fake_redis):
+    repo = CandidateIndexRepository(fake_redis, ttl=60)
+    await repo.record(
+        "k",
+        items=[{"id": 7, "vote_average": 8.2, "popularity": 3.5, "vote_count": 40, "release_date": "1999-10-15"}],
+        pages=[1, 2],
+        total_pages=9,
+        total_results=170,
+        reset=True,
+    )
+
+    pool = await repo.load("k")
+
+    assert pool.items == {
+        7: {"id": 7, "vote_average": 8.2, "popularity": 3.5, "vote_count": 40, "release_year": 1999}
+    }
+    assert pool.pages == {1, 2}
+    assert (pool.total_pages, pool.total_results) == (9, 170)
+
+
+@pytest.mark.anyio
+async def test_spins_grow_the_index_then_stop_fetching_pages(
+    fake_redis, make_tmdb, make_random_service
+):
+    tmdb = make_tmdb(total_pages=50, item=ITEM)
+    service = make_random_service(
+        tmdb=tmdb, candidates=CandidateIndexRepository(fake_redis, ttl=3600)
+    )
+    params = {"sort_by": "popularity.desc"}
+
+    first = await service._discover_candidate_pool(params=params, lang="en-US", probe_pages=2)
+    assert len(first) == 40
+
+    # Thin index: new spins fetch pages the index has not seen yet.
+    for _ in range(4):
+        await service._discover_candidate_pool(params=params, lang="en-US", probe_pages=2)
+    extra_pages = [p for p in tmdb.requested if p != 1]
+    assert len(extra_pages) == len(set(extra_pages))
+
+    requested = len(tmdb.requested)
+    items = await service._discover_candidate_pool(params=params, lang="en-US", probe_pages=2)
+    assert len(tmdb.requested) == requested
+    assert len(items) == 40
+    assert all(item["release_year"] == 2004 for item in items)
+
+
+def test_candidate_weight_accepts_indexed_release_year(monkeypatch):
+    monkeypatch.setattr(random_module.random, "uniform", lambda a, b: 1.0)
+    item = {"vote_average": 8.0, "popularity": 10.0, "vote_count": 500, "release_year": 2000}
+    far = dict(item, release_year=1950)
+    near_score = RandomService._candidate_weight(
+        item, min_rating=0, year_from=1995, year_to=2005, runtime_min=None, runtime_max=None
+    )
+    far_score = RandomService._candidate_weight(
+        far, min_rating=0, year_from=1995, year_to=2005, runtime_min=None, runtime_max=None
+    )
+    assert near_score > far_score
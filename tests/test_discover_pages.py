@@ -0,0 +1,55 @@
+import pytest
+
+import src.app.services.random_service as random_module
+
+
+@pytest.mark.anyio
+async def test_discover_pages_respect_concurrency_limit(
+    monkeypatch, make_tmdb, make_recorder, make_random_service
+):
+    monkeypatch.setattr(random_module, "DISCOVER_PAGE_CONCURRENCY", 3)
+    tmdb = make_tmdb(per_page=3, recorder=make_recorder(delay=0.01))
+    items = await make_random_service(tmdb=tmdb)._collect_discover_candidates(
+        params={},
+        lang="en-US",
+        first_page={"results": [{"id": 1}]},
+        pages=list(range(2, 12)),
+    )
+    assert tmdb.recorder.max_in_flight == 3
+    assert len(items) == 1 + 10 * 3
+
+
+@pytest.mark.anyio
+async def test_discover_pages_tolerate_partial_failures(
+    monkeypatch, make_tmdb, make_recorder, make_random_service
+):
+    monkeypatch.setattr(random_module, "DISCOVER_PAGE_CONCURRENCY", 4)
+    tmdb = make_tmdb(
+        per_page=3, failing_pages={3, 5}, recorder=make_recorder(delay=0.01)
+    )
+    items = await make_random_service(tmdb=tmdb)._collect_discover_candidates(
+        params={},
+        lang="en-US",
+        first_page={"results": []},
+        pages=[2, 3, 4, 5],
+        excluded_ids={201},
+    )
+    ids = {item["id"] for item in items}
+    assert ids == {200, 202, 400, 401, 402}
+
+
+@pytest.mark.anyio
+async def test_discover_pages_stop_once_limit_reached(
+    monkeypatch, make_tmdb, make_recorder, make_random_service
+):
+    monkeypatch.setattr(random_module, "DISCOVER_PAGE_CONCURRENCY", 1)
+    tmdb = make_tmdb(per_page=3, recorder=make_recorder(delay=0.01))
+    items = await make_random_service(tmdb=tmdb)._collect_discover_candidates(
+        params={},
+        lang="en-US",
+        first_page={"results": [{"id": 1}, {"id": 1}]},
+        pages=[2, 3, 4, 5, 6],
+        limit=4,
+    )
+    assert len(items) == 4
+    assert len(tmdb.requested) < 5
@@ -0,0 +1,68 @@
+import pytest
+
+from src.app.repositories import CacheRepository
+
+
+PERSONS_DOC = {
+    "id": 361,
+    "persons": [
+        {"name": "Дэвид Финчер", "enProfession": "director"},
+        {"name": "Брэд Питт", "enProfession": "actor"},
+    ],
+}
+
+
+def _list_doc():
+    return {
+        "id": 361,
+        "name": "Бойцовский клуб",
+        "year": 1999,
+        "genres": [{"name": "драма"}],
+        "countries": [{"name": "США"}],
+        "externalId": {"imdb": "tt0137523", "tmdb": 550},
+        "rating": {"kp": 8.7, "imdb": 8.8},
+        "votes": {"kp": 1000, "imdb": 2000},
+    }
+
+
+@pytest.mark.anyio
+async def test_seeded_list_document_only_needs_a_persons_fetch(make_kp, make_movie_service):
+    kp = make_kp([PERSONS_DOC])
+    service = make_movie_service(poiskkino=kp)
+
+    assert await service.seed_kp_documents([_list_doc(), {"id": 7, "name": "Partial"}]) == 1
+
+    card = await service.resolve(lang="ru-RU", kp_id=361)
+
+    assert card.title == "Бойцовский клуб"
+    assert card.imdb_rating == 8.8
+    assert card.directors == ["Дэвид Финчер"]
+    assert card.cast == ["Брэд Питт"]
+    assert [path for path, _ in kp.calls] == ["/v1.4/movie"]
+    assert kp.calls[0][1]["selectFields"] == ["id", "persons"]
+
+
+@pytest.mark.anyio
+async def test_seeding_keeps_existing_complete_entries(fake_redis, make_kp, make_movie_service):
+    cache = CacheRepository(fake_redis)
+    service = make_movie_service(cache=cache, poiskkino=make_kp([PERSONS_DOC]))
+    key = service._kp_details_key(361)
+    await cache.set_json(key, {**_list_doc(), "persons": []}, 60)
+
+    await service.seed_kp_documents([dict(_list_doc(), name="Другое")])
+
+    assert (await cache.get_json(key))["name"] == "Бойцовский клуб"
+
+
+@pytest.mark.anyio
+async def test_full_document_without_persons_is_fetched_once(make_kp, make_movie_service):
+    kp = make_kp([_list_doc()])
+    service = make_movie_service(poiskkino=kp)
+    await service.resolve(lang="ru-RU", kp_id=361)
+
+    # Another region misses the card cache and reads the cached KP details again.
+    card = await service.resolve(lang="ru-RU", kp_id=361, watch_region="KZ")
+
+    assert card.title == "Бойцовский клуб"
+    assert card.directors == []
+    assert [path for path, _ in kp.calls] == ["/v1.4/movie/361"]
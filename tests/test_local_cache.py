@@ -0,0 +1,64 @@
+import json
+import time
+
+import pytest
+
+from src.app.repositories import CacheRepository, LocalCache
+
+
+def test_local_cache_only_accepts_configured_prefixes():
+    cache = LocalCache(rules={"genres:": 60}, max_entries=10, max_bytes=1024)
+    cache.put("genres:en-US", "[]", 30)
+    cache.put("raw:tmdb:1", "{}", 30)
+
+    assert cache.get("genres:en-US") == (True, "[]")
+    assert cache.get("raw:tmdb:1") == (False, None)
+    assert not cache.enabled_for("raw:tmdb:1")
+
+
+def test_local_cache_evicts_least_recently_used_by_count_and_bytes():
+    cache = LocalCache(rules={"k:": 60}, max_entries=2, max_bytes=10)
+    cache.put("k:a", "aaa", 30)
+    cache.put("k:b", "bbb", 30)
+    cache.get("k:a")
+    cache.put("k:c", "ccc", 30)
+
+    assert cache.get("k:b") == (False, None)
+    assert cache.get("k:a")[0] and cache.get("k:c")[0]
+
+    cache.put("k:d", "dddddddd", 30)
+    assert cache.stats()["bytes"] <= 10
+    assert cache.stats()["evictions"] >= 2
+
+
+def test_local_cache_never_outlives_redis_ttl():
+    cache = LocalCache(rules={"k:": 60}, max_entries=5, max_bytes=100)
+    cache.put("k:gone", "x", 0.000001)
+    assert cache.get("k:gone") == (False, None)
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.anyio
+async def test_cache_repository_serves_repeat_reads_from_l1(fake_redis):
+    local = LocalCache(rules={"genres:": 60}, max_entries=10, max_bytes=4096)
+    cache = CacheRepository(fake_redis, local=local)
+    await fake_redis.set("genres:en-US", json.dumps([{"id": 1}]), ex=600)
+
+    assert await cache.get_json("genres:en-US") == [{"id": 1}]
+    redis_calls = len(fake_redis.commands)
+    assert await cache.get_json("genres:en-US") == [{"id": 1}]
+
+    assert len(fake_redis.commands) == redis_calls
+    assert local.stats()["hits"] == 1
+
+
+@pytest.mark.anyio
+async def test_get_many_reads_redis_when_the_l1_copy_is_soft_expired(fake_redis):
+    local = LocalCache(rules={"raw:": 60}, max_entries=10, max_bytes=4096)
+    cache = CacheRepository(fake_redis, local=local)
+    stale = {"__fs": 1, "v": {"title": "old"}, "x": time.time() - 1}
+    await cache.set_json("raw:tmdb:v4:550", {"title": "new"}, 600)
+    local.put("raw:tmdb:v4:550", cache.codec.encode(stale), 30)
+
+    assert await cache.get_many(["raw:tmdb:v4:550"]) == {"raw:tmdb:v4:550": {"title": "new"}}
+    assert "mget" in fake_redis.commands
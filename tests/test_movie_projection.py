@@ -0,0 +1,98 @@
+from src.app.services.movie_service import MovieResolverService
+
+
+def _tmdb_details():
+    return {
+        "id": 550,
+        "title": "Fight Club",
+        "release_date": "1999-10-15",
+        "runtime": 139,
+        "overview": "An insomniac office worker...",
+        "genres": [{"id": 18, "name": "Drama"}],
+        "production_countries": [{"iso_3166_1": "US", "name": "United States of America"}],
+        "origin_country": ["US"],
+        "poster_path": "/poster.jpg",
+        "backdrop_path": "/backdrop.jpg",
+        "vote_average": 8.4,
+        "popularity": 61.4,
+        "production_companies": [{"id": i, "name": f"Studio {i}"} for i in range(10)],
+        "external_ids": {"imdb_id": "tt0137523", "facebook_id": "FightClub"},
+        "credits": {
+            "crew": [
+                {"job": "Director", "name": "David Fincher", "credit_id": "a"},
+                {"job": "Assistant Director", "name": "Skip Me"},
+            ]
+            + [{"job": "Grip", "name": f"Crew {i}"} for i in range(100)],
+            "cast": [
+                {"name": f"Actor {i}", "character": f"Role {i}", "profile_path": "/p.jpg"}
+                for i in range(50)
+            ],
+        },
+    }
+
+
+def _kp_movie():
+    return {
+        "id": 361,
+        "name": "Бойцовский клуб",
+        "enName": "Fight Club",
+        "year": 1999,
+        "movieLength": 139,
+        "description": "Сотрудник страховой компании...",
+        "genres": [{"name": "драма"}],
+        "countries": [{"name": "США"}],
+        "poster": {"url": "https://kp/poster.jpg", "previewUrl": "https://kp/p.jpg"},
+        "externalId": {"imdb": "tt0137523", "tmdb": 550, "kpHD": "x"},
+        "rating": {"kp": 8.7, "imdb": 8.8, "filmCritics": 7.4},
+        "votes": {"kp": 1000, "imdb": 2000},
+        "facts": [{"value": "fact"} for _ in range(20)],
+        "persons": [
+            {"name": "Дэвид Финчер", "profession": "режиссеры", "photo": "x"},
+            {"name": "Брэд Питт", "enProfession": "actor", "description": "Tyler"},
+            {"name": "Продюсер", "profession": "продюсеры"},
+        ],
+    }
+
+
+def test_tmdb_projection_keeps_the_normalized_card_identical():
+    details = _tmdb_details()
+    projected = MovieResolverService._project_tmdb_details(details)
+
+    def card(payload):
+        return MovieResolverService._normalize_tmdb(
+            payload, None, watch_providers=[], watch_offers=[], watch_url=None
+        )
+
+    assert card(projected) == card(details)
+    assert "production_companies" not in projected
+    assert len(projected["credits"]["cast"]) == 5
+    assert MovieResolverService._project_tmdb_details(projected) == projected
+
+
+def test_kp_projection_keeps_the_normalized_card_identical():
+    movie = _kp_movie()
+    projected = MovieResolverService._project_kp_movie(movie)
+
+    assert MovieResolverService._normalize_kp(projected) == MovieResolverService._normalize_kp(movie)
+    assert "facts" not in projected
+    assert projected["externalId"] == {"imdb": "tt0137523", "tmdb": 550}
+
+
+def test_watch_projection_keeps_provider_extraction_identical():
+    payload = {
+        "id": 550,
+        "results": {
+            "US": {
+                "link": "https://tmdb/watch",
+                "flatrate": [
+                    {"provider_id": 8, "provider_name": "Netflix", "logo_path": "/n.jpg", "display_priority": 1}
+                ],
+                "buy": [{"provider_id": 2, "provider_name": "Apple TV", "logo_path": "/a.jpg"}],
+            }
+        },
+    }
+    projected = MovieResolverService._project_tmdb_watch(payload)
+
+    assert MovieResolverService._extract_watch_data(projected, "US") == (
+        MovieResolverService._extract_watch_data(payload, "US")
+    )
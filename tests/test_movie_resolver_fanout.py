@@ -0,0 +1,87 @@
+import json
+import time
+
+import httpx
+import pytest
+
+from src.app.observability import metrics
+
+
+@pytest.fixture
+def make_service(recorder, make_mappings, make_tmdb, make_omdb, make_movie_service):
+    def build(mapping):
+        omdb = make_omdb(recorder=recorder)
+        service = make_movie_service(
+            mappings=make_mappings(mapping), tmdb=make_tmdb(recorder=recorder), omdb=omdb
+        )
+        return service, omdb
+
+    return build
+
+
+@pytest.fixture
+def recorder(make_recorder):
+    return make_recorder()
+
+
+@pytest.mark.anyio
+async def test_resolve_default_runs_all_upstreams_together_when_imdb_is_mapped(
+    recorder, make_service
+):
+    service, omdb = make_service({"imdb_id": "tt0137523"})
+
+    card = await service.resolve(lang="en-US", tmdb_id=550)
+
+    assert recorder.max_in_flight == 3
+    assert omdb.seen == ["tt0137523"]
+    assert card.imdb_rating == 8.8
+    stages = metrics.snapshot().avg_ms_by_stage
+    assert {"tmdb_details", "tmdb_watch", "omdb_rating"} <= set(stages)
+
+
+@pytest.mark.anyio
+async def test_resolve_default_waits_for_details_when_imdb_is_unknown(recorder, make_service):
+    service, omdb = make_service({})
+
+    card = await service.resolve(lang="en-US", tmdb_id=550)
+
+    assert recorder.max_in_flight == 2
+    assert omdb.seen == ["tt0137523"]
+    assert card.imdb_id == "tt0137523"
+
+
+@pytest.mark.anyio
+async def test_prefetched_batch_resolves_warm_cards_without_redis_reads(
+    fake_redis, make_service
+):
+    service, _ = make_service({"imdb_id": "tt0137523"})
+    await service.resolve(lang="en-US", tmdb_id=550)
+
+    prefetched = await service.prefetch(lang="en-US", tmdb_ids=[550, 551])
+    fake_redis.commands.clear()
+    card = await service.resolve(lang="en-US", tmdb_id=550, prefetched=prefetched)
+
+    assert card.tmdb_id == 550
+    assert fake_redis.commands == []
+    assert prefetched[service._norm_key(551, "en-US", "US")] is None
+
+
+class _DownTmdb:
+    async def get(self, path, params=None):
+        raise httpx.ConnectError("tmdb unreachable")
+
+
+@pytest.mark.anyio
+async def test_resolve_falls_back_to_a_stale_card_when_upstream_fails(
+    fake_redis, make_movie_service
+):
+    service = make_movie_service(tmdb=_DownTmdb())
+    key = service._norm_key(550, "en-US", "US")
+    envelope = {"__fs": 1, "v": {"title": "Fight Club", "tmdb_id": 550}, "x": time.time() - 5}
+    await fake_redis.set(key, json.dumps(envelope), ex=600)
+
+    card = await service.resolve(lang="en-US", tmdb_id=550)
+    assert card.title == "Fight Club"
+
+    with pytest.raises(httpx.ConnectError):
+        await service.resolve(lang="en-US", tmdb_id=603)
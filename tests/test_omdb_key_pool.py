@@ -0,0 +1,67 @@
+import httpx
+import pytest
+
+import src.app.clients.omdb_client as omdb_module
+from src.app.clients.omdb_client import OmdbClient
+from src.app.clients.omdb_keys import OmdbKeyPool
+
+
+def _omdb_handler(seen_keys, exhausted=()):
+    def handler(request: httpx.Request) -> httpx.Response:
+        key = str(request.url.params.get("apikey") or "")
+        seen_keys.append(key)
+        if key in exhausted:
+            return httpx.Response(
+                status_code=401,
+                json={"Response": "False", "Error": "Request limit reached!"},
+            )
+        return httpx.Response(
+            status_code=200,
+            json={"Response": "True", "imdbRating": "7.5", "imdbVotes": "100"},
+        )
+
+    return handler
+
+
+@pytest.mark.anyio
+async def test_exhausted_key_is_skipped_by_every_worker_until_reset(fake_redis, monkeypatch):
+    monkeypatch.setattr(omdb_module, "OMDB_BASE", "http://omdb.test/")
+    monkeypatch.setattr(omdb_module, "OMDB_API_KEYS", ("key_primary", "key_backup"))
+    monkeypatch.setattr(omdb_module, "OMDB_MOCK_ENABLED", False)
+    seen_keys: list[str] = []
+    transport = httpx.MockTransport(_omdb_handler(seen_keys, exhausted={"key_primary"}))
+    # Two workers: separate pools, one Redis.
+    first, second = OmdbKeyPool(daily_limit=1000), OmdbKeyPool(daily_limit=1000)
+    first.bind(fake_redis)
+    second.bind(fake_redis)
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        assert await OmdbClient(client, keys=first).rating("tt0000001") is not None
+        assert seen_keys == ["key_primary", "key_backup"]
+        seen_keys.clear()
+        assert await OmdbClient(client, keys=second).rating("tt0000002") is not None
+
+    assert seen_keys == ["key_backup"]
+    assert second.stats() == {
+        "key1": {"used": 1, "remaining": 999, "exhausted": 1},
+        "key2": {"used": 2, "remaining": 998, "exhausted": 0},
+    }
+
+
+@pytest.mark.anyio
+async def test_pool_prefers_the_key_with_most_quota_left(fake_redis):
+    pool = OmdbKeyPool(daily_limit=3, sync_interval=0)
+    pool.bind(fake_redis)
+    keys = ("a", "b")
+
+    await pool.record_use("a")
+    assert [key for _, key in await pool.order(keys)] == ["b", "a"]
+
+    await pool.record_use("b")
+    await pool.record_use("a")
+    await pool.record_use("a")
+    # "a" has used its whole daily limit.
+    assert [key for _, key in await pool.order(keys)] == ["b"]
+    # Only fingerprints are stored, never the keys themselves.
+    assert f"{pool.fingerprint('a')}:used" in fake_redis.data[pool._usage_key]
+    assert "a:used" not in fake_redis.data[pool._usage_key]
@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+
+import src.app.services.random_service as random_module
+from src.app.repositories import PassRateRepository
+from src.app.services.pass_rate import RatingHistogram, wilson_interval
+
+
+@pytest.fixture
+def resolver(make_resolver):
+    return make_resolver(lambda tmdb_id: 8.0 if tmdb_id % 2 else 6.0)
+
+
+@pytest.fixture
+def tmdb(make_tmdb):
+    return make_tmdb()
+
+
+@pytest.fixture
+def service(fake_redis, tmdb, make_random_service, resolver):
+    return make_random_service(
+        tmdb=tmdb,
+        movie_resolver=resolver,
+        rating_stats=PassRateRepository(fake_redis, ttl=3600),
+    )
+
+
+async def _estimate(service, **overrides):
+    args = dict(
+        year_from=None,
+        year_to=None,
+        runtime_min=None,
+        runtime_max=None,
+        genres="18",
+        vote_avg_min=7.5,
+        country=None,
+        excluded_tmdb_ids=set(),
+        excluded_kp_ids=set(),
+        lang="en-US",
+    )
+    args.update(overrides)
+    return await service._estimate_preview_en(**args)
+
+
+def _bucket(service):
+    strategy = service._discover_strategy(7.5)
+    return service._preview_bucket(
+        {
+            "sort_by": strategy["sort_by"],
+            "vote_count.gte": strategy["vote_count_gte"],
+            "with_genres": "18",
+        }
+    )
+
+
+def test_histogram_answers_any_threshold_with_wilson_bounds():
+    histogram = RatingHistogram.from_ratings([6.0, 7.5, 7.4, 8.1, None])
+    assert histogram.samples == 5
+    assert histogram.passing(7.5) == 2
+    assert histogram.passing(0) == 5
+    low, high = wilson_interval(2, 5)
+    estimate = histogram.estimate(7.5)
+    assert (estimate.low, estimate.high) == (low, high)
+    assert low < estimate.rate < high
+
+
+@pytest.mark.anyio
+async def test_preview_samples_once_then_answers_from_statistics(service, resolver, monkeypatch):
+    monkeypatch.setattr(random_module, "PREVIEW_ESTIMATOR_MIN_SAMPLES", 20)
+    monkeypatch.setattr(random_module, "PREVIEW_ESTIMATOR_MAX_HALF_WIDTH", 1.0)
+    monkeypatch.setattr(random_module, "PREVIEW_ESTIMATOR_BATCH", 40)
+
+    first = await _estimate(service)
+    assert len(resolver.resolved) > 0
+    await asyncio.gather(*random_module._sampling_tasks.values())
+    sampled = len(resolver.resolved)
+    second = await _estimate(service)
+
+    assert len(resolver.resolved) == sampled
+    assert second["estimated_total"] == pytest.approx(200, abs=60)
+    assert first["unavailable"] is False
+
+
+@pytest.mark.anyio
+async def test_wide_interval_triggers_one_background_batch(service, resolver, monkeypatch):
+    monkeypatch.setattr(random_module, "PREVIEW_ESTIMATOR_MIN_SAMPLES", 4)
+    monkeypatch.setattr(random_module, "PREVIEW_ESTIMATOR_MAX_HALF_WIDTH", 0.01)
+    monkeypatch.setattr(random_module, "PREVIEW_ESTIMATOR_BATCH", 8)
+    bucket = _bucket(service)
+    await service.rating_stats.add(bucket, RatingHistogram.from_ratings([8.0, 6.0, 8.0, 6.0]).counts)
+
+    await _estimate(service)
+    assert resolver.resolved == []
+    await asyncio.gather(*random_module._sampling_tasks.values())
+
+    assert len(resolver.resolved) == 8
+    assert RatingHistogram(counts=await service.rating_stats.load(bucket)).samples == 12
+
+
+@pytest.mark.anyio
+async def test_foreground_sample_does_not_feed_shared_statistics(service, monkeypatch):
+    monkeypatch.setattr(random_module, "PREVIEW_ESTIMATOR_MIN_SAMPLES", 20)
+    seeded: list[str] = []
+
+    def record_later(bucket, **kwargs):
+        seeded.append(bucket)
+
+    monkeypatch.setattr(service, "_sample_ratings_later", record_later)
+    bucket = _bucket(service)
+
+    await _estimate(service)
+
+    assert seeded == [bucket]
+    assert not await service.rating_stats.load(bucket)
+
+
+@pytest.mark.anyio
+async def test_requests_differing_only_by_country_keep_separate_statistics(
+    service, monkeypatch
+):
+    monkeypatch.setattr(random_module, "PREVIEW_ESTIMATOR_MIN_SAMPLES", 4)
+    monkeypatch.setattr(random_module, "PREVIEW_ESTIMATOR_MAX_HALF_WIDTH", 1.0)
+    sampled: dict[str, dict] = {}
+
+    def record_later(bucket, *, params, **kwargs):
+        sampled[bucket] = params
+
+    monkeypatch.setattr(service, "_sample_ratings_later", record_later)
+    us_bucket = _bucket(service).replace(":c=*:", ":c=US:")
+    await service.rating_stats.add(us_bucket, RatingHistogram.from_ratings([8.0] * 4).counts)
+
+    await _estimate(service, country="US")
+    await _estimate(service, country="GB")
+
+    # The US histogram answered its own request only; GB sampled its own bucket.
+    assert list(sampled) == [us_bucket.replace(":c=US:", ":c=GB:")]
+    assert sampled[us_bucket.replace(":c=US:", ":c=GB:")]["with_origin_country"] == "GB"
+
+
+@pytest.mark.anyio
+async def test_background_sample_skips_the_first_page(service, tmdb, monkeypatch):
+    monkeypatch.setattr(random_module, "PREVIEW_ESTIMATOR_BATCH", 400)
+
+    await service._sample_ratings("many", params={}, lang="en-US", total_pages=20)
+    assert sorted(tmdb.requested) == list(range(2, 21))
+
+    tmdb.requested.clear()
+    await service._sample_ratings("single", params={}, lang="en-US", total_pages=1)
+    assert tmdb.requested == [1]
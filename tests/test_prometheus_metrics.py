@@ -0,0 +1,111 @@
+import httpx
+import pytest
+
+from src.app import dependencies
+from src.app.main import app
+from src.app.observability import InMemoryMetrics, endpoint_label
+
+
+def test_endpoint_label_collapses_ids():
+    assert endpoint_label("/3/movie/550/credits") == "/3/movie/{id}/credits"
+    assert endpoint_label("/3/find/tt0137523") == "/3/find/{id}"
+    assert endpoint_label("/3/discover/movie") == "/3/discover/movie"
+
+
+def test_render_emits_cumulative_buckets():
+    worker = InMemoryMetrics()
+    worker.observe("/api/random", 200, 3)
+    worker.observe("/api/random", 200, 40)
+    worker.observe("/api/random", 200, 20_000)
+
+    text = InMemoryMetrics.render(worker.export())
+
+    assert "# TYPE filmspin_http_request_duration_seconds histogram" in text
+    prefix = 'filmspin_http_request_duration_seconds_bucket{route="/api/random",method="GET"'
+    assert f'{prefix},le="0.005"}} 1' in text
+    assert f'{prefix},le="0.05"}} 2' in text
+    assert f'{prefix},le="10"}} 2' in text
+    assert f'{prefix},le="+Inf"}} 3' in text
+    assert (
+        'filmspin_http_requests_total{route="/api/random",method="GET",status="200"} 3'
+        in text
+    )
+
+
+@pytest.mark.anyio
+async def test_collect_sums_every_published_worker(fake_redis):
+    first = InMemoryMetrics()
+    second = InMemoryMetrics()
+    first.observe("/api/random", 200, 10)
+    first.observe_cache("raw:tmdb", "hit")
+    second.observe("/api/random", 200, 10)
+    second.observe_cache("raw:tmdb", "hit")
+    second.observe_upstream("tmdb", "/3/movie/550", 200, 120)
+    await second.publish(fake_redis)
+
+    text = InMemoryMetrics.render(await first.collect(fake_redis))
+
+    assert (
+        'filmspin_http_requests_total{route="/api/random",method="GET",status="200"} 2'
+        in text
+    )
+    assert 'filmspin_cache_requests_total{prefix="raw:tmdb",result="hit"} 2' in text
+    assert (
+        'filmspin_upstream_requests_total{host="tmdb",endpoint="/3/movie/{id}",status="200"} 1'
+        in text
+    )
+    assert (
+        'filmspin_http_request_duration_seconds_bucket{route="/api/random",method="GET",le="0.01"} 2'
+        in text
+    )
+
+
+@pytest.mark.anyio
+async def test_totals_never_drop_when_a_worker_goes_away(fake_redis):
+    retired = InMemoryMetrics()
+    for _ in range(5):
+        retired.observe("/api/random", 200, 10)
+    await retired.publish(fake_redis)
+    await retired.publish(fake_redis)  # nothing new: nothing added twice
+    del retired
+    replacement = InMemoryMetrics()
+    replacement.observe("/api/random", 200, 10)
+
+    state = await replacement.collect(fake_redis)
+
+    [(labels, value)] = state["counters"]["filmspin_http_requests_total"]
+    assert value == 6
+
+
+@pytest.mark.anyio
+async def test_failed_publish_is_retried_and_scrape_fails_without_redis(fake_redis):
+    class BrokenRedis:
+        def pipeline(self, transaction=True):
+            raise ConnectionError("down")
+
+    worker = InMemoryMetrics()
+    worker.observe("/api/config", 200, 1)
+
+    assert await worker.collect(BrokenRedis()) is None
+    await worker.publish(fake_redis)
+    state = InMemoryMetrics._from_fields(fake_redis.data[InMemoryMetrics.TOTALS_KEY])
+    assert state["counters"]["filmspin_http_requests_total"][0][1] == 1
+
+
+@pytest.mark.anyio
+async def test_prometheus_endpoint_labels_route_templates(fake_redis):
+    async def redis_override():
+        return fake_redis
+
+    app.dependency_overrides[dependencies.get_redis] = redis_override
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/api/config")
+            response = await client.get("/api/metrics/prometheus")
+    finally:
+        app.dependency_overrides.pop(dependencies.get_redis, None)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'route="/api/config"' in response.text
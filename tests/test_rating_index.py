@@ -0,0 +1,94 @@
+import pytest
+
+from src.app.repositories import RatingEntry, RatingIndexRepository, RatingSnapshot
+
+
+@pytest.mark.anyio
+async def test_rating_index_records_and_expires_entries(fake_redis):
+    repo = RatingIndexRepository(fake_redis, max_age=3600)
+    await repo.record(550, imdb_id="tt0137523", rating=8.8, votes=2_400_000)
+
+    assert await repo.lookup([550, 551]) == {
+        550: RatingEntry(imdb_id="tt0137523", rating=8.8, votes=2_400_000)
+    }
+
+    repo.max_age = -1
+    assert await repo.lookup([550]) == {}
+
+
+@pytest.mark.anyio
+async def test_rating_index_prunes_expired_entries_on_write(fake_redis, monkeypatch):
+    import src.app.repositories.rating_repo as rating_repo
+
+    repo = RatingIndexRepository(fake_redis, max_age=3600)
+    clock = [1_000_000.0]
+    monkeypatch.setattr(rating_repo.time, "time", lambda: clock[0])
+    await repo.record(13, imdb_id="tt0109830", rating=8.8, votes=10)
+    clock[0] += 7200
+    await repo.record(550, imdb_id="tt0137523", rating=8.8, votes=20)
+
+    assert set(fake_redis.data[repo.KEY]) == {"550"}
+    assert set(fake_redis.data[repo.WRITTEN_KEY]) == {"550"}
+
+
+@pytest.mark.anyio
+async def test_rating_snapshot_serves_lookups_when_redis_is_down(fake_redis, tmp_path):
+    repo = RatingIndexRepository(fake_redis, max_age=3600)
+    await repo.record(13, imdb_id="tt0109830", rating=8.8, votes=10)
+    await repo.record(550, imdb_id="tt0137523", rating=8.8, votes=20)
+    await repo.record(27205, imdb_id=None, rating=None, votes=None)
+    path = str(tmp_path / "ratings.bin")
+    assert await repo.export_snapshot(path) == 3
+
+    class DownRedis:
+        async def hmget(self, key, fields):
+            raise ConnectionError("down")
+
+    snapshot = RatingSnapshot(path)
+    mapped = RatingIndexRepository(DownRedis(), max_age=3600, snapshot=snapshot)
+
+    found = await mapped.lookup([550, 13])
+    assert found[550] == RatingEntry(imdb_id="tt0137523", rating=8.8, votes=20)
+    assert found[13].imdb_id == "tt0109830"
+    assert snapshot.get(27205) == RatingEntry(imdb_id=None, rating=None, votes=None)
+    snapshot.close()
+
+
+@pytest.mark.anyio
+async def test_rating_lookup_prefers_newer_redis_entry_over_snapshot(
+    fake_redis, tmp_path, monkeypatch
+):
+    import src.app.repositories.rating_repo as rating_repo
+
+    clock = [1_000_000.0]
+    monkeypatch.setattr(rating_repo.time, "time", lambda: clock[0])
+    repo = RatingIndexRepository(fake_redis, max_age=3600)
+    await repo.record(550, imdb_id="tt0137523", rating=8.6, votes=20)
+    path = str(tmp_path / "ratings.bin")
+    await repo.export_snapshot(path)
+    clock[0] += 60
+    await repo.record(550, imdb_id="tt0137523", rating=8.8, votes=25)
+
+    snapshot = RatingSnapshot(path)
+    mapped = RatingIndexRepository(fake_redis, max_age=3600, snapshot=snapshot)
+    assert (await mapped.lookup([550]))[550].rating == 8.8
+    snapshot.close()
+
+
+@pytest.mark.anyio
+async def test_preview_and_ordering_skip_known_rating_misses(
+    fake_redis, make_resolver, make_random_service
+):
+    ratings = RatingIndexRepository(fake_redis, max_age=3600)
+    await ratings.record(1, imdb_id="tt1", rating=5.0, votes=10)
+    await ratings.record(2, imdb_id="tt2", rating=8.0, votes=10)
+    resolver = make_resolver({3: 7.5, 4: 6.0})
+    service = make_random_service(movie_resolver=resolver, ratings=ratings)
+
+    assert await service._drop_known_rating_misses([1, 2, 3, 4], 7.0) == [2, 3, 4]
+
+    stats = await service._count_imdb_preview_hits(
+        lang="en-US", tmdb_ids=[1, 2, 3, 4], min_rating=7.0, excluded_kp_ids=set()
+    )
+    assert stats == (2, 4)
+    assert resolver.resolved == [3, 4]
@@ -0,0 +1,35 @@
+import pytest
+
+import src.app.repositories.recent_repo as recent_module
+from src.app.repositories import RecentRepository
+
+
+@pytest.mark.anyio
+async def test_recent_history_evicts_oldest_in_one_round_trip(fake_redis, monkeypatch):
+    clock = iter(range(1, 100))
+    monkeypatch.setattr(recent_module.time, "time", lambda: next(clock))
+    recent = RecentRepository(fake_redis)
+
+    for movie_id in ("550", "603", "13", "550", "680"):
+        await recent.add("recent:tmdb:v2:x", movie_id, ttl=60, limit=3)
+
+    # 550 was shown again, so 603 is now the oldest and goes first.
+    assert await recent.seen("recent:tmdb:v2:x", ["550", "603", "13", "680", "1"]) == {
+        "550",
+        "13",
+        "680",
+    }
+    assert fake_redis.commands.count("eval") == 5
+    assert "smembers" not in fake_redis.commands
+
+
+@pytest.mark.anyio
+async def test_choose_not_recent_only_checks_the_candidates(fake_redis):
+    recent = RecentRepository(fake_redis)
+    await recent.add("recent:tmdb:v2:y", "1", ttl=60, limit=10)
+
+    chosen, pool = await recent.choose_not_recent("recent:tmdb:v2:y", [1, 2])
+
+    assert chosen == 2
+    assert pool == [1, 2]
+    assert await recent.seen("recent:tmdb:v2:y", []) == set()
@@ -0,0 +1,98 @@
+import pytest
+
+from src.app.services.refresh import HotCardTracker, RefreshScheduler
+
+
+def _scheduler(tracker, **overrides):
+    options = {"interval_sec": 60, "top_n": 10, "lead_sec": 600, "budget": 5}
+    options.update(overrides)
+    return RefreshScheduler(tracker, **options)
+
+
+def _card_key(tmdb_id, lang, region):
+    return f"norm:{tmdb_id}:{lang}:{region}"
+
+
+class _Refresher:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, tmdb_id, lang, region):
+        self.calls.append((tmdb_id, lang, region))
+
+
+@pytest.mark.anyio
+async def test_tick_refreshes_only_hot_cards_close_to_expiry(fake_redis):
+    tracker = HotCardTracker()
+    for _ in range(3):
+        tracker.touch(550, "en-US", "US")
+    tracker.touch(551, "en-US", "US")
+    tracker.touch(552, "en-US", "US")
+    await fake_redis.set(_card_key(550, "en-US", "US"), "x", ex=60)
+    await fake_redis.set(_card_key(551, "en-US", "US"), "x", ex=3600)
+    refresher = _Refresher()
+    scheduler = _scheduler(tracker)
+
+    refreshed = await scheduler.tick(fake_redis, _card_key, refresher)
+
+    # 550 expires inside the lead window, 552 is already gone, 551 is fresh.
+    assert refreshed == 2
+    assert refresher.calls == [(550, "en-US", "US"), (552, "en-US", "US")]
+    assert scheduler.stats()["leader"] == 1
+    assert tracker.drain() == {}
+
+
+@pytest.mark.anyio
+async def test_tick_respects_budget(fake_redis):
+    tracker = HotCardTracker()
+    for tmdb_id in range(1, 6):
+        tracker.touch(tmdb_id, "en-US", "US")
+    refresher = _Refresher()
+    scheduler = _scheduler(tracker, budget=2)
+
+    await scheduler.tick(fake_redis, _card_key, refresher)
+
+    assert len(refresher.calls) == 2
+    assert scheduler.stats()["over_budget"] == 3
+
+
+@pytest.mark.anyio
+async def test_only_the_lease_holder_refreshes(fake_redis):
+    leader_tracker, follower_tracker = HotCardTracker(), HotCardTracker()
+    leader = _scheduler(leader_tracker)
+    follower = _scheduler(follower_tracker)
+    follower_tracker.touch(550, "en-US", "US")
+    leader_calls, follower_calls = _Refresher(), _Refresher()
+
+    await leader.tick(fake_redis, _card_key, leader_calls)
+    await follower.tick(fake_redis, _card_key, follower_calls)
+    await leader.tick(fake_redis, _card_key, leader_calls)
+
+    assert follower_calls.calls == []
+    assert follower.stats()["leader"] == 0
+    # The follower's counts still reach the shared set for the leader to use.
+    assert leader_calls.calls == [(550, "en-US", "US")]
+
+
+@pytest.mark.anyio
+async def test_refresh_card_bypasses_warm_cache_and_is_not_counted(
+    make_mappings, make_tmdb, make_omdb, make_movie_service
+):
+    tracker = HotCardTracker()
+    tmdb = make_tmdb()
+    service = make_movie_service(
+        mappings=make_mappings({"imdb_id": "tt0137523"}),
+        tmdb=tmdb,
+        omdb=make_omdb(),
+        hot_cards=tracker,
+    )
+    await service.resolve(lang="en-US", tmdb_id=550)
+    await service.resolve(lang="en-US", tmdb_id=550)
+    assert len(tmdb.calls) == 2
+    assert tracker.drain() == {"550:en-US:US": 2}
+
+    card = await service.refresh_card(550, "en-US", "US")
+
+    assert card.tmdb_id == 550
+    assert len(tmdb.calls) == 4
+    assert tracker.drain() == {}
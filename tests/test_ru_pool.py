@@ -0,0 +1,104 @@
+import pytest
+
+from src.app.repositories import CacheRepository
+
+
+class _Recent:
+    def __init__(self):
+        self.added: list[str] = []
+
+    async def seen(self, key, candidates):
+        return set(candidates) & set(self.added)
+
+    async def add(self, key, movie_id, *, ttl, limit):
+        self.added.append(movie_id)
+
+
+def _docs():
+    return [
+        {"id": 1, "name": "Low", "rating": {"imdb": 6.1}, "externalId": {"tmdb": 11}},
+        {"id": 2, "name": "High", "rating": {"imdb": 8.7}, "externalId": {"tmdb": 12}},
+        {"id": 3, "name": "Excluded", "rating": {"imdb": 8.9}, "externalId": {"tmdb": 13}},
+    ]
+
+
+@pytest.fixture
+def make_service(fake_redis, make_resolver, make_random_service):
+    def build(kp, recent=None):
+        docs = [*kp.docs, kp.random_doc] if kp.random_doc else kp.docs
+        resolver = make_resolver({doc["id"]: doc["rating"]["imdb"] for doc in docs})
+        service = make_random_service(
+            cache=CacheRepository(fake_redis),
+            recent=recent or _Recent(),
+            poiskkino=kp,
+            movie_resolver=resolver,
+        )
+        return service, resolver
+
+    return build
+
+
+async def _spin(service, **overrides):
+    args = dict(
+        year_from=None,
+        year_to=None,
+        runtime_min=None,
+        runtime_max=None,
+        genres=None,
+        vote_avg_min=8.0,
+        country=None,
+        exclude_tmdb="13",
+        exclude_kp=None,
+    )
+    args.update(overrides)
+    return await service.random_ru(**args)
+
+
+@pytest.mark.anyio
+async def test_random_ru_prefilters_a_cached_list_page(make_kp, make_service):
+    kp = make_kp(_docs())
+    service, resolver = make_service(kp)
+
+    movie = await _spin(service)
+
+    assert movie.kp_id == 2
+    assert resolver.resolved == [2]
+    assert resolver.seeded == [1, 2, 3]
+    assert len(kp.calls) == 1
+    path, params = kp.calls[0]
+    assert path == "/v1.4/movie"
+    assert params["rating.imdb"] == "8-10"
+    assert params["limit"] == 250
+
+    # The page is cached, so the next spin needs no list call at all.
+    await _spin(service, exclude_kp="2")
+    assert [path for path, _ in kp.calls].count("/v1.4/movie") == 1
+
+
+@pytest.mark.anyio
+async def test_random_ru_falls_back_to_random_when_list_is_unavailable(
+    make_kp, make_service
+):
+    kp = make_kp(_docs()[1:2], list_fails=True)
+    service, resolver = make_service(kp)
+
+    movie = await _spin(service, exclude_tmdb=None)
+
+    assert movie.kp_id == 2
+    assert [path for path, _ in kp.calls] == ["/v1.4/movie", "/v1.4/movie/random"]
+
+
+@pytest.mark.anyio
+async def test_random_ru_samples_random_once_every_pool_page_was_shown(make_kp, make_service):
+    fresh = {"id": 4, "name": "Fresh", "rating": {"imdb": 8.4}, "externalId": {"tmdb": 14}}
+    kp = make_kp(_docs(), pages=2, random_doc=fresh)
+    recent = _Recent()
+    recent.added.extend(["1", "2", "3"])
+    service, resolver = make_service(kp, recent)
+
+    movie = await _spin(service, exclude_tmdb=None)
+
+    assert movie.kp_id == 4
+    assert sorted(params["page"] for path, params in kp.calls if path == "/v1.4/movie") == [1, 2]
+    assert kp.calls[-1][0] == "/v1.4/movie/random"
+    assert resolver.resolved == [4]
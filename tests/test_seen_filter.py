@@ -0,0 +1,96 @@
+import httpx
+import pytest
+
+from src.app import dependencies
+from src.app.main import app
+from src.app.repositories import RecentRepository, SeenFilterRepository
+from src.app.services.random_service import RandomService
+
+
+@pytest.mark.anyio
+async def test_seen_filter_remembers_titles_per_session(fake_redis):
+    seen = SeenFilterRepository(fake_redis, bits=1 << 16, hashes=6, ttl=3600)
+    shown = [str(tmdb_id) for tmdb_id in range(1000, 3000)]
+    for movie_id in shown:
+        await seen.add("a" * 32, "tmdb", movie_id)
+
+    # No false negatives, and a low false-positive rate for unseen ids.
+    assert await seen.seen("a" * 32, "tmdb", shown) == set(shown)
+    unseen = [str(tmdb_id) for tmdb_id in range(900_000, 902_000)]
+    assert len(await seen.seen("a" * 32, "tmdb", unseen)) < 20
+    assert await seen.seen("b" * 32, "tmdb", shown[:5]) == set()
+    assert await seen.seen("a" * 32, "kp", shown[:5]) == set()
+
+
+@pytest.mark.anyio
+async def test_seen_filter_rotates_instead_of_saturating(fake_redis):
+    seen = SeenFilterRepository(fake_redis, bits=1 << 12, hashes=4, ttl=3600, capacity=300)
+    shown = [str(tmdb_id) for tmdb_id in range(1000, 4000)]
+    for movie_id in shown:
+        await seen.add("a" * 32, "tmdb", movie_id)
+
+    # Ten times the capacity would set almost every bit of a single bitmap.
+    unseen = [str(tmdb_id) for tmdb_id in range(900_000, 902_000)]
+    assert len(await seen.seen("a" * 32, "tmdb", unseen)) < 60
+    assert await seen.seen("a" * 32, "tmdb", shown[-300:]) == set(shown[-300:])
+    assert len(await seen.seen("a" * 32, "tmdb", shown[:300])) < 60
+    assert fake_redis.data[f"{seen._key('a' * 32, 'tmdb')}:n"] <= seen.capacity
+
+
+@pytest.mark.anyio
+async def test_session_history_replaces_the_shared_filter_history(fake_redis):
+    service = RandomService(
+        cache=None,
+        recent=RecentRepository(fake_redis),
+        tmdb=None,
+        poiskkino=None,
+        movie_resolver=None,
+        seen=SeenFilterRepository(fake_redis, bits=1 << 12, hashes=4, ttl=3600),
+    )
+    await service._remember_shown("recent:tmdb:v2:f", "550", session="c" * 32, kind="tmdb")
+
+    ordered = await service._order_by_recentness(
+        "recent:tmdb:v2:f", [550, 603], prefer_shuffle=False, session="c" * 32
+    )
+    assert ordered == [603, 550]
+    # Someone else on the same filters is not affected.
+    assert await service._order_by_recentness(
+        "recent:tmdb:v2:f", [550, 603], prefer_shuffle=False
+    ) == [550, 603]
+
+
+class _SessionRecorder:
+    def __init__(self):
+        self.sessions = []
+
+    async def random_en(self, *, session, **_):
+        self.sessions.append(session)
+        return {"error": "No results for the current filters."}
+
+
+@pytest.mark.anyio
+async def test_random_endpoint_issues_and_reuses_a_session_cookie(monkeypatch):
+    monkeypatch.setattr(dependencies, "SEEN_FILTER_ENABLED", True)
+    recorder = _SessionRecorder()
+
+    async def _get_service():
+        return recorder
+
+    app.dependency_overrides[dependencies.get_random_service] = _get_service
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get("/api/random")
+            issued = first.cookies.get(dependencies.SESSION_COOKIE)
+            await client.get("/api/random")
+            await client.get(
+                "/api/random", headers={dependencies.SESSION_HEADER: "not-a-session"}
+            )
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # A client that never keeps the cookie stays on the shared history.
+            await client.get("/api/random")
+    finally:
+        app.dependency_overrides.clear()
+
+    # The first visit has no id to bring back yet.
+    assert issued and recorder.sessions == [None, issued, issued, None]
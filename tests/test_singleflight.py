@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from src.app.clients.singleflight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_calls_share_one_flight():
+    flights = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"id": 550}
+
+    results = await asyncio.gather(*(flights.do("tmdb:/movie/550", fetch) for _ in range(5)))
+
+    assert calls == 1
+    assert all(result == {"id": 550} for result in results)
+    assert flights.stats() == {"calls": 5, "flights": 1, "joins": 4, "in_flight": 0}
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return 42
+
+    first = asyncio.create_task(flights.do("k", fetch))
+    second = asyncio.create_task(flights.do("k", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == 42
+    assert first.cancelled()
+
+
+def test_make_key_ignores_param_order():
+    left = SingleFlight.make_key("tmdb", "/discover/movie", {"page": 2, "language": "en"})
+    right = SingleFlight.make_key("tmdb", "/discover/movie", {"language": "en", "page": 2})
+    assert left == right
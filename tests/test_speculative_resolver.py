@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from src.app.services.speculative import PassRateTracker, SpeculativeResolver
+
+
+@pytest.mark.anyio
+async def test_first_match_keeps_candidate_order_and_cancels_leftovers():
+    cancelled: list[int] = []
+
+    async def resolve(candidate: int) -> int:
+        try:
+            # Later candidates finish first to prove order is still respected.
+            await asyncio.sleep(0.05 - candidate * 0.005)
+            return candidate
+        except asyncio.CancelledError:
+            cancelled.append(candidate)
+            raise
+
+    speculation = SpeculativeResolver(max_window=4, tracker=PassRateTracker(prior=0.1))
+    winner, result, stats = await speculation.first_match(
+        [1, 2, 3, 4, 5, 6],
+        resolve=resolve,
+        accept=lambda _, value: value >= 2,
+        bucket="test",
+    )
+
+    assert winner == 2
+    assert result == 2
+    assert stats.consumed == 2
+    assert stats.launched >= 4
+    assert stats.wasted == stats.launched - 2
+    assert stats.cancelled >= len(cancelled)
+
+
+@pytest.mark.anyio
+async def test_first_match_reports_no_winner():
+    async def resolve(candidate: int) -> int:
+        return candidate
+
+    speculation = SpeculativeResolver(max_window=3, tracker=PassRateTracker())
+    winner, result, stats = await speculation.first_match(
+        [1, 2, 3],
+        resolve=resolve,
+        accept=lambda _, __: False,
+        bucket="test",
+    )
+
+    assert winner is None and result is None
+    assert stats.consumed == 3
+    assert stats.wasted == 0
+
+
+def test_window_grows_as_pass_rate_drops():
+    tracker = PassRateTracker(alpha=0.5, prior=0.9)
+    speculation = SpeculativeResolver(max_window=8, tracker=tracker)
+    optimistic = speculation.window_for("strict")
+    for _ in range(6):
+        tracker.observe("strict", False)
+    assert speculation.window_for("strict") > optimistic
+    assert speculation.window_for("strict") <= 8
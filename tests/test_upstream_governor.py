@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.app.clients.base import RetryHttpClient
+from src.app.clients.governor import Priority, UpstreamGovernor, upstream_priority
+
+
+async def _hold(governor, lane, started, release):
+    with upstream_priority(lane):
+        async with governor.slot():
+            started.append(lane)
+            await release.wait()
+
+
+@pytest.mark.anyio
+async def test_interactive_calls_jump_the_queue_and_background_keeps_headroom():
+    governor = UpstreamGovernor("test", rate=1000, max_concurrency=4)
+    started: list[Priority] = []
+    release = asyncio.Event()
+
+    tasks = [
+        asyncio.create_task(_hold(governor, Priority.BACKGROUND, started, release))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    # Background work may only use half of the window.
+    assert started == [Priority.BACKGROUND, Priority.BACKGROUND]
+
+    tasks += [
+        asyncio.create_task(_hold(governor, Priority.INTERACTIVE, started, release))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0.01)
+    assert started.count(Priority.INTERACTIVE) == 2
+    assert governor.stats()["queued"] == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert governor.in_flight == 0
+    assert started[-1] == Priority.BACKGROUND
+
+
+@pytest.mark.anyio
+async def test_throttling_halves_the_window_and_shares_the_cooldown(fake_redis):
+    first = UpstreamGovernor("tmdb-test", rate=1000, max_concurrency=8)
+    second = UpstreamGovernor("tmdb-test", rate=1000, max_concurrency=8)
+    first.bind(fake_redis)
+    second.bind(fake_redis)
+
+    await first.observe(httpx.Response(429, headers={"Retry-After": "30"}))
+
+    assert first.limit == 4
+    assert first.stats()["throttled"] == 1
+    # The other worker learns about the cooldown from Redis.
+    delay = await second._take_token()
+    assert 29 < delay <= 30.001
+
+
+@pytest.mark.anyio
+async def test_rate_limit_headers_start_a_cooldown_and_success_grows_window():
+    governor = UpstreamGovernor("kp-test", rate=1000, max_concurrency=8)
+    governor.limit = 2.0
+    reset_at = time.time() + 5
+
+    await governor.observe(
+        httpx.Response(
+            200,
+            headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset_at)},
+        )
+    )
+
+    assert governor.limit == 2.5
+    assert 4 < governor._blocked_until - time.time() <= 5
+
+
+@pytest.mark.anyio
+async def test_local_token_bucket_paces_bursts():
+    governor = UpstreamGovernor("omdb-test", rate=2, max_concurrency=8)
+
+    assert await governor._take_token() == 0
+    assert await governor._take_token() == 0
+    assert 0.4 < await governor._take_token() <= 0.5
+
+
+@pytest.mark.anyio
+async def test_retry_client_reports_transport_failures_to_the_governor():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
+
+    governor = UpstreamGovernor("flaky", rate=1000, max_concurrency=8)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        http = RetryHttpClient(client, retries=0, governor=governor)
+        with pytest.raises(httpx.ConnectError):
+            await http.get_json("http://upstream.test/movie/1")
+
+    assert governor.limit == 4
+    assert governor.in_flight == 0
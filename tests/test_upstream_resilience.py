@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.app.clients.base import RetryHttpClient
+from src.app.clients.breaker import CircuitBreaker, CircuitOpenError
+from src.app.clients.hedging import LatencyTracker, build_latency_tracker
+
+
+def test_breaker_opens_after_threshold_and_probes_once_after_timeout(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("tmdb", failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.before()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+
+    now[0] += 31
+    breaker.before()  # the half-open probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+
+    now[0] += 31
+    breaker.before()
+    breaker.record_success()
+    breaker.before()
+    assert breaker.stats() == {"open": 0, "failures": 0, "opened": 2, "rejected": 3}
+
+
+@pytest.mark.anyio
+async def test_open_circuit_fails_fast_without_retries():
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503)
+
+    breaker = CircuitBreaker("kp", failure_threshold=2, reset_timeout=30)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        http = RetryHttpClient(client, retries=2, base_delay_sec=0, breaker=breaker)
+        with pytest.raises(CircuitOpenError):
+            await http.get_json("http://kp.test/v1.4/movie/1")
+        with pytest.raises(CircuitOpenError):
+            await http.get_json("http://kp.test/v1.4/movie/2")
+
+    assert calls == 2
+
+
+@pytest.mark.anyio
+async def test_cancelled_half_open_probe_does_not_wedge_the_circuit(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    started = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started.set()
+        await asyncio.sleep(10)
+        return httpx.Response(200, json={})
+
+    breaker = CircuitBreaker("tmdb", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    now[0] += 31
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        http = RetryHttpClient(client, breaker=breaker)
+        probe = asyncio.create_task(http.get_json("http://tmdb.test/movie/550"))
+        await started.wait()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    assert breaker.before() is True  # the next call probes again
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.anyio
+async def test_slow_request_is_hedged_and_the_faster_copy_wins():
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1.0)
+            return httpx.Response(200, json={"copy": "first"})
+        return httpx.Response(200, json={"copy": "hedge"})
+
+    latency = LatencyTracker(min_samples=3, hedge_ratio=1.0, min_delay=0.01)
+    for _ in range(3):
+        latency.record(0.02)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        http = RetryHttpClient(client, latency=latency)
+        started = time.perf_counter()
+        payload = await http.get_json("http://tmdb.test/movie/550")
+
+    assert payload == {"copy": "hedge"}
+    assert time.perf_counter() - started < 0.5
+    assert latency.stats()["hedge_wins"] == 1
+
+
+def test_hedges_stay_within_budget():
+    latency = LatencyTracker(min_samples=1, hedge_ratio=0.1)
+    latency.record(0.1)
+
+    allowed = 0
+    for _ in range(50):
+        assert latency.hedge_delay() == pytest.approx(0.1)
+        allowed += latency.allow_hedge()
+
+    assert allowed == 6
+
+
+def test_kp_tracks_latency_but_is_never_hedged_by_default():
+    kp = build_latency_tracker("kp")
+    assert build_latency_tracker("tmdb").enabled
+    assert not kp.enabled
+    for _ in range(kp.min_samples):
+        kp.record(0.1)
+
+    assert kp.hedge_delay() is None
@@ -0,0 +1,141 @@
+import httpx
+import pytest
+
+from src.app import dependencies
+from src.app.container import AppContainer
+from src.app.repositories import FilterStatsRepository
+from src.app.services.movie_service import MovieResolverService
+from src.app.services.refresh import HotCardTracker, RefreshScheduler
+from src.app.services.warmup import WarmupRunner
+
+
+@pytest.mark.anyio
+async def test_filter_stats_rank_combinations_by_spins(fake_redis):
+    repo = FilterStatsRepository(fake_redis, ttl=3600)
+    comedy = {"genres": "35", "vote_avg_min": 7.0, "year_from": None}
+    await repo.record("en", comedy)
+    await repo.record("en", {"genres": "27", "vote_avg_min": 6.0})
+    await repo.record("en", comedy)
+
+    top = await repo.top("en", 5)
+
+    # None values are dropped so equivalent combinations share one member.
+    assert top == [{"genres": "35", "vote_avg_min": 7.0}, {"genres": "27", "vote_avg_min": 6.0}]
+    assert await repo.top("ru", 5) == []
+
+
+class _Genres:
+    def __init__(self):
+        self.calls = []
+
+    async def get_genres(self, lang):
+        self.calls.append(lang)
+
+    async def get_genres_ru(self):
+        self.calls.append("ru")
+
+
+class _Random:
+    def __init__(self):
+        self.previews = []
+
+    async def preview_en(self, **filters):
+        self.previews.append(("en", filters))
+
+    async def preview_ru(self, **filters):
+        self.previews.append(("ru", filters))
+
+
+@pytest.mark.anyio
+async def test_runner_replays_filters_and_resolves_hot_and_popular_cards(
+    fake_redis, make_resolver, make_tmdb, make_mappings
+):
+    stats = FilterStatsRepository(fake_redis, ttl=3600)
+    await stats.record("en", {"genres": "35", "vote_avg_min": 7.0, "lang": "en-US"})
+    await stats.record("ru", {"genres": "komediya", "vote_avg_min": 6.0})
+    await fake_redis.zincrby(RefreshScheduler.HOT_KEY, 5, "603:en-US:GB")
+    genres, random_service, resolver = _Genres(), _Random(), make_resolver(failing={13})
+    runner = WarmupRunner(
+        redis=fake_redis,
+        genres=genres,
+        random_service=random_service,
+        movie_resolver=resolver,
+        tmdb=make_tmdb(popular=(550, 13)),
+        mappings=make_mappings(),
+        filter_stats=stats,
+        concurrency=2,
+        rate=0,
+        ru_enabled=False,
+    )
+
+    report = await runner.run(top_filters=10, hot_cards=10, popular_pages=1, ru_cards=10)
+
+    assert genres.calls == ["en-US", "ru-RU"]
+    assert [kind for kind, _ in random_service.previews] == ["en"]
+    assert random_service.previews[0][1]["genres"] == "35"
+    assert sorted(resolver.cards) == [(550, "en-US", "US"), (603, "en-US", "GB")]
+    assert report.total == 6
+    assert report.failed == 1
+    assert report.by_stage == {"genres": 2, "filters": 1, "cards": 2}
+
+
+class _KpMappings:
+    def __init__(self, kp_by_tmdb):
+        self.kp_by_tmdb = kp_by_tmdb
+
+    async def get_by_tmdb(self, tmdb_id):
+        kp_id = self.kp_by_tmdb.get(tmdb_id)
+        return {"kp_id": kp_id} if kp_id else {}
+
+
+@pytest.mark.anyio
+async def test_ru_cards_skip_cached_kp_details_and_respect_the_cap(
+    fake_redis, make_resolver, make_tmdb
+):
+    await fake_redis.set(MovieResolverService._kp_details_key(361), "x")
+    resolver = make_resolver()
+    runner = WarmupRunner(
+        redis=fake_redis,
+        genres=_Genres(),
+        random_service=_Random(),
+        movie_resolver=resolver,
+        tmdb=make_tmdb(popular=(550, 13, 603, 680)),
+        mappings=_KpMappings({550: 361, 13: 7}),
+        filter_stats=None,
+        concurrency=1,
+        rate=0,
+    )
+
+    await runner.run(top_filters=0, hot_cards=0, popular_pages=1, ru_cards=2)
+
+    ru_cards = [tmdb_id for tmdb_id, lang, _ in resolver.cards if lang == "ru-RU"]
+    # 550's KP details are cached; 13 has a mapping but no details; 603 none.
+    assert ru_cards == [13, 603]
+    assert len([card for card in resolver.cards if card[1] == "en-US"]) == 4
+
+
+@pytest.mark.anyio
+async def test_startup_warm_up_runs_only_on_the_refresh_leader(fake_redis, monkeypatch):
+    leader = RefreshScheduler(HotCardTracker(), interval_sec=60, top_n=1, lead_sec=1, budget=1)
+    follower = RefreshScheduler(HotCardTracker(), interval_sec=60, top_n=1, lead_sec=1, budget=1)
+    assert await leader.hold_lease(fake_redis)
+    started = []
+
+    async def redis_override():
+        return fake_redis
+
+    async def runner_override(container):
+        started.append(container)
+        raise RuntimeError("not expected")
+
+    monkeypatch.setattr(dependencies, "get_redis", redis_override)
+    monkeypatch.setattr(dependencies, "get_warmup_runner", runner_override)
+    async with httpx.AsyncClient() as http:
+        container = AppContainer.build(
+            redis=fake_redis, redis_bytes=fake_redis, http=http, refresh_scheduler=follower
+        )
+
+    await dependencies._warm_up_once(container)
+
+    assert started == []
+    assert not await fake_redis.exists("lock:warmup")